@@ -0,0 +1,328 @@
+"""CSV/XLSX dosyalarından toplu malzeme girişi ve rapor dışa aktarma
+
+Tedarikçi irsaliyeleri satır satır okunur (dosya belleğe alınmaz), değerler
+GirisSatiri'na çevrilir ve tek işlemde yazılır (stok_veri.toplu_malzeme_ekle
+veya yazma kuyruğunun toplu_giris komutuyla). Okunamayan satırlar atlanır ve
+satır numarasıyla raporlanır.
+
+Dışa aktarma da akış halindedir: rapor sorgusunun satırları doğrudan CSV,
+gzip'li CSV veya yalnızca yazılır (write-only) XLSX dosyasına yazılır.
+"""
+import csv
+import gzip
+import math
+import os
+import re
+import sqlite3
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import stok_veri
+from stok_veri import GirisSatiri, StokHatasi, TopluGirisSonucu
+
+# Başlık adlarının karşılık geldiği alanlar (küçük harf, parantezsiz)
+BASLIKLAR = {
+    'ad': 'ad', 'malzeme': 'ad', 'malzeme adı': 'ad', 'malzeme adi': 'ad',
+    'fiyat': 'fiyat', 'birim fiyat': 'fiyat', 'birim fiyatı': 'fiyat', 'birim fiyati': 'fiyat',
+    'adet': 'adet', 'miktar': 'adet',
+    'kdv': 'kdv', 'kdv oranı': 'kdv', 'kdv orani': 'kdv',
+    'tarih': 'tarih',
+    'kategori': 'kategori',
+    'tedarikçi': 'tedarikci', 'tedarikci': 'tedarikci',
+}
+ZORUNLU_ALANLAR = ('ad', 'fiyat', 'adet')
+
+TARIH_BICIMLERI = ("%d.%m.%Y", "%Y-%m-%d", "%d/%m/%Y")
+
+# SQLite INTEGER sütunlarına yazılabilen en büyük değer
+SQLITE_TAMSAYI_SINIRI = 2 ** 63 - 1
+
+
+def _baslik_anahtari(baslik) -> Optional[str]:
+    """Sütun başlığını alan adına çevirir ('Birim Fiyat (₺):' -> 'fiyat')"""
+    metin = re.sub(r"\(.*?\)", "", str(baslik or "")).replace(":", "")
+    return BASLIKLAR.get(" ".join(metin.casefold().split()))
+
+
+def _sayi(deger) -> float:
+    """'1.234,50 ₺', '20%' veya sayı değerini float'a çevirir; inf ve nan ValueError verir"""
+    if isinstance(deger, (int, float)):
+        sayi = float(deger)
+    else:
+        metin = str(deger).replace("₺", "").replace("%", "").replace(" ", "").strip()
+        if "," in metin:
+            metin = metin.replace(".", "").replace(",", ".")
+        sayi = float(metin)
+    if not math.isfinite(sayi):
+        raise ValueError(f"Sonlu olmayan sayı: {deger}")
+    return sayi
+
+
+def _tarih(deger) -> date:
+    """Hücre değerini tarihe çevirir"""
+    if isinstance(deger, datetime):
+        return deger.date()
+    if isinstance(deger, date):
+        return deger
+    metin = str(deger).strip()
+    for bicim in TARIH_BICIMLERI:
+        try:
+            return datetime.strptime(metin, bicim).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Geçersiz tarih: {metin}")
+
+
+def _satira_cevir(alanlar: Dict[str, int], hucreler, kdv_varsayilan: float,
+                  bugun: date) -> GirisSatiri:
+    """Bir satırın hücrelerini GirisSatiri'na çevirir; hatada ValueError fırlatır"""
+    def al(alan):
+        i = alanlar.get(alan)
+        if i is None or i >= len(hucreler):
+            return None
+        deger = hucreler[i]
+        if isinstance(deger, str):
+            deger = deger.strip()
+        return None if deger in (None, "") else deger
+
+    ad = al('ad')
+    if ad is None:
+        raise ValueError("Malzeme adı boş")
+    try:
+        fiyat = _sayi(al('fiyat'))
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(f"Geçersiz birim fiyat: {al('fiyat')}")
+    try:
+        adet_sayi = _sayi(al('adet'))
+        adet = int(adet_sayi)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(f"Geçersiz adet: {al('adet')}")
+    if adet_sayi != adet:
+        raise ValueError(f"Adet tam sayı olmalı: {al('adet')}")
+    if abs(adet) > SQLITE_TAMSAYI_SINIRI:
+        raise ValueError(f"Geçersiz adet: {al('adet')}")
+
+    kdv = al('kdv')
+    try:
+        kdv_orani = (kdv_varsayilan if kdv is None else _sayi(kdv)) / 100
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(f"Geçersiz KDV oranı: {kdv}")
+    tarih = al('tarih')
+
+    return GirisSatiri(
+        ad=str(ad),
+        fiyat=fiyat,
+        adet=adet,
+        kdv_orani=kdv_orani,
+        tarih=bugun if tarih is None else _tarih(tarih),
+        kategori=None if al('kategori') is None else str(al('kategori')),
+        tedarikci=None if al('tedarikci') is None else str(al('tedarikci')),
+    )
+
+
+def _csv_satirlari(yol: str) -> Tuple[Iterator[list], int]:
+    """CSV satırlarını ve tahmini satır sayısını döndürür (ayraç ; , veya sekme)"""
+    with open(yol, 'rb') as f:
+        toplam = sum(parca.count(b"\n") for parca in iter(lambda: f.read(1 << 20), b""))
+
+    def satirlar():
+        with open(yol, newline='', encoding='utf-8-sig') as f:
+            ornek = f.read(8192)
+            f.seek(0)
+            try:
+                lehce = csv.Sniffer().sniff(ornek, delimiters=";,\t")
+            except csv.Error:
+                lehce = csv.excel
+            yield from csv.reader(f, lehce)
+
+    return satirlar(), toplam
+
+
+def _xlsx_satirlari(yol: str) -> Tuple[Iterator[tuple], int]:
+    """İlk çalışma sayfasının satırlarını salt okunur kipte döndürür"""
+    try:
+        import openpyxl
+    except ImportError:
+        raise StokHatasi("Excel dosyaları için openpyxl paketi gerekli!")
+
+    kitap = openpyxl.load_workbook(yol, read_only=True, data_only=True)
+    sayfa = kitap.worksheets[0]
+
+    def satirlar():
+        try:
+            yield from sayfa.iter_rows(values_only=True)
+        finally:
+            kitap.close()
+
+    return satirlar(), sayfa.max_row or 0
+
+
+def giris_dosyasini_oku(yol: str, kdv_varsayilan: float = 20
+                        ) -> Tuple[Iterator[Tuple[int, GirisSatiri]], List[Tuple[int, str]], int]:
+    """CSV veya XLSX dosyasının başlığını denetler; girişleri okuyacak üreteci döndürür
+
+    İlk satır başlıktır; ad, fiyat ve adet sütunları zorunludur. KDV yüzde olarak
+    okunur (boşsa kdv_varsayilan), tarih boşsa bugün kullanılır. Dönen değer
+    (satır no, GirisSatiri) üreteci, üreteç tükenirken dolan okuma hataları
+    listesi ve tahmini veri satırı sayısıdır. Satırlar üreteç ilerledikçe
+    okunur; üreteç yazma iş parçacığında tüketilebilir.
+    """
+    if os.path.splitext(yol)[1].lower() in ('.xlsx', '.xlsm'):
+        satirlar, toplam = _xlsx_satirlari(yol)
+    else:
+        satirlar, toplam = _csv_satirlari(yol)
+
+    baslik = next(satirlar, None)
+    if baslik is None:
+        raise StokHatasi("Dosya boş!")
+    alanlar = {}
+    for i, hucre in enumerate(baslik):
+        alan = _baslik_anahtari(hucre)
+        if alan and alan not in alanlar:
+            alanlar[alan] = i
+    eksik = [alan for alan in ZORUNLU_ALANLAR if alan not in alanlar]
+    if eksik:
+        raise StokHatasi(f"Dosyada zorunlu sütunlar eksik: {', '.join(eksik)}")
+
+    okuma_hatalari: List[Tuple[int, str]] = []
+    bugun = date.today()
+
+    def girisler():
+        for satir_no, hucreler in enumerate(satirlar, start=2):
+            if not any(h not in (None, "") for h in hucreler):
+                continue  # boş satır
+            try:
+                yield satir_no, _satira_cevir(alanlar, hucreler, kdv_varsayilan, bugun)
+            except (ValueError, OverflowError) as e:
+                okuma_hatalari.append((satir_no, str(e)))
+
+    return girisler(), okuma_hatalari, max(toplam - 1, 0)
+
+
+def giris_dosyasini_aktar(conn: sqlite3.Connection, yol: str,
+                          ilerleme: Optional[Callable[[int, int], None]] = None,
+                          yayin: Optional[stok_veri.DegisiklikYayini] = None,
+                          kdv_varsayilan: float = 20) -> TopluGirisSonucu:
+    """CSV veya XLSX dosyasındaki girişleri tek işlemde ekler (bkz. giris_dosyasini_oku)
+
+    ilerleme(işlenen, toplam) her partiden sonra çağrılır.
+    """
+    girisler, okuma_hatalari, toplam = giris_dosyasini_oku(yol, kdv_varsayilan)
+    sonuc = stok_veri.toplu_malzeme_ekle(
+        conn, girisler,
+        ilerleme=(lambda islenen: ilerleme(islenen, toplam)) if ilerleme else None,
+        yayin=yayin,
+    )
+    sonuc.hatalar = sorted(sonuc.hatalar + okuma_hatalari)
+    return sonuc
+
+
+def hata_raporu_yaz(sonuc: TopluGirisSonucu, yol: str) -> None:
+    """Atlanan satırları CSV olarak yazar"""
+    with open(yol, 'w', newline='', encoding='utf-8-sig') as f:
+        yazici = csv.writer(f, delimiter=';')
+        yazici.writerow(["Satır", "Hata"])
+        yazici.writerows(sonuc.hatalar)
+
+
+# Dışa aktarılabilen dosya türleri (uzantı -> açıklama)
+DISA_AKTARMA_BICIMLERI = {
+    '.xlsx': "Excel",
+    '.csv': "CSV",
+    '.csv.gz': "Sıkıştırılmış CSV",
+}
+
+# Dışa aktarmada ilerlemenin bildirildiği satır aralığı
+ILERLEME_ARALIGI = 5000
+
+# Excel sayfa başına satır sınırı (başlık dahil); aşılınca yeni sayfaya geçilir
+XLSX_SATIR_SINIRI = 1048576
+
+
+class AktarmaIptal(StokHatasi):
+    """Dışa aktarma kullanıcı tarafından iptal edildi"""
+
+
+def _bicim(yol: str) -> str:
+    """Dosya yolunun dışa aktarma biçimini (uzantısını) döndürür"""
+    kucuk = yol.lower()
+    for uzanti in sorted(DISA_AKTARMA_BICIMLERI, key=len, reverse=True):
+        if kucuk.endswith(uzanti):
+            return uzanti
+    raise StokHatasi(f"Desteklenmeyen dosya türü: {os.path.basename(yol)}")
+
+
+def _csv_yaz(f, sutunlar, satirlar, say):
+    yazici = csv.writer(f, delimiter=';')
+    yazici.writerow(sutunlar)
+    for row in satirlar:
+        yazici.writerow(row)
+        say()
+
+
+def _xlsx_yaz(yol, sutunlar, satirlar, say):
+    try:
+        import openpyxl
+    except ImportError:
+        raise StokHatasi("Excel dosyaları için openpyxl paketi gerekli!")
+
+    # write_only kipte satırlar hücre nesnesi tutulmadan diske akıtılır
+    kitap = openpyxl.Workbook(write_only=True)
+    sayfa_no = 0
+    sayfadaki = XLSX_SATIR_SINIRI
+    for row in satirlar:
+        if sayfadaki == XLSX_SATIR_SINIRI:
+            sayfa_no += 1
+            sayfa = kitap.create_sheet("Rapor" if sayfa_no == 1 else f"Rapor {sayfa_no}")
+            sayfa.append(list(sutunlar))
+            sayfadaki = 1
+        sayfa.append(list(row))
+        sayfadaki += 1
+        say()
+    if sayfa_no == 0:
+        kitap.create_sheet("Rapor").append(list(sutunlar))
+    kitap.save(yol)
+
+
+def disa_aktar(satirlar: Iterable[Sequence], sutunlar: Sequence[str], yol: str,
+               ilerleme: Optional[Callable[[int], None]] = None,
+               iptal: Optional[Callable[[], bool]] = None) -> int:
+    """Satırları uzantıya göre CSV, CSV.GZ veya XLSX olarak akış halinde yazar
+
+    Satırlar bir imleçten tek tek okunur, bellek kullanımı satır sayısından
+    bağımsızdır. ilerleme(yazılan) her ILERLEME_ARALIGI satırda çağrılır;
+    iptal() True dönerse AktarmaIptal fırlatılır. Dosya önce geçici adla
+    yazılır, yarım kalan aktarma hedef dosyayı bozmaz. Yazılan satır sayısını
+    döndürür.
+    """
+    bicim = _bicim(yol)
+    gecici = yol + ".yaziliyor"
+    yazilan = 0
+
+    def say():
+        nonlocal yazilan
+        yazilan += 1
+        if yazilan % ILERLEME_ARALIGI == 0:
+            if iptal and iptal():
+                raise AktarmaIptal("Dışa aktarma iptal edildi.")
+            if ilerleme:
+                ilerleme(yazilan)
+
+    try:
+        if bicim == '.xlsx':
+            _xlsx_yaz(gecici, sutunlar, satirlar, say)
+        elif bicim == '.csv.gz':
+            with gzip.open(gecici, 'wt', compresslevel=6, newline='', encoding='utf-8-sig') as f:
+                _csv_yaz(f, sutunlar, satirlar, say)
+        else:
+            with open(gecici, 'w', newline='', encoding='utf-8-sig') as f:
+                _csv_yaz(f, sutunlar, satirlar, say)
+        os.replace(gecici, yol)
+    except BaseException:
+        if os.path.exists(gecici):
+            os.remove(gecici)
+        raise
+
+    if ilerleme:
+        ilerleme(yazilan)
+    return yazilan
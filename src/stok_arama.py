@@ -0,0 +1,96 @@
+"""Otomatik tamamlama için bellek içi arama indeksi
+
+Malzeme adı ve tedarikçi gibi tekil metinler bir kez veritabanından okunur,
+sonra yeni kayıtlarla artımlı güncellenir. Aramalar veritabanına gitmez:
+önek eşleşmeleri sıralı listede ikili aramayla, metin içi eşleşmeler üçlü
+(trigram) indeksle bulunur ve sonuç sayısı sınırlanır.
+"""
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List
+
+# Öneri listesinde gösterilecek en fazla sonuç
+ARAMA_LIMITI = 50
+
+
+def _ucluler(metin: str):
+    """Metindeki tekil üç karakterlik parçaları döndürür"""
+    return {metin[i:i + 3] for i in range(len(metin) - 2)}
+
+
+class AramaIndeksi:
+    """Tekil metinler üzerinde önek + üçlü (trigram) arama indeksi"""
+
+    def __init__(self, degerler: Iterable[str] = ()):
+        self._degerler: List[str] = []          # id -> özgün metin
+        self._anahtarlar: List[str] = []        # id -> küçük harfli metin
+        self._kimlikler: Dict[str, int] = {}    # küçük harfli metin -> id
+        self._sirali: List[tuple] = []          # (küçük harfli metin, id), önek araması için
+        self._ucluler: Dict[str, List[int]] = {}
+        # Toplu yüklemede sıralama bir kez yapılır
+        for deger in degerler:
+            self._ekle(deger, sirali=False)
+        self._sirali.sort()
+
+    def __len__(self):
+        return len(self._degerler)
+
+    def ekle(self, deger: str) -> bool:
+        """Metni indekse ekler; zaten varsa veya boşsa False döner"""
+        return self._ekle(deger, sirali=True)
+
+    def _ekle(self, deger: str, sirali: bool) -> bool:
+        if not deger:
+            return False
+        anahtar = deger.casefold()
+        if anahtar in self._kimlikler:
+            return False
+
+        kimlik = len(self._degerler)
+        self._degerler.append(deger)
+        self._anahtarlar.append(anahtar)
+        self._kimlikler[anahtar] = kimlik
+        if sirali:
+            insort(self._sirali, (anahtar, kimlik))
+        else:
+            self._sirali.append((anahtar, kimlik))
+        for uclu in _ucluler(anahtar):
+            self._ucluler.setdefault(uclu, []).append(kimlik)
+        return True
+
+    def ara(self, metin: str, limit: int = ARAMA_LIMITI) -> List[str]:
+        """Metni içeren değerleri döndürür (önce önek eşleşmeleri, en fazla limit adet)"""
+        aranan = metin.strip().casefold()
+
+        # Önek eşleşmeleri: sıralı listede ikili arama
+        bulunan = []
+        i = bisect_left(self._sirali, (aranan,))
+        while i < len(self._sirali) and len(bulunan) < limit:
+            anahtar, kimlik = self._sirali[i]
+            if not anahtar.startswith(aranan):
+                break
+            bulunan.append(kimlik)
+            i += 1
+        if len(bulunan) >= limit or not aranan:
+            return [self._degerler[k] for k in bulunan]
+
+        # Metin içi eşleşmeler: en seyrek üçlünün listesini doğrula
+        if len(aranan) >= 3:
+            listeler = []
+            for uclu in _ucluler(aranan):
+                liste = self._ucluler.get(uclu)
+                if liste is None:
+                    return [self._degerler[k] for k in bulunan]
+                listeler.append(liste)
+            adaylar = min(listeler, key=len)
+        else:
+            adaylar = range(len(self._anahtarlar))
+
+        onekler = set(bulunan)
+        ek = []
+        for kimlik in adaylar:
+            if kimlik not in onekler and aranan in self._anahtarlar[kimlik]:
+                ek.append(kimlik)
+                if len(bulunan) + len(ek) >= limit:
+                    break
+        ek.sort(key=self._anahtarlar.__getitem__)
+        return [self._degerler[k] for k in bulunan + ek]
@@ -0,0 +1,182 @@
+"""Veritabanı bağlantı yöneticisi
+
+Veritabanı WAL (write-ahead log) kipinde açılır: okuyucular yazıcıyı
+beklemez, commit yalnızca günlüğe ekleme yapar. Yönetici şemayı hazırlayan
+bir yazma bağlantısı (Tk iş parçacığına ait) ve rapor sorguları için havuzdan
+verilen salt okunur bağlantılar tutar. Veri yazmaları bu bağlantıdan değil,
+stok_yazma.YazmaKuyrugu'nun kendi bağlantısından tek iş parçacığında
+yapılır. synchronous, cache_size, mmap_size ve temp_store ayarları depolama
+profilleriyle seçilir. Bir SorguIzleyici verilirse tüm bağlantıların
+ifadeleri onunla izlenir (bkz. stok_izleme).
+"""
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Optional
+
+import stok_veri
+from stok_izleme import IzlenenBaglanti, SorguIzleyici
+
+
+@dataclass(frozen=True)
+class DepolamaProfili:
+    """Bağlantılara uygulanan PRAGMA ayarları"""
+    ad: str
+    synchronous: str        # 'FULL', 'NORMAL' veya 'OFF'
+    cache_size: int         # Negatif: KB cinsinden
+    mmap_size: int          # Bayt; 0 kapalı
+    temp_store: str         # 'DEFAULT', 'FILE' veya 'MEMORY'
+    aciklama: str = ''
+
+
+PROFILLER = {
+    'Güvenli': DepolamaProfili(
+        'Güvenli', 'FULL', -8000, 0, 'DEFAULT',
+        "Her commit diske yazılır; elektrik kesintisinde hiçbir kayıt kaybolmaz."),
+    'Dengeli': DepolamaProfili(
+        'Dengeli', 'NORMAL', -32000, 256 * 1024 * 1024, 'MEMORY',
+        "Veritabanı hiç bozulmaz; elektrik kesintisinde son birkaç commit kaybolabilir."),
+    'Hızlı': DepolamaProfili(
+        'Hızlı', 'OFF', -64000, 1024 * 1024 * 1024, 'MEMORY',
+        "Diske yazma işletim sistemine bırakılır; sistem çökerse veritabanı bozulabilir."),
+}
+VARSAYILAN_PROFIL = 'Dengeli'
+
+# Havuzda tutulan en fazla salt okunur bağlantı
+OKUYUCU_HAVUZU = 4
+
+
+def pragmalari_uygula(conn: sqlite3.Connection, profil: DepolamaProfili) -> None:
+    """Profilin bağlantı başına PRAGMA ayarlarını uygular"""
+    conn.execute(f"PRAGMA synchronous = {profil.synchronous}")
+    conn.execute(f"PRAGMA cache_size = {int(profil.cache_size)}")
+    conn.execute(f"PRAGMA mmap_size = {int(profil.mmap_size)}")
+    conn.execute(f"PRAGMA temp_store = {profil.temp_store}")
+
+
+class BaglantiYoneticisi:
+    """Yazma bağlantısı ve salt okunur bağlantı havuzu
+
+    Yazma bağlantısı (yazici) yalnızca oluşturulduğu (Tk) iş parçacığında
+    kullanılır: şema hazırlığı ve güncellemesi, PRAGMA ayarları ve yedekten
+    geri yükleme. Hareket, kategori, toplu giriş ve temizleme yazmaları yazma
+    kuyruğunun bağlantısından yapılır; aynı anda iki yazıcı olabildiği için
+    yazici kilidi kuyruk bağlantısı kadar (30 sn) bekler.
+    Okuyucular herhangi bir iş parçacığından alınıp bırakılabilir; profil
+    değiştiğinde havuzdan çıkan bağlantıya yeni ayarlar uygulanır.
+    """
+
+    def __init__(self, db_path: str, profil: DepolamaProfili = PROFILLER[VARSAYILAN_PROFIL],
+                 izleyici: Optional[SorguIzleyici] = None):
+        self.db_path = db_path
+        self.profil = profil
+        self.izleyici = izleyici
+        self._havuz = queue.LifoQueue()
+        self._kilit = threading.Lock()
+        self._nesil = 0          # Profil her değiştiğinde artar
+        self._nesiller = {}      # id(okuyucu) -> ayarlarının uygulandığı nesil
+        self._surum_baglantisi = None
+        self._surum_kilidi = threading.Lock()
+
+        # Şema yazma bağlantısıyla hazırlanır; WAL kipi dosyada kalıcıdır
+        self.yazici = stok_veri.connect(db_path, factory=IzlenenBaglanti)
+        self.yazici.izleyici = izleyici
+        self.yazici.execute("PRAGMA busy_timeout = 30000")
+        self.yazici.execute("PRAGMA journal_mode = WAL")
+        pragmalari_uygula(self.yazici, profil)
+
+    def okuyucu_al(self) -> sqlite3.Connection:
+        """Havuzdan (yoksa yeni) salt okunur bağlantı verir"""
+        try:
+            conn = self._havuz.get_nowait()
+        except queue.Empty:
+            conn = stok_veri.connect_salt_okunur(self.db_path, factory=IzlenenBaglanti)
+            conn.izleyici = self.izleyici
+        with self._kilit:
+            nesil = self._nesil
+            guncel = self._nesiller.get(id(conn)) == nesil
+            self._nesiller[id(conn)] = nesil
+        if not guncel:
+            pragmalari_uygula(conn, self.profil)
+        return conn
+
+    def okuyucu_birak(self, conn: sqlite3.Connection) -> None:
+        """Bağlantıyı havuza geri koyar; havuz doluysa kapatır"""
+        if self._havuz.qsize() < OKUYUCU_HAVUZU:
+            self._havuz.put(conn)
+            return
+        with self._kilit:
+            self._nesiller.pop(id(conn), None)
+        conn.close()
+
+    @contextmanager
+    def okuyucu(self):
+        """with bloğu boyunca havuzdan bir okuyucu kullanır"""
+        conn = self.okuyucu_al()
+        try:
+            yield conn
+        finally:
+            self.okuyucu_birak(conn)
+
+    def veri_surumu(self) -> int:
+        """Veritabanı içeriğinin sürümü (PRAGMA data_version)
+
+        Ayrı, izlenmeyen bir salt okunur bağlantıdan okunur; yazma bağlantısının
+        veya başka bir sürecin her commit'inde değişir. Herhangi bir iş
+        parçacığından çağrılabilir.
+        """
+        with self._surum_kilidi:
+            if self._surum_baglantisi is None:
+                self._surum_baglantisi = stok_veri.connect_salt_okunur(self.db_path)
+            return self._surum_baglantisi.execute("PRAGMA data_version").fetchone()[0]
+
+    def profil_degistir(self, profil: DepolamaProfili) -> None:
+        """Yeni profili yazıcıya hemen, okuyuculara havuzdan çıkışta uygular"""
+        with self._kilit:
+            self.profil = profil
+            self._nesil += 1
+        pragmalari_uygula(self.yazici, profil)
+
+    def yeniden_ac(self) -> None:
+        """Havuzdaki okuyucuları kapatır (veritabanı içeriği dışarıdan değişince)"""
+        while True:
+            try:
+                conn = self._havuz.get_nowait()
+            except queue.Empty:
+                break
+            with self._kilit:
+                self._nesiller.pop(id(conn), None)
+            conn.close()
+        # Geri yükleme dosya başlığını değiştirmiş olabilir; WAL kipi yeniden istenir
+        self.yazici.execute("PRAGMA journal_mode = WAL")
+        pragmalari_uygula(self.yazici, self.profil)
+
+    def commit_gecikmesi_olc(self, tekrar: int = 20) -> float:
+        """Profilin ortalama commit süresini (ms) veritabanının yanındaki deneme dosyasında ölçer
+
+        Gerçek veritabanına yazılmaz; aynı disk ve aynı ayarlarla küçük işlemler
+        commit edilir. Herhangi bir iş parçacığından çağrılabilir.
+        """
+        yol = self.db_path + ".olcum"
+        conn = sqlite3.connect(yol)
+        try:
+            conn.execute("PRAGMA journal_mode = WAL")
+            pragmalari_uygula(conn, self.profil)
+            conn.execute("CREATE TABLE IF NOT EXISTS olcum (id INTEGER PRIMARY KEY, deger TEXT)")
+            conn.commit()
+            sureler = []
+            for i in range(tekrar):
+                conn.execute("INSERT INTO olcum (deger) VALUES (?)", (str(i),))
+                baslangic = time.perf_counter()
+                conn.commit()
+                sureler.append(time.perf_counter() - baslangic)
+        finally:
+            conn.close()
+            for ek in ("", "-wal", "-shm"):
+                if os.path.exists(yol + ek):
+                    os.remove(yol + ek)
+        return 1000 * sum(sureler) / len(sureler)
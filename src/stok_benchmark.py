@@ -0,0 +1,368 @@
+"""Sentetik veri üreteci ve sorgu performans ölçümü
+
+Örnek kullanım:
+
+    python stok_benchmark.py --giris 100000 --cikis 50000 --cikti sonuc.json
+
+Veritabanı, stok_veri'deki temel şemayla (sürüm 0) oluşturulup sentetik
+hareketlerle doldurulur, ardından gerçek göç (migration) adımlarıyla güncel
+sürüme yükseltilir. Böylece indeksler ve özet tablolar uygulamadaki ile aynı
+yoldan üretilir. Her rapor sorgusu birden çok kez çalıştırılıp süre
+yüzdelikleri ve sorgu planları JSON olarak yazdırılır.
+
+--yazma N ile ayrıca N giriş/çıkış hareketinin kaydedilme hızı, her hareketin
+kendi commit'iyle ve toplu commit'li yazma kuyruğuyla, depolama profili başına
+ölçülür.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from array import array
+from datetime import date, timedelta
+
+import stok_veri
+from stok_arama import AramaIndeksi
+from stok_baglanti import PROFILLER, BaglantiYoneticisi
+from stok_yazma import YazmaKuyrugu
+
+PARTI_BOYUTU = 50000
+
+
+def veritabani_uret(db_path, malzeme=1000, kategori=20, tedarikci=50, giris=100000, cikis=50000,
+                    gun=730, seed=42, bitis=None, ilerleme=None):
+    """Tohumlanmış (tekrarlanabilir) sentetik bir stok veritabanı oluşturur"""
+    rnd = random.Random(seed)
+    bitis = bitis or date.today()
+    baslangic = bitis - timedelta(days=gun - 1)
+
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    stok_veri.create_database(conn)
+
+    kategoriler = [f"Kategori {i:03d}" for i in range(kategori)]
+    tedarikciler = [f"Tedarikçi {i:04d}" for i in range(tedarikci)]
+    malzemeler = [(f"Malzeme {i:06d}", rnd.choice(kategoriler)) for i in range(malzeme)]
+
+    # Giriş kayıtları (id'ler 1'den başlar, kalan miktarlar çıkış üretimi için tutulur)
+    giris_tarihleri = array('i')
+    kalan = array('i')
+    giris_malzeme = array('i')
+    parti = []
+    for i in range(giris):
+        m = rnd.randrange(malzeme)
+        ad, kat = malzemeler[m]
+        gun_no = rnd.randrange(gun)
+        tarih = baslangic + timedelta(days=gun_no)
+        fiyat = round(rnd.uniform(0.5, 500.0), 2)
+        adet = rnd.randint(1, 200)
+        kdv_orani = rnd.choice((0.01, 0.10, 0.20))
+        tutarlar = stok_veri.kdv_hesapla(fiyat, adet, kdv_orani)
+        parti.append((ad, fiyat, adet, kdv_orani, tutarlar.kdv_tutari, tutarlar.kdv_dahil_toplam,
+                      tarih.strftime("%d.%m.%Y"), kat, rnd.choice(tedarikciler)))
+        giris_tarihleri.append(gun_no)
+        kalan.append(adet)
+        giris_malzeme.append(m)
+
+        if len(parti) >= PARTI_BOYUTU or i == giris - 1:
+            conn.executemany(
+                "INSERT INTO malzeme_girisleri (ad, fiyat, adet, kdv, kdv_tutari, toplam, tarih, kategori, tedarikci) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", parti)
+            parti = []
+            if ilerleme:
+                ilerleme("giris", i + 1, giris)
+
+    # Çıkış kayıtları: rastgele bir lottan, lotun tarihinden sonra ve kalan miktarı aşmadan
+    personeller = [f"Personel {i:03d}" for i in range(max(1, tedarikci))]
+    uretilen = 0
+    while uretilen < cikis and giris:
+        lot = rnd.randrange(giris)
+        if kalan[lot] == 0:
+            continue
+        miktar = rnd.randint(1, min(kalan[lot], 20))
+        kalan[lot] -= miktar
+        gun_no = rnd.randint(giris_tarihleri[lot], gun - 1)
+        tarih = baslangic + timedelta(days=gun_no)
+        parti.append((lot + 1, malzemeler[giris_malzeme[lot]][0], miktar, rnd.choice(personeller),
+                      None, tarih.strftime("%d.%m.%Y")))
+        uretilen += 1
+
+        if len(parti) >= PARTI_BOYUTU or uretilen == cikis:
+            conn.executemany(
+                "INSERT INTO malzeme_cikislari (giris_id, malzeme_adi, cikis_adedi, personel, aciklama, tarih) "
+                "VALUES (?, ?, ?, ?, ?, ?)", parti)
+            parti = []
+            if ilerleme:
+                ilerleme("cikis", uretilen, cikis)
+
+    # Mevcut stok = lotlarda kalan miktarların malzeme bazında toplamı
+    stok = {}
+    for lot in range(giris):
+        m = giris_malzeme[lot]
+        stok[m] = stok.get(m, 0) + kalan[lot]
+    conn.executemany("INSERT INTO mevcut_stok (malzeme_adi, toplam_adet) VALUES (?, ?)",
+                     ((malzemeler[m][0], adet) for m, adet in stok.items()))
+    conn.commit()
+
+    # Göç adımları ISO tarihleri, indeksleri ve özet tabloları üretir
+    if ilerleme:
+        ilerleme("goc", 0, 1)
+    stok_veri.migrate_database(conn)
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+
+    return {"malzeme": malzeme, "kategori": kategori, "tedarikci": tedarikci,
+            "giris": giris, "cikis": uretilen, "gun": gun, "seed": seed,
+            "baslangic": baslangic.isoformat(), "bitis": bitis.isoformat()}
+
+
+def senaryolar(conn, bitis):
+    """Ölçülecek sorgu yollarını (ad, çağrılabilir, sorgu/parametre) olarak döndürür"""
+    ay_basi = bitis.replace(day=1)
+    yil_basi = bitis - timedelta(days=365)
+    kategori = conn.execute(
+        "SELECT k.ad FROM malzemeler m JOIN kategoriler k ON k.id = m.kategori_id LIMIT 1").fetchone()
+    kategori = kategori[0] if kategori else ''
+    malzeme = conn.execute("SELECT ad FROM malzemeler LIMIT 1").fetchone()
+    malzeme = malzeme[0][-4:] if malzeme else ''
+
+    hareket_filtreleri = {
+        "hareket_raporu.bu_ay": stok_veri.HareketFiltresi(ay_basi, bitis),
+        "hareket_raporu.son_yil": stok_veri.HareketFiltresi(yil_basi, bitis),
+        "hareket_raporu.son_yil_kategori": stok_veri.HareketFiltresi(yil_basi, bitis, kategori=kategori),
+        "hareket_raporu.son_yil_malzeme": stok_veri.HareketFiltresi(yil_basi, bitis, malzeme=malzeme),
+        "hareket_raporu.son_yil_giris": stok_veri.HareketFiltresi(yil_basi, bitis, hareket_turu='Giriş'),
+        "hareket_raporu.son_yil_cikis": stok_veri.HareketFiltresi(yil_basi, bitis, hareket_turu='Çıkış'),
+    }
+    stok_filtreleri = {
+        "mevcut_stok.tumu": stok_veri.StokFiltresi(),
+        "mevcut_stok.kategori": stok_veri.StokFiltresi(kategori=kategori),
+        "mevcut_stok.dusuk_stok": stok_veri.StokFiltresi(stok_durumu='Düşük Stok (<10)'),
+    }
+    aylik_filtreleri = {
+        "aylik_rapor.yil": stok_veri.AylikFiltre(bitis.year),
+        "aylik_rapor.yil_kategori": stok_veri.AylikFiltre(bitis.year, kategori=kategori),
+    }
+
+    sonuc = []
+    for ad, filtre in hareket_filtreleri.items():
+        sonuc.append((ad, lambda f=filtre: len(stok_veri.hareket_raporu(conn, f).satirlar),
+                      stok_veri._hareket_sorgusu(filtre)))
+    for ad, filtre in stok_filtreleri.items():
+        sonuc.append((ad, lambda f=filtre: len(stok_veri.mevcut_stok(conn, f).satirlar),
+                      stok_veri._stok_sorgusu(filtre)))
+    # Sanal tablonun ilk açılışı: toplamlar + ilk sayfa
+    for ad, filtre in hareket_filtreleri.items():
+        ad = ad.replace("hareket_raporu", "hareket_ilk_sayfa")
+        sonuc.append((ad, lambda f=filtre: stok_veri.hareket_toplamlari(conn, f).satir_sayisi
+                      + len(stok_veri.hareket_sayfasi(conn, f, None, 200)), None))
+    for ad, filtre in stok_filtreleri.items():
+        ad = ad.replace("mevcut_stok", "stok_ilk_sayfa")
+        sonuc.append((ad, lambda f=filtre: stok_veri.stok_toplamlari(conn, f).satir_sayisi
+                      + len(stok_veri.stok_sayfasi(conn, f, None, 200)), None))
+    # Kaydırma çubuğu sona çekildiğinde: son sayfa sınırından okunur
+    for ad, filtre in hareket_filtreleri.items():
+        ad = ad.replace("hareket_raporu", "hareket_son_sayfa")
+        sonra = stok_veri.hareket_sayfa_sinirlari(conn, filtre, 200)[-1]
+        sonuc.append((ad, lambda f=filtre, s=sonra: len(stok_veri.hareket_sayfasi(conn, f, s, 200)), None))
+    for ad, filtre in aylik_filtreleri.items():
+        sonuc.append((ad, lambda f=filtre: len(stok_veri.aylik_rapor(conn, f).satirlar), None))
+
+    sonuc.append(("dashboard_ozeti", lambda: stok_veri.dashboard_ozeti(conn) and 1, None))
+    for arama in ("M", "Malz", "00"):
+        sonuc.append((f"autocomplete.malzeme.{arama}", lambda a=arama: len(stok_veri.malzeme_adlari(conn, a)), None))
+    sonuc.append(("autocomplete.tedarikci.Ted", lambda: len(stok_veri.tedarikciler(conn, "Ted")), None))
+
+    # Arayüzün kullandığı bellek içi indeks
+    sonuc.append(("autocomplete_indeks.kur", lambda: len(AramaIndeksi(stok_veri.malzeme_adlari(conn))), None))
+    indeks = AramaIndeksi(stok_veri.malzeme_adlari(conn))
+    for arama in ("M", "Malz", "00", "zeme 00"):
+        sonuc.append((f"autocomplete_indeks.malzeme.{arama}", lambda a=arama: len(indeks.ara(a)), None))
+    return sonuc
+
+
+def yuzdelik(degerler, oran):
+    """Sıralı değerlerden doğrusal ara değerli yüzdelik hesaplar"""
+    if len(degerler) == 1:
+        return degerler[0]
+    konum = (len(degerler) - 1) * oran
+    alt = int(konum)
+    ust = min(alt + 1, len(degerler) - 1)
+    return degerler[alt] + (degerler[ust] - degerler[alt]) * (konum - alt)
+
+
+def sorgu_plani(conn, sorgu):
+    """EXPLAIN QUERY PLAN çıktısını satır listesi olarak döndürür"""
+    if not sorgu:
+        return None
+    query, params = sorgu
+    return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + query, params)]
+
+
+def olc(conn, bitis, tekrar=20, isinma=2):
+    """Tüm senaryoları çalıştırır ve milisaniye cinsinden istatistikleri döndürür"""
+    sonuclar = {}
+    for ad, calistir, sorgu in senaryolar(conn, bitis):
+        for _ in range(isinma):
+            calistir()
+
+        sureler = []
+        satir = 0
+        for _ in range(tekrar):
+            t0 = time.perf_counter()
+            satir = calistir()
+            sureler.append((time.perf_counter() - t0) * 1000)
+        sureler.sort()
+
+        sonuclar[ad] = {
+            "satir": satir,
+            "tekrar": tekrar,
+            "min_ms": round(sureler[0], 3),
+            "ortalama_ms": round(statistics.fmean(sureler), 3),
+            "p50_ms": round(yuzdelik(sureler, 0.50), 3),
+            "p90_ms": round(yuzdelik(sureler, 0.90), 3),
+            "p99_ms": round(yuzdelik(sureler, 0.99), 3),
+            "max_ms": round(sureler[-1], 3),
+            "plan": sorgu_plani(conn, sorgu),
+        }
+    return sonuclar
+
+
+def yazma_olc(db_path, hareket=2000, profiller=("Güvenli", "Dengeli")):
+    """Hareket kaydetme hızını tek tek commit ve yazma kuyruğu ile karşılaştırır"""
+    conn = sqlite3.connect(db_path)
+    stoktakiler = [ad for ad, in conn.execute(
+        "SELECT m.ad FROM mevcut_stok ms JOIN malzemeler m ON m.id = ms.malzeme_id "
+        "WHERE ms.toplam_adet > 0 LIMIT 100")]
+    conn.close()
+    bugun = date.today()
+
+    def komutlar():
+        # Yarısı giriş, yarısı aynı malzemelerden tek adetlik çıkış
+        for i in range(hareket):
+            ad = stoktakiler[i % len(stoktakiler)] if stoktakiler else f"Yazma {i % 100:03d}"
+            if i % 2 == 0 or not stoktakiler:
+                yield 'giris', dict(ad=ad, fiyat=1.0, adet=2, kdv_orani=0.2, tarih=bugun)
+            else:
+                yield 'cikis', dict(malzeme_adi=ad, miktar=1, personel="Ölçüm", tarih=bugun)
+
+    sonuc = {}
+    for profil_adi in profiller:
+        baglantilar = BaglantiYoneticisi(db_path, PROFILLER[profil_adi])
+
+        t0 = time.perf_counter()
+        for komut, parametreler in komutlar():
+            if komut == 'giris':
+                stok_veri.malzeme_ekle(baglantilar.yazici, **parametreler)
+            else:
+                stok_veri.malzeme_cikisi_yap(baglantilar.yazici, **parametreler)
+        tek_tek = time.perf_counter() - t0
+
+        kuyruk = YazmaKuyrugu(baglantilar)
+        t0 = time.perf_counter()
+        gelecekler = [kuyruk.gonder(komut, **parametreler) for komut, parametreler in komutlar()]
+        kalicilik = {gelecek.result().kalicilik for gelecek in gelecekler}
+        toplu = time.perf_counter() - t0
+        istatistik = kuyruk.istatistik()
+        kuyruk.kapat()
+        baglantilar.yazici.close()
+
+        sonuc[profil_adi] = {
+            "hareket": hareket,
+            "tek_tek_hareket_sn": round(hareket / tek_tek, 1),
+            "kuyruk_hareket_sn": round(hareket / toplu, 1),
+            "hizlanma": round(tek_tek / toplu, 1),
+            "ortalama_parti": round(istatistik["ortalama_parti"], 1),
+            "ortalama_commit_ms": round(istatistik["ortalama_commit_ms"], 3),
+            "kalicilik": sorted(kalicilik),
+        }
+    return sonuc
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stok takip sorgu performans ölçümü")
+    parser.add_argument("--db", help="Veritabanı dosyası (varsayılan: geçici dosya)")
+    parser.add_argument("--mevcut", action="store_true",
+                        help="Veritabanını yeniden üretmeden mevcut dosya üzerinde ölç")
+    parser.add_argument("--malzeme", type=int, default=1000)
+    parser.add_argument("--kategori", type=int, default=20)
+    parser.add_argument("--tedarikci", type=int, default=50)
+    parser.add_argument("--giris", type=int, default=100000)
+    parser.add_argument("--cikis", type=int, default=50000)
+    parser.add_argument("--gun", type=int, default=730, help="Hareketlerin yayılacağı gün sayısı")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--tekrar", type=int, default=20, help="Her sorgunun ölçüm tekrarı")
+    parser.add_argument("--yazma", type=int, default=0,
+                        help="Kayıt hızı ölçümünde kullanılacak hareket sayısı (0: ölçme)")
+    parser.add_argument("--cikti", help="JSON sonuç dosyası (varsayılan: standart çıktı)")
+    args = parser.parse_args(argv)
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix="stok_benchmark_"), "benchmark.db")
+    bitis = date.today()
+
+    def ilerleme(asama, yapilan, toplam):
+        print(f"  {asama}: {yapilan}/{toplam}", file=sys.stderr)
+
+    if args.mevcut:
+        veri = {"db": db_path}
+        conn = stok_veri.connect(db_path)
+        son_tarih = conn.execute("SELECT MAX(tarih_iso) FROM malzeme_girisleri").fetchone()[0]
+        if son_tarih:
+            bitis = date.fromisoformat(son_tarih)
+    else:
+        print(f"Veritabanı üretiliyor: {db_path}", file=sys.stderr)
+        t0 = time.perf_counter()
+        veri = veritabani_uret(db_path, args.malzeme, args.kategori, args.tedarikci,
+                               args.giris, args.cikis, args.gun, args.seed, bitis, ilerleme)
+        veri["uretim_sn"] = round(time.perf_counter() - t0, 2)
+        conn = stok_veri.connect(db_path)
+
+    veri["boyut_mb"] = round(os.path.getsize(db_path) / 1024 / 1024, 2)
+
+    print("Sorgular ölçülüyor...", file=sys.stderr)
+    sonuc = {
+        "ortam": {
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+        },
+        "veri": veri,
+        "sorgular": olc(conn, bitis, args.tekrar),
+    }
+    conn.close()
+
+    # Okunabilir özet
+    for ad, istatistik in sonuc["sorgular"].items():
+        print(f"{ad:42s} p50={istatistik['p50_ms']:9.2f} ms  p99={istatistik['p99_ms']:9.2f} ms  "
+              f"satır={istatistik['satir']}", file=sys.stderr)
+
+    # Yazma ölçümü veritabanına hareket eklediği için sorgulardan sonra yapılır
+    if args.yazma:
+        print("Kayıt hızı ölçülüyor...", file=sys.stderr)
+        sonuc["yazma"] = yazma_olc(db_path, args.yazma)
+        for profil, istatistik in sonuc["yazma"].items():
+            print(f"yazma.{profil:10s} tek tek={istatistik['tek_tek_hareket_sn']:9.1f}/sn  "
+                  f"kuyruk={istatistik['kuyruk_hareket_sn']:9.1f}/sn  x{istatistik['hizlanma']}",
+                  file=sys.stderr)
+
+    metin = json.dumps(sonuc, ensure_ascii=False, indent=2)
+    if args.cikti:
+        with open(args.cikti, "w", encoding="utf-8") as f:
+            f.write(metin)
+    else:
+        print(metin)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""Stok sunucusu istemcisi
+
+Sunucu kipinde (stok_sunucu) arayüzün kullandığı veri fonksiyonlarının uzak
+karşılıkları. Fonksiyonların adları ve parametreleri stok_veri ile aynıdır;
+ilk parametre sqlite3 bağlantısı yerine bir UzakBaglanti'dır. Böylece arayüz
+yerel veritabanı ile sunucu arasında yalnızca veri modülünü ve bağlantı
+yöneticisini değiştirerek geçiş yapar.
+
+Yazma fonksiyonları değişikliği yerelde yayınlamaz (yayin yok sayılır):
+sunucu her yazmayı, hangi istemciden gelirse gelsin, değişiklik akışına ekler
+ve DegisiklikDinleyici bunu tüm istemcilere iletir.
+"""
+import http.client
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date
+from typing import Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import stok_veri
+from stok_sunucu import VARSAYILAN_PORT, coz, kodla
+from stok_veri import StokHatasi
+from stok_yazma import YazmaSonucu
+
+# Okuyucu havuzunda tutulan en fazla HTTP bağlantısı
+OKUYUCU_HAVUZU = 4
+
+
+class SunucuHatasi(StokHatasi):
+    """Sunucuya ulaşılamadı veya sunucu isteği işleyemedi"""
+
+
+def _adres_coz(adres: str) -> Tuple[str, int]:
+    """'sunucu:port', 'sunucu' veya 'http://sunucu:port' biçimindeki adresi ayırır"""
+    if "//" not in adres:
+        adres = "http://" + adres
+    parcalar = urlsplit(adres)
+    return parcalar.hostname or "127.0.0.1", parcalar.port or VARSAYILAN_PORT
+
+
+class UzakBaglanti:
+    """Sunucuya kalıcı (keep-alive) tek HTTP bağlantısı
+
+    Bir anda tek iş parçacığı kullanır; interrupt() başka iş parçacığından
+    çağrılıp süren isteği keser (SorguCalistirici'nin iptali için).
+    """
+
+    def __init__(self, adres: str, zaman_asimi: float = 30):
+        self.adres = adres
+        self.zaman_asimi = zaman_asimi
+        sunucu, port = _adres_coz(adres)
+        self._http = http.client.HTTPConnection(sunucu, port, timeout=zaman_asimi)
+
+    def istek(self, yontem: str, yol: str, govde=None, tekrar: bool = False):
+        """İsteği gönderir ve çözülmüş yanıtı döndürür
+
+        tekrar=True ise (okumalar) kopmuş keep-alive bağlantısında bir kez
+        yeniden denenir. Yazmalar yeniden denenmez; işlem kaydedilmiş olabilir.
+        """
+        veri = kodla(govde) if govde is not None else None
+        basliklar = {"Content-Type": "application/json; charset=utf-8"} if veri else {}
+        for deneme in range(2 if tekrar else 1):
+            try:
+                self._http.request(yontem, yol, body=veri, headers=basliklar)
+                yanit = self._http.getresponse()
+                icerik = coz(yanit.read())
+                break
+            except (OSError, http.client.HTTPException) as e:
+                self._http.close()
+                if deneme or not tekrar:
+                    raise SunucuHatasi(f"Sunucuya ulaşılamadı ({self.adres}): {e}") from e
+
+        if yanit.status == 409:
+            raise StokHatasi(icerik["hata"])
+        if yanit.status != 200:
+            raise SunucuHatasi(f"Sunucu hatası ({yanit.status}): {icerik.get('hata') if icerik else ''}")
+        return icerik
+
+    def oku(self, fonksiyon: str, *args):
+        """Sunucuda stok_veri okuma fonksiyonunu çalıştırır"""
+        return self.istek("POST", f"/oku/{fonksiyon}", {"args": list(args)}, tekrar=True)["sonuc"]
+
+    def yaz(self, komut: str, **parametreler):
+        """Yazma komutunu sunucunun kuyruğuna gönderir ve commit edilene kadar bekler"""
+        return self.istek("POST", f"/yaz/{komut}", parametreler)["sonuc"]
+
+    def interrupt(self) -> None:
+        self._http.close()
+
+    def close(self) -> None:
+        self._http.close()
+
+
+class UzakBaglantilar:
+    """BaglantiYoneticisi'nin sunucu kipindeki karşılığı (yazıcı ve okuyucu havuzu)"""
+
+    def __init__(self, adres: str):
+        self.adres = adres
+        self._havuz = queue.LifoQueue()
+        self.yazici = UzakBaglanti(adres)
+        self.durum = self.yazici.istek("GET", "/durum", tekrar=True)
+
+    def okuyucu_al(self) -> UzakBaglanti:
+        try:
+            return self._havuz.get_nowait()
+        except queue.Empty:
+            return UzakBaglanti(self.adres)
+
+    def okuyucu_birak(self, conn: UzakBaglanti) -> None:
+        if self._havuz.qsize() < OKUYUCU_HAVUZU:
+            self._havuz.put(conn)
+        else:
+            conn.close()
+
+    @contextmanager
+    def okuyucu(self):
+        conn = self.okuyucu_al()
+        try:
+            yield conn
+        finally:
+            self.okuyucu_birak(conn)
+
+    def veri_surumu(self) -> int:
+        """Sunucu kipinde yerel veri sürümü yoktur; değişiklikler değişiklik akışıyla izlenir"""
+        return 0
+
+    def yeniden_ac(self) -> None:
+        while True:
+            try:
+                self._havuz.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def kapat(self) -> None:
+        self.yeniden_ac()
+        self.yazici.close()
+
+
+class UzakYazmaKuyrugu:
+    """YazmaKuyrugu'nun sunucu kipindeki karşılığı
+
+    Komutlar tek bir arka plan iş parçacığından, gönderim sırasıyla sunucuya
+    iletilir; sunucu bunları kendi kuyruğunda toplu commit eder. Sonuçtaki
+    degisiklik None'dır: değişiklikler DegisiklikDinleyici ile gelir.
+    """
+
+    def __init__(self, adres: str):
+        self._conn = UzakBaglanti(adres)
+        self._havuz = ThreadPoolExecutor(max_workers=1, thread_name_prefix="uzak-yazma")
+
+    def gonder(self, komut: str, **parametreler) -> Future:
+        return self._havuz.submit(self._yaz, komut, parametreler)
+
+    def calistir(self, komut: str, **parametreler) -> YazmaSonucu:
+        return self.gonder(komut, **parametreler).result()
+
+    def _yaz(self, komut: str, parametreler: dict) -> YazmaSonucu:
+        yanit = self._conn.istek("POST", f"/yaz/{komut}", parametreler)
+        return YazmaSonucu(yanit["sonuc"], None, yanit["kalicilik"], yanit["parti"], yanit["parti_boyutu"])
+
+    def kapat(self) -> None:
+        self._havuz.shutdown()
+        self._conn.close()
+
+
+class DegisiklikDinleyici:
+    """Sunucunun değişiklik akışını arka planda uzun yoklamayla izler
+
+    Gelen değişiklikler kuyrukta biriktirilir; arayüz bekleyenler() ile kendi
+    iş parçacığında alıp yayınlar. Bağlantı koparsa aralıklarla yeniden denenir.
+    """
+    BEKLEME = 25            # Bir yoklamada sunucuda beklenecek süre (sn)
+    YENIDEN_DENEME = 2      # Bağlantı hatasından sonra bekleme (sn)
+
+    def __init__(self, adres: str, son: int):
+        self._conn = UzakBaglanti(adres, zaman_asimi=self.BEKLEME + 10)
+        self._son = son
+        self._gelenler = queue.Queue()
+        self._dur = threading.Event()
+        threading.Thread(target=self._dongu, name="degisiklik-dinleyici", daemon=True).start()
+
+    def bekleyenler(self) -> List[stok_veri.Degisiklik]:
+        """Son çağrıdan beri gelen değişiklikleri döndürür"""
+        sonuc = []
+        while True:
+            try:
+                sonuc.append(self._gelenler.get_nowait())
+            except queue.Empty:
+                return sonuc
+
+    def durdur(self) -> None:
+        self._dur.set()
+        self._conn.interrupt()
+
+    def _dongu(self) -> None:
+        while not self._dur.is_set():
+            try:
+                yanit = self._conn.istek("GET", f"/degisiklikler?son={self._son}&bekle={self.BEKLEME}",
+                                         tekrar=True)
+            except StokHatasi:
+                self._dur.wait(self.YENIDEN_DENEME)
+                continue
+            self._son = yanit["son"]
+            for degisiklik in yanit["degisiklikler"]:
+                self._gelenler.put(degisiklik)
+
+
+# ---------------------------------------------------------------------------
+# stok_veri fonksiyonlarının uzak karşılıkları
+# ---------------------------------------------------------------------------
+
+def hareket_toplamlari(conn: UzakBaglanti, filtre: stok_veri.HareketFiltresi) -> stok_veri.HareketRaporu:
+    return conn.oku("hareket_toplamlari", filtre)
+
+
+def hareket_sayfa_sinirlari(conn: UzakBaglanti, filtre: stok_veri.HareketFiltresi,
+                            sayfa_boyutu: int) -> List[Optional[list]]:
+    return conn.oku("hareket_sayfa_sinirlari", filtre, sayfa_boyutu)
+
+
+def hareket_sayfasi(conn: UzakBaglanti, filtre: stok_veri.HareketFiltresi,
+                    sonra: Optional[tuple], adet: int) -> List[tuple]:
+    return conn.oku("hareket_sayfasi", filtre, sonra, adet)
+
+
+def _sayfa_sayfa(sinirlari, sayfa, conn: UzakBaglanti, filtre) -> Iterator[tuple]:
+    """Tüm satırları IMLEC_PARCA_BOYUTU'luk sayfalar halinde üretir"""
+    for sonra in sinirlari(conn, filtre, stok_veri.IMLEC_PARCA_BOYUTU):
+        satirlar = sayfa(conn, filtre, sonra, stok_veri.IMLEC_PARCA_BOYUTU)
+        yield from (tuple(satir) for satir in satirlar)
+
+
+def hareket_satirlari(conn: UzakBaglanti, filtre: stok_veri.HareketFiltresi) -> Iterator[tuple]:
+    return _sayfa_sayfa(hareket_sayfa_sinirlari, hareket_sayfasi, conn, filtre)
+
+
+def stok_toplamlari(conn: UzakBaglanti, filtre: stok_veri.StokFiltresi) -> stok_veri.StokRaporu:
+    return conn.oku("stok_toplamlari", filtre)
+
+
+def stok_sayfa_sinirlari(conn: UzakBaglanti, filtre: stok_veri.StokFiltresi,
+                         sayfa_boyutu: int) -> List[Optional[list]]:
+    return conn.oku("stok_sayfa_sinirlari", filtre, sayfa_boyutu)
+
+
+def stok_sayfasi(conn: UzakBaglanti, filtre: stok_veri.StokFiltresi,
+                 sonra: Optional[tuple], adet: int) -> List[tuple]:
+    return conn.oku("stok_sayfasi", filtre, sonra, adet)
+
+
+def stok_satirlari(conn: UzakBaglanti, filtre: stok_veri.StokFiltresi) -> Iterator[tuple]:
+    return _sayfa_sayfa(stok_sayfa_sinirlari, stok_sayfasi, conn, filtre)
+
+
+def aylik_rapor(conn: UzakBaglanti, filtre: stok_veri.AylikFiltre) -> stok_veri.AylikRapor:
+    return conn.oku("aylik_rapor", filtre)
+
+
+def dashboard_ozeti(conn: UzakBaglanti) -> stok_veri.DashboardOzeti:
+    return conn.oku("dashboard_ozeti")
+
+
+def kategoriler(conn: UzakBaglanti) -> List[str]:
+    return conn.oku("kategoriler")
+
+
+def malzeme_adlari(conn: UzakBaglanti, arama: str = '') -> List[str]:
+    return conn.oku("malzeme_adlari", arama)
+
+
+def tedarikciler(conn: UzakBaglanti, arama: str = '') -> List[str]:
+    return conn.oku("tedarikciler", arama)
+
+
+def stoktaki_malzemeler(conn: UzakBaglanti) -> List[Tuple[str, int]]:
+    return [tuple(satir) for satir in conn.oku("stoktaki_malzemeler")]
+
+
+def stok_miktari(conn: UzakBaglanti, malzeme_adi: str) -> Optional[int]:
+    return conn.oku("stok_miktari", malzeme_adi)
+
+
+def malzeme_ekle(conn: UzakBaglanti, ad: str, fiyat: float, adet: int, kdv_orani: float,
+                 tarih: date, kategori: Optional[str] = None, tedarikci: Optional[str] = None,
+                 yayin=None) -> stok_veri.GirisTutarlari:
+    return conn.yaz("giris", ad=ad, fiyat=fiyat, adet=adet, kdv_orani=kdv_orani, tarih=tarih,
+                    kategori=kategori, tedarikci=tedarikci)
+
+
+def malzeme_cikisi_yap(conn: UzakBaglanti, malzeme_adi: str, miktar: int, personel: str,
+                       tarih: date, aciklama: Optional[str] = None, yayin=None) -> int:
+    return conn.yaz("cikis", malzeme_adi=malzeme_adi, miktar=miktar, personel=personel,
+                    tarih=tarih, aciklama=aciklama)
+
+
+def cikis_fisi_yap(conn: UzakBaglanti, personel: str, tarih: date,
+                   satirlar: List[stok_veri.CikisSatiri], yayin=None) -> List[int]:
+    return conn.yaz("cikis_fisi", personel=personel, tarih=tarih, satirlar=satirlar)
+
+
+def kategori_ekle(conn: UzakBaglanti, kategori: str, yayin=None) -> None:
+    conn.yaz("kategori_ekle", kategori=kategori)
+
+
+def kategori_sil(conn: UzakBaglanti, kategori: str, yayin=None) -> None:
+    conn.yaz("kategori_sil", kategori=kategori)
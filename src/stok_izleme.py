@@ -0,0 +1,278 @@
+"""Sorgu izleme: yavaş sorgu günlüğü ve sorgu istatistikleri
+
+IzlenenBaglanti fabrikasıyla açılıp bir SorguIzleyici'ye bağlanan
+bağlantılarda her ifadenin metni, parametre biçimi, satır sayısı ve süresi
+kaydedilir. Süre execute'tan son satırın okunmasına (veya imlecin
+bırakılmasına) kadar ölçülür; satırları parça parça okunan rapor
+sorgularının gerçek maliyeti de böylece görünür. Eşiği aşan ifadelerin
+EXPLAIN QUERY PLAN çıktısı alınır ve dönen (rotating) günlük dosyasına
+yazılır. İzleyici bağlı değilse bağlantı düz sqlite3 imleçleri verir.
+"""
+import logging
+import logging.handlers
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+# Bu süreyi (ms) aşan ifadeler planıyla birlikte günlüğe yazılır
+VARSAYILAN_ESIK_MS = 200.0
+
+# Günlük dosyası bu boyuta ulaşınca döndürülür; bu kadar eski dosya saklanır
+GUNLUK_BOYUTU = 1024 * 1024
+GUNLUK_SAYISI = 3
+
+# İstatistiği tutulan en fazla farklı ifade; aşılınca en az süre harcayan atılır
+IFADE_SINIRI = 500
+
+# Planı alınabilen ifadeler (PRAGMA, BEGIN, SAVEPOINT, CREATE vb. alınmaz)
+_PLANLANABILIR = re.compile(r"^\s*(SELECT|WITH|INSERT|UPDATE|DELETE|REPLACE)\b", re.IGNORECASE)
+
+
+def ifadeyi_sadelestir(sorgu: str) -> str:
+    """İfade metnini tek satıra indirir (istatistik anahtarı)"""
+    return re.sub(r"\s+", " ", sorgu).strip()
+
+
+def parametre_bicimi(parametreler) -> str:
+    """Parametrelerin değerlerini değil türlerini gösterir: (str, int)"""
+    if not parametreler:
+        return "()"
+    if isinstance(parametreler, dict):
+        return "{" + ", ".join(f"{ad}: {type(deger).__name__}" for ad, deger in parametreler.items()) + "}"
+    return "(" + ", ".join(type(deger).__name__ for deger in parametreler) + ")"
+
+
+def sorgu_plani(conn: sqlite3.Connection, sorgu: str, parametreler=()) -> Optional[str]:
+    """İfadenin EXPLAIN QUERY PLAN çıktısını girintili metin olarak döndürür
+
+    Plan izlenmeyen bir imleçle alınır; ifade çalıştırılmaz. Planı
+    alınamayan ifadeler için None döner.
+    """
+    if not _PLANLANABILIR.match(sorgu):
+        return None
+    try:
+        satirlar = sqlite3.Cursor(conn).execute("EXPLAIN QUERY PLAN " + sorgu, parametreler).fetchall()
+    except sqlite3.Error:
+        return None
+    derinlik = {0: -1}
+    cikti = []
+    for dugum, ust, _, ayrinti in satirlar:
+        derinlik[dugum] = derinlik.get(ust, -1) + 1
+        cikti.append("  " * derinlik[dugum] + ayrinti)
+    return "\n".join(cikti)
+
+
+@dataclass
+class SorguIstatistigi:
+    """Aynı ifadenin tüm çalışmalarının özeti"""
+    sorgu: str
+    sayi: int = 0
+    toplam_ms: float = 0.0
+    en_uzun_ms: float = 0.0
+    satir: int = 0
+    parametreler: str = "()"
+    plan: Optional[str] = None  # Eşiği aşan en yavaş çalışmanın planı
+
+    @property
+    def ortalama_ms(self) -> float:
+        return self.toplam_ms / self.sayi if self.sayi else 0.0
+
+
+class SorguIzleyici:
+    """İfade istatistiklerini toplar, eşiği aşanları planıyla günlüğe yazar
+
+    Birden çok iş parçacığındaki bağlantılardan aynı anda çağrılabilir.
+    """
+
+    def __init__(self, esik_ms: float = VARSAYILAN_ESIK_MS, gunluk_yolu: Optional[str] = None):
+        self.esik_ms = esik_ms
+        self.etkin = True
+        self._kilit = threading.Lock()
+        self._istatistikler = {}
+        self._gunluk = None
+        if gunluk_yolu:
+            self.gunluk_ac(gunluk_yolu)
+
+    def gunluk_ac(self, yol: str) -> None:
+        """Yavaş ifadelerin yazılacağı dönen günlük dosyasını açar"""
+        isleyici = logging.handlers.RotatingFileHandler(
+            yol, maxBytes=GUNLUK_BOYUTU, backupCount=GUNLUK_SAYISI, encoding="utf-8", delay=True)
+        isleyici.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        gunluk = logging.Logger("stok_izleme")
+        gunluk.addHandler(isleyici)
+        self.gunluk_kapat()
+        self._gunluk = gunluk
+
+    def gunluk_kapat(self) -> None:
+        if self._gunluk:
+            for isleyici in self._gunluk.handlers:
+                isleyici.close()
+            self._gunluk = None
+
+    def kaydet(self, conn: sqlite3.Connection, sorgu: str, parametreler: str,
+               satir: int, sure_ms: float, plan_parametreleri=()) -> None:
+        """Bir ifade çalışmasını kaydeder; eşiği aştıysa planını alıp günlüğe yazar"""
+        plan = sorgu_plani(conn, sorgu, plan_parametreleri) if sure_ms >= self.esik_ms else None
+        anahtar = ifadeyi_sadelestir(sorgu)
+        with self._kilit:
+            ist = self._istatistikler.get(anahtar)
+            if ist is None:
+                if len(self._istatistikler) >= IFADE_SINIRI:
+                    en_az = min(self._istatistikler.values(), key=lambda i: i.toplam_ms)
+                    del self._istatistikler[en_az.sorgu]
+                ist = self._istatistikler[anahtar] = SorguIstatistigi(anahtar)
+            ist.sayi += 1
+            ist.toplam_ms += sure_ms
+            ist.satir += satir
+            ist.parametreler = parametreler
+            if sure_ms > ist.en_uzun_ms:
+                ist.en_uzun_ms = sure_ms
+                if plan is not None:
+                    ist.plan = plan
+
+        if sure_ms >= self.esik_ms and self._gunluk:
+            self._gunluk.warning(
+                "%.1f ms, %d satır, parametreler %s\n  %s\n%s", sure_ms, satir, parametreler, anahtar,
+                "\n".join("    " + s for s in (plan or "(plan yok)").splitlines()))
+
+    def en_yavaslar(self, adet: int = 20) -> List[SorguIstatistigi]:
+        """En uzun tek çalışma süresine göre ilk ifadeler"""
+        with self._kilit:
+            return sorted(self._istatistikler.values(), key=lambda i: i.en_uzun_ms, reverse=True)[:adet]
+
+    def en_siklar(self, adet: int = 20) -> List[SorguIstatistigi]:
+        """Çalışma sayısına göre ilk ifadeler"""
+        with self._kilit:
+            return sorted(self._istatistikler.values(), key=lambda i: i.sayi, reverse=True)[:adet]
+
+    def sifirla(self) -> None:
+        with self._kilit:
+            self._istatistikler.clear()
+
+
+class IzlenenImlec(sqlite3.Cursor):
+    """Çalıştırdığı ifadenin süresini ve okunan satırları izleyiciye bildiren imleç
+
+    Kayıt, satırlar tükendiğinde, imleç yeni ifade çalıştırdığında, kapatıldığında
+    veya bırakıldığında tamamlanır.
+    """
+
+    def __init__(self, conn):
+        super().__init__(conn)
+        self._acik = None  # [sorgu, parametreler, biçim, süre (s), satır]
+
+    def execute(self, sql, parameters=()):
+        self._bitir()
+        baslangic = time.perf_counter()
+        super().execute(sql, parameters)
+        self._acik = [sql, parameters, parametre_bicimi(parameters), time.perf_counter() - baslangic, 0]
+        if self.description is None:
+            # Satır döndürmeyen ifade burada biter
+            self._acik[4] = max(self.rowcount, 0)
+            self._bitir()
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._bitir()
+        if isinstance(seq_of_parameters, (list, tuple)):
+            bicim = f"{len(seq_of_parameters)} × " + (
+                parametre_bicimi(seq_of_parameters[0]) if seq_of_parameters else "()")
+            ornek = seq_of_parameters[0] if seq_of_parameters else ()
+        else:
+            bicim, ornek = "üreteç", None
+        baslangic = time.perf_counter()
+        super().executemany(sql, seq_of_parameters)
+        self._acik = [sql, ornek, bicim, time.perf_counter() - baslangic, max(self.rowcount, 0)]
+        self._bitir()
+        return self
+
+    def _olc(self, okuma, *args):
+        if self._acik is None:
+            return okuma(*args)
+        baslangic = time.perf_counter()
+        try:
+            return okuma(*args)
+        finally:
+            self._acik[3] += time.perf_counter() - baslangic
+
+    def __next__(self):
+        try:
+            satir = self._olc(super().__next__)
+        except StopIteration:
+            self._bitir()
+            raise
+        if self._acik is not None:
+            self._acik[4] += 1
+        return satir
+
+    def fetchone(self):
+        satir = self._olc(super().fetchone)
+        if self._acik is not None:
+            if satir is None:
+                self._bitir()
+            else:
+                self._acik[4] += 1
+        return satir
+
+    def fetchmany(self, size=None):
+        satirlar = self._olc(super().fetchmany, self.arraysize if size is None else size)
+        if self._acik is not None:
+            self._acik[4] += len(satirlar)
+            if not satirlar:
+                self._bitir()
+        return satirlar
+
+    def fetchall(self):
+        satirlar = self._olc(super().fetchall)
+        if self._acik is not None:
+            self._acik[4] += len(satirlar)
+            self._bitir()
+        return satirlar
+
+    def close(self):
+        self._bitir()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._bitir()
+        except Exception:
+            pass
+
+    def _bitir(self):
+        """Açık kaydı izleyiciye bildirir (bağlantı izleyicisi kaldırılmışsa atlar)"""
+        acik, self._acik = self._acik, None
+        if acik is None:
+            return
+        izleyici = self.connection.izleyici
+        if izleyici is None or not izleyici.etkin:
+            return
+        sorgu, parametreler, bicim, sure, satir = acik
+        izleyici.kaydet(self.connection, sorgu, bicim, satir, sure * 1000,
+                        parametreler if parametreler is not None else ())
+
+
+class IzlenenBaglanti(sqlite3.Connection):
+    """sqlite3.connect(..., factory=IzlenenBaglanti) ile açılan izlenebilir bağlantı
+
+    izleyici atanıp etkin olduğu sürece execute/executemany ve cursor() izlenen
+    imleç verir; aksi halde düz sqlite3 imleçleriyle ek yük olmadan çalışır.
+    """
+    izleyici: Optional[SorguIzleyici] = None
+
+    def cursor(self, factory=None):
+        if factory is None:
+            izleyici = self.izleyici
+            factory = IzlenenImlec if izleyici is not None and izleyici.etkin else sqlite3.Cursor
+        return super().cursor(factory)
+
+    # Connection.execute imlecin execute'unu C içinden çağırır; izlenen
+    # imlecin execute'u çalışsın diye imleç üzerinden yönlendirilir
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
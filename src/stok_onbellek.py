@@ -0,0 +1,107 @@
+"""Sürümlü sorgu sonucu önbelleği
+
+Rapor sonuçları (rapor türü, normalleştirilmiş filtre) anahtarıyla ve
+hesaplandıkları veritabanı sürümüyle birlikte saklanır. Sürüm iki parçadan
+oluşur:
+  * veri sürümü: BaglantiYoneticisi.veri_surumu(), yani ayrı bir izleme
+    bağlantısındaki PRAGMA data_version. Bu bağlantı dışındaki her bağlantının
+    (uygulamanın yazma bağlantısı, başka bir süreç) her commit'inde değişir.
+  * yazma nesli: yazma yolunun her değişiklik bildiriminde degisti() ile
+    artırdığı sayaç. Sunucu kipinde yerel veri sürümü olmadığından tek
+    kaynak budur; başka istemcilerin yazmaları değişiklik akışıyla gelir.
+Sürüm değişince tüm kayıtlar geçersizdir ve önbellek boşaltılır. Sürüm
+sorgudan önce okunur: sorgu sürerken yapılan bir commit, sonucu eski sürümle
+etiketler ve bir sonraki okumada ıskalanır (hiçbir zaman eski veri verilmez).
+
+Önbellek yalnızca tek (Tk) iş parçacığında kullanılır; kayıtlar en son
+kullanılma sırasıyla tutulur ve tahmini boyut sınırı aşılınca en eskiler atılır.
+Saklanan sonuçlar çağıranlarla paylaşılır, değiştirilmemelidir.
+"""
+import dataclasses
+import sys
+from collections import OrderedDict
+from typing import Callable, Hashable, Tuple
+
+# Önbellekteki sonuçların tahmini toplam boyutu için üst sınır
+ONBELLEK_SINIRI = 16 * 1024 * 1024
+
+
+def boyut_tahmini(deger, _gorulen=None) -> int:
+    """Değerin (iç içe liste, demet, sözlük, dataclass) yaklaşık bellek boyutu (bayt)"""
+    if _gorulen is None:
+        _gorulen = set()
+    if id(deger) in _gorulen:
+        return 0
+    _gorulen.add(id(deger))
+    boyut = sys.getsizeof(deger)
+    if isinstance(deger, (list, tuple, set, frozenset)):
+        boyut += sum(boyut_tahmini(oge, _gorulen) for oge in deger)
+    elif isinstance(deger, dict):
+        boyut += sum(boyut_tahmini(k, _gorulen) + boyut_tahmini(v, _gorulen) for k, v in deger.items())
+    elif dataclasses.is_dataclass(deger) and not isinstance(deger, type):
+        boyut += sum(boyut_tahmini(getattr(deger, f.name), _gorulen) for f in dataclasses.fields(deger))
+    return boyut
+
+
+class SorguOnbellegi:
+    """Veritabanı sürümüyle doğrulanan LRU sorgu sonucu önbelleği"""
+
+    def __init__(self, veri_surumu: Callable[[], int], sinir: int = ONBELLEK_SINIRI):
+        self._veri_surumu = veri_surumu
+        self.sinir = sinir
+        self.yazma_nesli = 0
+        self._surum = None
+        self._kayitlar = OrderedDict()  # anahtar -> (sonuç, boyut)
+        self._boyut = 0
+        self._istatistik = {'isabet': 0, 'iska': 0, 'gecersiz': 0}
+
+    def surum(self) -> Tuple[int, int]:
+        """Şu anki veritabanı sürümü; sorgu başlamadan önce alınır"""
+        return self._veri_surumu(), self.yazma_nesli
+
+    def degisti(self) -> None:
+        """Yazma yolu her değişiklikte çağırır"""
+        self.yazma_nesli += 1
+
+    def _surumu_dogrula(self, surum) -> None:
+        if surum != self._surum:
+            if self._kayitlar:
+                self._istatistik['gecersiz'] += 1
+            self._kayitlar.clear()
+            self._boyut = 0
+            self._surum = surum
+
+    def getir(self, anahtar: Hashable, surum) -> Tuple[bool, object]:
+        """(bulundu, sonuç); sonuç yalnızca aynı sürümde hesaplandıysa bulunur"""
+        self._surumu_dogrula(surum)
+        kayit = self._kayitlar.get(anahtar)
+        if kayit is None:
+            self._istatistik['iska'] += 1
+            return False, None
+        self._kayitlar.move_to_end(anahtar)
+        self._istatistik['isabet'] += 1
+        return True, kayit[0]
+
+    def koy(self, anahtar: Hashable, surum, sonuc) -> None:
+        """surum'de başlatılmış sorgunun sonucunu saklar (sürüm o arada değiştiyse saklamaz)"""
+        if surum != self._surum:
+            return
+        boyut = boyut_tahmini(sonuc)
+        if boyut > self.sinir:
+            return
+        eski = self._kayitlar.pop(anahtar, None)
+        if eski is not None:
+            self._boyut -= eski[1]
+        self._kayitlar[anahtar] = (sonuc, boyut)
+        self._boyut += boyut
+        while self._boyut > self.sinir:
+            _, (_, atilan) = self._kayitlar.popitem(last=False)
+            self._boyut -= atilan
+
+    def temizle(self) -> None:
+        self._kayitlar.clear()
+        self._boyut = 0
+
+    def istatistik(self) -> dict:
+        """İsabet/ıska sayıları, geçersizleştirme sayısı, kayıt sayısı ve tahmini boyut"""
+        return dict(self._istatistik, kayit=len(self._kayitlar), bayt=self._boyut)
@@ -0,0 +1,246 @@
+"""Çok istemcili yerel stok sunucusu
+
+Birden çok bilgisayardaki depo görevlilerinin aynı veritabanıyla çalışması
+için isteğe bağlı sunucu kipi. Veritabanı yalnızca sunucunun bilgisayarında
+durur; istemciler (stok_istemci) HTTP üzerinden JSON ile konuşur.
+
+    python stok_sunucu.py --db stop_takip.db --adres 0.0.0.0 --port 8750
+
+Okumalar her istek iş parçacığında bağlantı havuzundan alınan salt okunur
+bağlantılarla eşzamanlı çalışır. Yazmalar tek bir kuyrukta sıralanır ve toplu
+commit edilir (stok_yazma). Her başarılı yazmanın değişikliği sıra numarasıyla
+değişiklik akışına eklenir; istemciler /degisiklikler üzerinden uzun yoklamayla
+(long polling) izleyip görünümlerini yeniler.
+
+Uç noktalar:
+    GET  /durum                       sunucu, şema ve son değişiklik sırası
+    GET  /degisiklikler?son=N&bekle=S  N'den sonraki değişiklikler (en fazla S sn bekler)
+    POST /oku/<fonksiyon>             stok_veri okuma fonksiyonu; gövde: {"args": [...]}
+    POST /yaz/<komut>                 stok_yazma komutu; gövde: {parametreler}, yanıt
+                                      commit'ten sonra kalıcılık düzeyiyle döner
+
+Tarihler ve stok_veri veri sınıfları JSON'da türleriyle işaretlenir (kodla/coz).
+İş kuralı hataları 409, hatalı istekler 400 koduyla {"hata": mesaj} döner.
+"""
+import argparse
+import dataclasses
+import json
+import os
+import sqlite3
+import sys
+import threading
+from collections import deque
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import stok_veri
+from stok_baglanti import PROFILLER, VARSAYILAN_PROFIL, BaglantiYoneticisi
+from stok_yazma import KOMUTLAR, YazmaKuyrugu
+
+VARSAYILAN_PORT = 8750
+
+# İstemcilerin çağırabildiği okuma fonksiyonları (ilk parametreleri bağlantıdır)
+OKUMALAR = {
+    fonksiyon.__name__: fonksiyon for fonksiyon in (
+        stok_veri.hareket_toplamlari, stok_veri.hareket_sayfa_sinirlari, stok_veri.hareket_sayfasi,
+        stok_veri.stok_toplamlari, stok_veri.stok_sayfa_sinirlari, stok_veri.stok_sayfasi,
+        stok_veri.aylik_rapor, stok_veri.dashboard_ozeti,
+        stok_veri.kategoriler, stok_veri.malzeme_adlari, stok_veri.tedarikciler,
+        stok_veri.stoktaki_malzemeler, stok_veri.stok_miktari,
+    )
+}
+
+# JSON'da türüyle taşınan veri sınıfları
+VERI_SINIFLARI = {
+    sinif.__name__: sinif for sinif in (
+        stok_veri.HareketFiltresi, stok_veri.HareketRaporu,
+        stok_veri.StokFiltresi, stok_veri.StokRaporu,
+        stok_veri.AylikFiltre, stok_veri.AylikRapor, stok_veri.DashboardOzeti,
+        stok_veri.GirisTutarlari, stok_veri.CikisSatiri, stok_veri.Degisiklik,
+    )
+}
+
+# Akışta tutulan son değişiklik sayısı; daha eski sıradan soran istemci tümünü yeniler
+AKIS_UZUNLUGU = 1000
+
+
+def _json_hazirla(deger):
+    """Tarihleri ve veri sınıflarını türleri işaretli sözlüklere çevirir"""
+    if isinstance(deger, date):
+        return {"$tarih": deger.isoformat()}
+    if dataclasses.is_dataclass(deger) and type(deger).__name__ in VERI_SINIFLARI:
+        alanlar = {alan.name: _json_hazirla(getattr(deger, alan.name))
+                   for alan in dataclasses.fields(deger)}
+        return {"$tur": type(deger).__name__, **alanlar}
+    if isinstance(deger, (list, tuple)):
+        return [_json_hazirla(d) for d in deger]
+    if isinstance(deger, dict):
+        return {k: _json_hazirla(d) for k, d in deger.items()}
+    return deger
+
+
+def _json_nesnesi(sozluk):
+    if "$tarih" in sozluk:
+        return date.fromisoformat(sozluk["$tarih"])
+    if "$tur" in sozluk:
+        sozluk = dict(sozluk)
+        sinif = VERI_SINIFLARI[sozluk.pop("$tur")]
+        return sinif(**sozluk)
+    return sozluk
+
+
+def kodla(deger) -> bytes:
+    """Değeri istek/yanıt gövdesi olarak kodlar"""
+    return json.dumps(_json_hazirla(deger), ensure_ascii=False).encode("utf-8")
+
+
+def coz(veri: bytes):
+    """kodla() ile kodlanmış gövdeyi çözer"""
+    return json.loads(veri.decode("utf-8"), object_hook=_json_nesnesi) if veri else None
+
+
+class DegisiklikAkisi:
+    """Sıra numaralı son değişiklikler; yeni değişiklik gelene kadar bekletebilir"""
+
+    def __init__(self, uzunluk: int = AKIS_UZUNLUGU):
+        self._kayitlar = deque(maxlen=uzunluk)
+        self._son = 0
+        self._kosul = threading.Condition()
+
+    @property
+    def son(self) -> int:
+        """En son değişikliğin sıra numarası"""
+        return self._son
+
+    def yayinla(self, degisiklik: stok_veri.Degisiklik) -> None:
+        with self._kosul:
+            self._son += 1
+            self._kayitlar.append((self._son, degisiklik))
+            self._kosul.notify_all()
+
+    def bekle(self, son: int, zaman_asimi: float) -> Tuple[int, List[stok_veri.Degisiklik]]:
+        """son'dan sonraki değişiklikleri döndürür; yoksa zaman_asimi kadar bekler"""
+        with self._kosul:
+            self._kosul.wait_for(lambda: self._son != son, zaman_asimi)
+            if son > self._son or (self._kayitlar and son < self._kayitlar[0][0] - 1):
+                # Sunucu yeniden başlamış veya istemci çok geride: tümünü yenilesin
+                return self._son, [stok_veri.Degisiklik('tumu')]
+            return self._son, [d for sira, d in self._kayitlar if sira > son]
+
+
+class StokSunucusu(ThreadingHTTPServer):
+    """Okumaları eşzamanlı, yazmaları tek kuyrukta işleyen HTTP sunucusu"""
+    daemon_threads = True
+    ayrintili = False   # Her isteği günlüğe yaz
+
+    def __init__(self, adres: Tuple[str, int], db_path: str,
+                 profil=PROFILLER[VARSAYILAN_PROFIL]):
+        self.baglantilar = BaglantiYoneticisi(db_path, profil)
+        self.akis = DegisiklikAkisi()
+        self.yazma = YazmaKuyrugu(self.baglantilar, yayin=self.akis)
+        super().__init__(adres, _IstekIsleyici)
+
+    def server_close(self):
+        super().server_close()
+        self.yazma.kapat()
+        self.baglantilar.yeniden_ac()
+        self.baglantilar.yazici.close()
+
+
+class _IstekIsleyici(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True   # Başlık ve gövde ayrı yazılır; gecikmeli ACK beklenmesin
+    server: StokSunucusu
+
+    # Uzun yoklamada bir istekte beklenecek en uzun süre (sn)
+    EN_UZUN_BEKLEME = 30
+
+    def do_GET(self):
+        adres = urlsplit(self.path)
+        if adres.path == "/durum":
+            with self.server.baglantilar.okuyucu() as conn:
+                surum = conn.execute("PRAGMA user_version").fetchone()[0]
+            self._yanit(200, {"sema_surumu": surum, "profil": self.server.baglantilar.profil.ad,
+                              "son": self.server.akis.son})
+        elif adres.path == "/degisiklikler":
+            sorgu = parse_qs(adres.query)
+            try:
+                son = int(sorgu.get("son", ["0"])[0])
+                bekle = min(float(sorgu.get("bekle", ["0"])[0]), self.EN_UZUN_BEKLEME)
+            except ValueError:
+                self._yanit(400, {"hata": "Geçersiz parametre"})
+                return
+            son, degisiklikler = self.server.akis.bekle(son, bekle)
+            self._yanit(200, {"son": son, "degisiklikler": degisiklikler})
+        else:
+            self._yanit(404, {"hata": f"Bilinmeyen adres: {adres.path}"})
+
+    def do_POST(self):
+        uzunluk = int(self.headers.get("Content-Length") or 0)
+        try:
+            govde = coz(self.rfile.read(uzunluk)) or {}
+        except (ValueError, KeyError, TypeError) as e:
+            self._yanit(400, {"hata": f"Geçersiz istek gövdesi: {e}"})
+            return
+
+        _, tur, ad = (urlsplit(self.path).path.split("/", 2) + ["", ""])[:3]
+        try:
+            if tur == "oku" and ad in OKUMALAR:
+                with self.server.baglantilar.okuyucu() as conn:
+                    sonuc = OKUMALAR[ad](conn, *govde.get("args", []))
+            elif tur == "yaz" and ad in KOMUTLAR:
+                yazma = self.server.yazma.calistir(ad, **govde)
+                self._yanit(200, {"sonuc": yazma.deger, "kalicilik": yazma.kalicilik,
+                                  "parti": yazma.parti, "parti_boyutu": yazma.parti_boyutu})
+                return
+            else:
+                self._yanit(404, {"hata": f"Bilinmeyen işlem: {self.path}"})
+                return
+        except stok_veri.StokHatasi as e:
+            self._yanit(409, {"hata": str(e)})
+        except TypeError as e:
+            self._yanit(400, {"hata": str(e)})
+        except sqlite3.Error as e:
+            self._yanit(500, {"hata": f"Veritabanı hatası: {e}"})
+        else:
+            self._yanit(200, {"sonuc": sonuc})
+
+    def _yanit(self, kod: int, icerik) -> None:
+        veri = kodla(icerik)
+        self.send_response(kod)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(veri)))
+        self.end_headers()
+        self.wfile.write(veri)
+
+    def log_message(self, format, *args):
+        if self.server.ayrintili:
+            super().log_message(format, *args)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stok takip çok istemcili sunucu")
+    parser.add_argument("--db", default="stop_takip.db", help="Veritabanı dosyası")
+    parser.add_argument("--adres", default="127.0.0.1",
+                        help="Dinlenecek adres (yerel ağ için 0.0.0.0)")
+    parser.add_argument("--port", type=int, default=VARSAYILAN_PORT)
+    parser.add_argument("--profil", choices=list(PROFILLER), default=VARSAYILAN_PROFIL,
+                        help="Depolama profili")
+    parser.add_argument("--ayrintili", action="store_true", help="Her isteği günlüğe yaz")
+    args = parser.parse_args(argv)
+
+    sunucu = StokSunucusu((args.adres, args.port), os.path.abspath(args.db), PROFILLER[args.profil])
+    sunucu.ayrintili = args.ayrintili
+    print(f"Stok sunucusu: http://{args.adres}:{args.port} ({args.db}, {args.profil})", file=sys.stderr)
+    try:
+        sunucu.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sunucu.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Sunucu ve istemcileri tek bilgisayarda çalıştıran deneme düzeneği
+
+Örnek kullanım:
+
+    python stok_sunucu_deneme.py --istemci 8 --islem 500
+
+Geçici bir veritabanıyla stok_sunucu başlatılır (veya --adres ile çalışan bir
+sunucuya bağlanılır), her biri kendi HTTP bağlantısını kullanan istemci iş
+parçacıkları karışık giriş, çıkış ve rapor istekleri gönderir. Sonunda
+işlem sayıları, gecikme yüzdelikleri, değişiklik akışından alınan bildirim
+sayısı ve veritabanı tutarlılık denetimleri JSON olarak yazdırılır.
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+import stok_istemci
+import stok_veri
+from stok_benchmark import yuzdelik
+from stok_sunucu import StokSunucusu
+
+
+def istemci_calistir(adres, no, islem, malzemeler, sonuclar):
+    """Bir istemcinin rastgele giriş/çıkış/rapor isteklerini gönderir"""
+    rnd = random.Random(no)
+    conn = stok_istemci.UzakBaglanti(adres)
+    bugun = date.today()
+    filtre = stok_veri.HareketFiltresi(bugun - timedelta(days=30), bugun)
+    try:
+        for _ in range(islem):
+            secim = rnd.random()
+            malzeme = rnd.choice(malzemeler)
+            t0 = time.perf_counter()
+            try:
+                if secim < 0.5:
+                    tur = "giris"
+                    stok_istemci.malzeme_ekle(conn, malzeme, round(rnd.uniform(1, 100), 2),
+                                              rnd.randint(1, 20), 0.2, bugun, "Deneme", f"Tedarikçi {no}")
+                elif secim < 0.8:
+                    tur = "cikis"
+                    stok_istemci.malzeme_cikisi_yap(conn, malzeme, rnd.randint(1, 10),
+                                                    f"Personel {no}", bugun)
+                else:
+                    tur = "okuma"
+                    stok_istemci.hareket_toplamlari(conn, filtre)
+                    stok_istemci.hareket_sayfasi(conn, filtre, None, 200)
+                durum = "basarili"
+            except stok_istemci.SunucuHatasi:
+                durum = "hata"
+            except stok_veri.StokHatasi:
+                durum = "reddedildi"   # Yetersiz stok: beklenen iş kuralı hatası
+            sonuclar.append((tur, durum, (time.perf_counter() - t0) * 1000))
+    finally:
+        conn.close()
+
+
+def tutarlilik_denetle(db_path):
+    """Türetilmiş stok değerlerinin hareketlerle tutarlı olduğunu denetler"""
+    conn = sqlite3.connect(db_path)
+    try:
+        return {
+            "stok_lotlarla_uyumsuz": conn.execute("""
+                SELECT COUNT(*) FROM mevcut_stok ms
+                WHERE ms.toplam_adet != (SELECT COALESCE(SUM(kalan_adet), 0)
+                                         FROM malzeme_girisleri WHERE malzeme_id = ms.malzeme_id)
+            """).fetchone()[0],
+            "negatif_stok": conn.execute(
+                "SELECT COUNT(*) FROM mevcut_stok WHERE toplam_adet < 0").fetchone()[0],
+            "dagilimsiz_cikis": conn.execute("""
+                SELECT COUNT(*) FROM malzeme_cikislari mc
+                WHERE mc.cikis_adedi != (SELECT COALESCE(SUM(adet), 0)
+                                         FROM cikis_dagilimlari WHERE cikis_id = mc.id)
+            """).fetchone()[0],
+            "giris": conn.execute("SELECT COUNT(*) FROM malzeme_girisleri").fetchone()[0],
+            "cikis": conn.execute("SELECT COUNT(*) FROM malzeme_cikislari").fetchone()[0],
+            "quick_check": conn.execute("PRAGMA quick_check").fetchone()[0],
+        }
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stok sunucusu çok istemcili deneme")
+    parser.add_argument("--adres", help="Çalışan sunucu (varsayılan: geçici veritabanıyla yerel sunucu)")
+    parser.add_argument("--istemci", type=int, default=8, help="Eşzamanlı istemci sayısı")
+    parser.add_argument("--islem", type=int, default=300, help="İstemci başına istek sayısı")
+    parser.add_argument("--malzeme", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    malzemeler = [f"Deneme Malzeme {i:03d}" for i in range(args.malzeme)]
+    sunucu = db_path = None
+    adres = args.adres
+    if not adres:
+        db_path = os.path.join(tempfile.mkdtemp(prefix="stok_sunucu_"), "deneme.db")
+        stok_veri.connect(db_path).close()
+        sunucu = StokSunucusu(("127.0.0.1", 0), db_path)
+        threading.Thread(target=sunucu.serve_forever, daemon=True).start()
+        adres = f"127.0.0.1:{sunucu.server_address[1]}"
+    print(f"Sunucu: {adres}", file=sys.stderr)
+
+    # Değişiklik akışı, yazmaların tüm istemcilere ulaştığını doğrulamak için izlenir
+    baglantilar = stok_istemci.UzakBaglantilar(adres)
+    dinleyici = stok_istemci.DegisiklikDinleyici(adres, baglantilar.durum["son"])
+
+    sonuclar = []
+    baslangic = time.perf_counter()
+    istemciler = [threading.Thread(target=istemci_calistir,
+                                   args=(adres, no, args.islem, malzemeler, sonuclar))
+                  for no in range(args.istemci)]
+    for istemci in istemciler:
+        istemci.start()
+    for istemci in istemciler:
+        istemci.join()
+    sure = time.perf_counter() - baslangic
+
+    # Son yazmaların bildirimleri için kısa bekleme
+    bildirim = 0
+    yazma = sum(1 for tur, durum, _ in sonuclar if tur != "okuma" and durum == "basarili")
+    son_an = time.monotonic() + 5
+    while bildirim < yazma and time.monotonic() < son_an:
+        bildirim += len(dinleyici.bekleyenler())
+        time.sleep(0.05)
+    dinleyici.durdur()
+    baglantilar.kapat()
+
+    ozet = {"istemci": args.istemci, "istek": len(sonuclar), "sure_sn": round(sure, 3),
+            "istek_sn": round(len(sonuclar) / sure, 1), "bildirim": bildirim, "turler": {}}
+    for tur in ("giris", "cikis", "okuma"):
+        sureler = sorted(ms for t, _, ms in sonuclar if t == tur)
+        durumlar = [d for t, d, _ in sonuclar if t == tur]
+        if not sureler:
+            continue
+        ozet["turler"][tur] = {
+            **{d: durumlar.count(d) for d in set(durumlar)},
+            "p50_ms": round(yuzdelik(sureler, 0.50), 2),
+            "p99_ms": round(yuzdelik(sureler, 0.99), 2),
+        }
+
+    if sunucu:
+        sunucu.shutdown()
+        sunucu.server_close()
+        ozet["denetim"] = tutarlilik_denetle(db_path)
+        ozet["denetim"]["bildirim_eksik"] = yazma - bildirim
+    print(json.dumps(ozet, ensure_ascii=False, indent=2))
+
+    hatali = sum(1 for _, durum, _ in sonuclar if durum == "hata")
+    denetim = ozet.get("denetim", {})
+    if hatali or denetim.get("stok_lotlarla_uyumsuz") or denetim.get("negatif_stok") \
+            or denetim.get("dagilimsiz_cikis") or denetim.get("bildirim_eksik") \
+            or denetim.get("quick_check", "ok") != "ok":
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,30 @@
+import time
+_ACILIS = time.perf_counter()  # Açılış süresi ölçümü (--baslangic-olc) için
+
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-from datetime import datetime, timedelta
+from datetime import datetime
 import sqlite3
 import os
 import sys
 import locale
 from tkcalendar import DateEntry
-import shutil
-import pandas as pd
+import queue
+import threading
+import json
+from collections import OrderedDict
+from contextlib import nullcontext
+
+import stok_veri
+from stok_veri import StokHatasi
+from stok_arama import AramaIndeksi
+import stok_aktarim
+import stok_yedek
+import stok_baglanti
+import stok_yazma
+import stok_izleme
+import stok_zamanlama
+import stok_onbellek
 
 # PyInstaller için önemli: Kaynak dosya yolunu belirleme
 def resource_path(relative_path):
@@ -19,6 +36,11 @@ def resource_path(relative_path):
     
     return os.path.join(base_path, relative_path)
 
+# Tarih okuma (DateEntry metni dd.mm.yyyy biçimindedir)
+def parse_date(tarih):
+    """dd.mm.yyyy biçimindeki tarihi date nesnesine çevirir"""
+    return datetime.strptime(tarih, "%d.%m.%Y").date()
+
 # Uygulama veri dizini oluşturma
 def get_app_data_path():
     """Uygulama verilerinin saklanacağı dizini döndürür"""
@@ -31,6 +53,20 @@ def get_app_data_path():
         os.makedirs(app_data)
     return app_data
 
+# Kalıcı ayarlar (uygulama veri dizininde ayarlar.json)
+def ayarlari_oku():
+    """Kayıtlı ayarları döndürür; dosya yoksa veya bozuksa boş sözlük"""
+    try:
+        with open(os.path.join(get_app_data_path(), "ayarlar.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def ayarlari_yaz(ayarlar):
+    """Ayarları kaydeder"""
+    with open(os.path.join(get_app_data_path(), "ayarlar.json"), "w", encoding="utf-8") as f:
+        json.dump(ayarlar, f, ensure_ascii=False, indent=2)
+
 # Solar tema renkleri (modernleştirilmiş)
 BG_COLOR = "#002b36"       # Koyu arka plan
 PRIMARY_COLOR = "#268bd2"   # Mavi (daha canlı)
@@ -55,6 +91,483 @@ FONT_BUTTON = ("Segoe UI", 10, "bold")
 FONT_TITLE = ("Segoe UI", 16, "bold")
 FONT_SIDEBAR = ("Segoe UI", 11)
 
+class SanalTablo:
+    """Yalnızca görünen satırları oluşturan sanal (pencereli) Treeview
+    
+    Sonuç kümesi Treeview'a aktarılmaz; satırlar sayfa sayfa okunur ve son
+    birkaç sayfa bellekte tutulur. Bellekte olmayan sayfalar
+    sayfa_iste(sayfa_nolari, teslim, hata) ile arka planda istenir; gelene kadar
+    yerlerinde boş satırlar gösterilir. Treeview'da her zaman yalnızca ekrana
+    sığan kadar öğe bulunur; kaydırıldıkça bu öğelerin değerleri yenilenir.
+    """
+    SAYFA_BOYUTU = 200
+    ONBELLEK_SAYFA_SAYISI = 5
+
+    def __init__(self, parent, columns):
+        self.sutunlar = [col[0] for col in columns]
+        self.tree = ttk.Treeview(
+            parent,
+            columns=self.sutunlar,
+            show="headings",
+            selectmode="extended",
+            height=1
+        )
+
+        # Sütun başlıkları ve genişlikleri
+        for col, width in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=width, anchor=tk.CENTER)
+
+        # Scrollbar Treeview'ın kendi görünümüne değil sanal konuma bağlıdır
+        self.scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self._on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(fill=tk.BOTH, expand=True)
+
+        self.tree.bind("<Configure>", lambda event: self._ciz())
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda event: self._kaydir(-3))
+        self.tree.bind("<Button-5>", lambda event: self._kaydir(3))
+        self.tree.bind("<Prior>", lambda event: self._kaydir(-self._gorunen_satir_sayisi()))
+        self.tree.bind("<Next>", lambda event: self._kaydir(self._gorunen_satir_sayisi()))
+        self.tree.bind("<Home>", lambda event: self._git(0))
+        self.tree.bind("<End>", lambda event: self._git(self.toplam))
+
+        self.toplam = 0
+        self.ilk = 0
+        self._sayfa_iste = lambda sayfa_nolari, teslim, hata: None
+        self._sayfalar = OrderedDict()
+        self._istenen = frozenset()  # Son istekte beklenen sayfalar
+        self._nesil = 0              # Her yüklemede artar; eski isteklerin sonuçları atılır
+
+    def yukle(self, toplam, sayfa_iste, ilk_sayfa=None):
+        """Yeni sonuç kümesini bağlar ve başa döner
+        
+        sayfa_iste(sayfa_nolari, teslim, hata) sayfaları arka planda okuyup
+        teslim({sayfa_no: satirlar}) ile, okuyamazsa hata(istisna) ile Tk iş
+        parçacığında bildirmelidir.
+        """
+        self.toplam = toplam
+        self._sayfa_iste = sayfa_iste
+        self._sayfalar.clear()
+        self._istenen = frozenset()
+        self._nesil += 1
+        if ilk_sayfa is not None:
+            self._sayfalar[0] = ilk_sayfa
+        self.ilk = 0
+        self._ciz()
+
+    def temizle(self):
+        """Tabloyu boşaltır"""
+        self.yukle(0, lambda sayfa_nolari, teslim, hata: None)
+
+    def _sayfalar_geldi(self, nesil, sayfalar):
+        if nesil != self._nesil:
+            return
+        self._istenen = frozenset()
+        for sayfa_no, sayfa in sayfalar.items():
+            self._sayfalar[sayfa_no] = sayfa
+            self._sayfalar.move_to_end(sayfa_no)
+        while len(self._sayfalar) > self.ONBELLEK_SAYFA_SAYISI:
+            self._sayfalar.popitem(last=False)
+        self._ciz()
+
+    def _sayfalar_gelmedi(self, nesil):
+        # Aynı sayfalar bir sonraki çizimde yeniden istenebilsin
+        if nesil == self._nesil:
+            self._istenen = frozenset()
+
+    def _eksikleri_iste(self, eksikler):
+        """Görünen ama bellekte olmayan sayfaları ister (aynısı bekleniyorsa tekrar istemez)
+        
+        Her istek görünen tüm eksik sayfaları kapsar; böylece kaydırma sırasında
+        yerine yenisi gelip iptal edilen isteklerin sayfaları kaybolmaz.
+        """
+        if not eksikler or eksikler <= self._istenen:
+            return
+        self._istenen = frozenset(eksikler)
+        nesil = self._nesil
+        self._sayfa_iste(sorted(eksikler), lambda sayfalar: self._sayfalar_geldi(nesil, sayfalar),
+                         lambda e: self._sayfalar_gelmedi(nesil))
+
+    def _satir(self, index):
+        """index numaralı satırı döndürür; sayfası bellekte değilse sayfa numarasını"""
+        sayfa_no = index // self.SAYFA_BOYUTU
+        sayfa = self._sayfalar.get(sayfa_no)
+        if sayfa is None:
+            return sayfa_no
+        self._sayfalar.move_to_end(sayfa_no)
+        konum = index % self.SAYFA_BOYUTU
+        return sayfa[konum] if konum < len(sayfa) else None
+
+    def _gorunen_satir_sayisi(self):
+        """Treeview yüksekliğine sığan satır sayısını hesaplar"""
+        satir_yuksekligi = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        ust_bosluk = satir_yuksekligi  # Başlık yüksekliği için tahmin
+        children = self.tree.get_children()
+        if children:
+            bbox = self.tree.bbox(children[0])
+            if bbox:
+                ust_bosluk, satir_yuksekligi = bbox[1], bbox[3]
+        return max(1, (self.tree.winfo_height() - ust_bosluk) // satir_yuksekligi)
+
+    def _ciz(self):
+        """Görünen pencereyi mevcut konumdan itibaren yeniden doldurur"""
+        gorunen = self._gorunen_satir_sayisi()
+        self.ilk = max(0, min(self.ilk, self.toplam - gorunen))
+
+        satirlar = []
+        eksikler = set()
+        bos = ("",) * len(self.sutunlar)
+        for index in range(self.ilk, min(self.ilk + gorunen, self.toplam)):
+            row = self._satir(index)
+            if row is None:
+                break
+            if isinstance(row, int):
+                eksikler.add(row)
+                row = bos
+            satirlar.append(row)
+
+        # Mevcut öğeleri yeniden kullan, eksikleri ekle, fazlaları sil
+        children = self.tree.get_children()
+        self.tree.selection_remove(self.tree.selection())
+        for i, row in enumerate(satirlar):
+            if i < len(children):
+                self.tree.item(children[i], values=row)
+            else:
+                self.tree.insert("", tk.END, values=row)
+        if len(children) > len(satirlar):
+            self.tree.delete(*children[len(satirlar):])
+
+        if self.toplam:
+            self.scrollbar.set(self.ilk / self.toplam, (self.ilk + len(satirlar)) / self.toplam)
+        else:
+            self.scrollbar.set(0, 1)
+        self._eksikleri_iste(eksikler)
+
+    def _git(self, index):
+        self.ilk = index
+        self._ciz()
+        return "break"
+
+    def _kaydir(self, satir):
+        return self._git(self.ilk + satir)
+
+    def _on_mousewheel(self, event):
+        return self._kaydir(-3 if event.delta > 0 else 3)
+
+    def _on_scroll(self, *args):
+        """Scrollbar komutlarını (moveto / scroll) sanal konuma çevirir"""
+        if args[0] == "moveto":
+            self._git(int(float(args[1]) * self.toplam))
+        elif args[0] == "scroll":
+            adim = int(args[1])
+            if args[2] == "pages":
+                adim *= self._gorunen_satir_sayisi()
+            self._kaydir(adim)
+
+
+class SorguCalistirici:
+    """Rapor sorgularını arka plan iş parçacıklarında çalıştırır
+    
+    Her işçi bağlantı havuzundan kendi salt okunur bağlantısını alır. İşler bir anahtarla
+    (ör. "hareket") gönderilir: aynı anahtarla yeni iş geldiğinde eskisi
+    sıradaysa atlanır, çalışıyorsa sqlite3 interrupt ile kesilir ve sonucu
+    kullanılmaz. Sonuçlar root.after ile Tk iş parçacığında teslim edilir;
+    işçiler Tk nesnelerine hiç dokunmaz. Önbellek anahtarı verilen işlerin
+    sonucu, veritabanı sürümü değişmedikçe önbellekten hemen teslim edilir.
+    """
+    ISCI_SAYISI = 2
+    YOKLAMA_ARALIGI = 30  # ms
+
+    def __init__(self, root, baglantilar, mesgul_degisti=None, izci=None, onbellek=None):
+        self.root = root
+        self.baglantilar = baglantilar
+        self.mesgul_degisti = mesgul_degisti
+        self.izci = izci
+        self.onbellek = onbellek
+        self._isler = queue.Queue()
+        self._sonuclar = queue.Queue()
+        self._kilit = threading.Lock()
+        self._nesiller = {}      # anahtar -> en son gönderilen işin nesli
+        self._calisanlar = {}    # anahtar -> (nesil, bağlantı)
+        self._baglanti_nesli = 0
+        self._bekleyen = 0       # Yalnızca Tk iş parçacığında değişir
+        for _ in range(self.ISCI_SAYISI):
+            threading.Thread(target=self._isci, daemon=True).start()
+
+    def calistir(self, anahtar, is_, basarili, hata=None, onbellek_anahtari=None):
+        """is_(conn) fonksiyonunu arka planda çalıştırır
+        
+        Sonuç basarili(sonuc), hata hata(istisna) ile Tk iş parçacığında
+        çağrılır. Aynı anahtarlı önceki iş iptal edilir. Bir kullanıcı işlemi
+        sırasında çağrıldıysa sorgu ve sonucun gösterimi o işlemin izine eklenir.
+        
+        onbellek_anahtari verilirse sonuç o anahtarla önbelleğe alınır; aynı
+        sürümde tekrar istendiğinde sorgu çalıştırılmaz, basarili hemen
+        (bu çağrının içinde) çağrılır. Önbellekteki sonuç değiştirilmemelidir.
+        """
+        baglam = self.izci.baglam() if self.izci else None
+        bulundu = False
+        if onbellek_anahtari is not None and self.onbellek is not None:
+            # Sürüm sorgudan önce alınır; sorgu sürerken gelen commit sonucu eskitir
+            surum = self.onbellek.surum()
+            bulundu, sonuc = self.onbellek.getir(onbellek_anahtari, surum)
+            if not bulundu:
+                asil = basarili
+
+                def basarili(sonuc):
+                    self.onbellek.koy(onbellek_anahtari, surum, sonuc)
+                    asil(sonuc)
+
+        with self._kilit:
+            nesil = self._nesiller.get(anahtar, 0) + 1
+            self._nesiller[anahtar] = nesil
+            calisan = self._calisanlar.get(anahtar)
+            if calisan:
+                calisan[1].interrupt()
+
+        if bulundu:
+            with self.izci.alt(anahtar, 'cizim') if self.izci else nullcontext():
+                basarili(sonuc)
+            return
+
+        self._isler.put((anahtar, nesil, is_, basarili, hata, baglam))
+        self._bekleyen += 1
+        if self._bekleyen == 1:
+            self._mesgul_bildir()
+            self.root.after(self.YOKLAMA_ARALIGI, self._yokla)
+
+    @property
+    def mesgul(self):
+        """Sonucu henüz teslim edilmemiş iş varsa True"""
+        return self._bekleyen > 0
+
+    def yeniden_baglan(self):
+        """Depolama profili veya veritabanı değiştiğinde işçi bağlantılarını yeniler"""
+        with self._kilit:
+            self._baglanti_nesli += 1
+            for _, conn in self._calisanlar.values():
+                conn.interrupt()
+
+    def _isci(self):
+        """İşçi döngüsü: sıradaki güncel işi kendi bağlantısıyla çalıştırır"""
+        conn = None
+        baglanti_nesli = None
+        while True:
+            anahtar, nesil, is_, basarili, hata, baglam = self._isler.get()
+            sonuc = istisna = None
+            try:
+                if conn is None or baglanti_nesli != self._baglanti_nesli:
+                    if conn is not None:
+                        self.baglantilar.okuyucu_birak(conn)
+                    baglanti_nesli = self._baglanti_nesli
+                    conn = self.baglantilar.okuyucu_al()
+
+                with self._kilit:
+                    guncel = self._nesiller.get(anahtar) == nesil
+                    if guncel:
+                        self._calisanlar[anahtar] = (nesil, conn)
+                if guncel:
+                    baslangic = time.perf_counter()
+                    try:
+                        sonuc = is_(conn)
+                    finally:
+                        with self._kilit:
+                            # Yerine geçen iş başka işçide başlamış olabilir; onun kaydı silinmez
+                            if self._calisanlar.get(anahtar, (None,))[0] == nesil:
+                                del self._calisanlar[anahtar]
+                        if self.izci:
+                            self.izci.kaydet_araligi(baglam, anahtar, 'sorgu',
+                                                     baslangic, time.perf_counter())
+            except Exception as e:
+                istisna = e
+            self._sonuclar.put((anahtar, nesil, sonuc, istisna, basarili, hata, baglam))
+
+    def _yokla(self):
+        """Biten işlerin sonuçlarını Tk iş parçacığında teslim eder"""
+        while True:
+            try:
+                anahtar, nesil, sonuc, istisna, basarili, hata, baglam = self._sonuclar.get_nowait()
+            except queue.Empty:
+                break
+            self._bekleyen -= 1
+
+            # Yerine daha yeni bir istek geldiyse sonuç atılır
+            if self._nesiller.get(anahtar) != nesil:
+                continue
+            with self.izci.devam(baglam, anahtar, 'cizim') if self.izci else nullcontext():
+                if istisna is None:
+                    basarili(sonuc)
+                elif hata is not None:
+                    hata(istisna)
+
+        if self._bekleyen:
+            self.root.after(self.YOKLAMA_ARALIGI, self._yokla)
+        else:
+            self._mesgul_bildir()
+
+    def _mesgul_bildir(self):
+        if self.mesgul_degisti:
+            self.mesgul_degisti(self._bekleyen > 0)
+
+
+class ZamanCizelgesi:
+    """Kullanıcı işlemlerinin izlerini gösteren pencere
+    
+    Üstte işlemler, alt aralık türlerine göre süreleriyle listelenir; seçilen
+    işlemin aralıkları ve o sırada ölçülen olay döngüsü donmaları zaman
+    ekseninde çubuklarla çizilir. İzler canlı olarak veya izler.json
+    dosyasından okunur.
+    """
+    RENKLER = {'islem': PRIMARY_COLOR, 'sorgu': WARNING_COLOR, 'cizim': SECONDARY_COLOR,
+               'commit': ACCENT_COLOR, 'mesaj': SELECTION_COLOR, 'donma': DANGER_COLOR}
+    TURLER = ('sorgu', 'cizim', 'commit', 'mesaj')
+    SATIR_YUKSEKLIGI = 22
+    SOL_BOSLUK = 10
+    CIZIM_GENISLIGI = 600
+
+    def __init__(self, root, izci, nabiz):
+        self.izci = izci
+        self.nabiz = nabiz
+        self.pencere = tk.Toplevel(root)
+        self.pencere.title("Zaman Çizelgesi")
+        self.pencere.geometry("1100x650")
+        self.pencere.configure(bg=BG_COLOR)
+        
+        ust = ttk.Frame(self.pencere)
+        ust.pack(fill=tk.X, padx=10, pady=10)
+        ttk.Button(ust, text="Yenile", style="Primary.TButton",
+                  command=self._canli_goster).pack(side=tk.LEFT, padx=5, ipadx=10, ipady=3)
+        ttk.Button(ust, text="Dosyaya Kaydet", style="Success.TButton",
+                  command=self._kaydet).pack(side=tk.LEFT, padx=5, ipadx=10, ipady=3)
+        ttk.Button(ust, text="Dosyadan Aç", style="Primary.TButton",
+                  command=self._dosyadan_ac).pack(side=tk.LEFT, padx=5, ipadx=10, ipady=3)
+        self.ozet = ttk.Label(ust, text="", style="Accent.TLabel")
+        self.ozet.pack(side=tk.LEFT, padx=15)
+        
+        columns = ("İşlem", "Saat", "Toplam ms", "Sorgu ms", "Çizim ms", "Commit ms", "Mesaj ms", "Donma ms")
+        self.tree = ttk.Treeview(self.pencere, columns=columns, show="headings", height=10)
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=220 if col == "İşlem" else 100,
+                             anchor=tk.W if col == "İşlem" else tk.E)
+        self.tree.pack(fill=tk.X, padx=10)
+        self.tree.bind('<<TreeviewSelect>>', lambda e: self._secili_ciz())
+        
+        cizim_frame = ttk.Frame(self.pencere)
+        cizim_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.canvas = tk.Canvas(cizim_frame, bg=CARD_COLOR, highlightthickness=0)
+        dikey = ttk.Scrollbar(cizim_frame, orient=tk.VERTICAL, command=self.canvas.yview)
+        yatay = ttk.Scrollbar(cizim_frame, orient=tk.HORIZONTAL, command=self.canvas.xview)
+        self.canvas.configure(yscrollcommand=dikey.set, xscrollcommand=yatay.set)
+        dikey.pack(side=tk.RIGHT, fill=tk.Y)
+        yatay.pack(side=tk.BOTTOM, fill=tk.X)
+        self.canvas.pack(fill=tk.BOTH, expand=True)
+        
+        self._islemler = {}
+        self._canli_goster()
+
+    def _canli_goster(self):
+        """Bellekteki izleri ve olay döngüsü özetini gösterir"""
+        self.ozet.config(text=f"Olay döngüsü: en uzun gecikme {self.nabiz.en_uzun_ms:.0f} ms, "
+                              f"{self.nabiz.donma_sayisi} donma (toplam {self.nabiz.toplam_donma_ms:.0f} ms)")
+        self._goster(self.izci.araliklar(), self.izci.baslangic_zamani)
+
+    def _kaydet(self):
+        try:
+            yol = self.izci.dosyaya_yaz()
+        except OSError as e:
+            messagebox.showerror("Hata", f"İzler kaydedilemedi!\n{str(e)}", parent=self.pencere)
+            return
+        messagebox.showinfo("Başarılı", f"İzler kaydedildi:\n{yol}", parent=self.pencere)
+
+    def _dosyadan_ac(self):
+        yol = filedialog.askopenfilename(
+            parent=self.pencere, title="İz Dosyası Seç",
+            initialdir=os.path.dirname(self.izci.dosya_yolu or ""),
+            filetypes=[("İz dosyaları", "*.json"), ("Tüm dosyalar", "*.*")])
+        if not yol:
+            return
+        try:
+            araliklar, baslangic_zamani = stok_zamanlama.iz_dosyasini_oku(yol)
+        except (OSError, ValueError, KeyError) as e:
+            messagebox.showerror("Hata", f"İz dosyası okunamadı!\n{str(e)}", parent=self.pencere)
+            return
+        self.ozet.config(text=f"Dosya: {yol}")
+        self._goster(araliklar, baslangic_zamani)
+
+    @staticmethod
+    def _ortusme(aralik, baslangic, bitis):
+        return max(0.0, min(bitis, aralik.bitis) - max(baslangic, aralik.baslangic)) * 1000
+
+    def _goster(self, araliklar, baslangic_zamani):
+        """İşlemleri (en yenisi üstte) toplam ve tür sürelerine göre listeler"""
+        self.tree.delete(*self.tree.get_children())
+        self.canvas.delete("all")
+        self._islemler = {}
+        
+        kokler = [a for a in araliklar if a.tur == 'islem' and a.ust == 0]
+        alt_araliklar = {}
+        for a in araliklar:
+            if a.islem:
+                alt_araliklar.setdefault(a.islem, []).append(a)
+        self._donmalar = [a for a in araliklar if a.tur == 'donma']
+        
+        for kok in sorted(kokler, key=lambda a: a.baslangic, reverse=True):
+            uyeler = alt_araliklar.get(kok.kimlik, [kok])
+            bitis = max(a.bitis for a in uyeler)
+            sureler = {tur: sum(a.sure_ms for a in uyeler if a.tur == tur) for tur in self.TURLER}
+            donma = sum(self._ortusme(d, kok.baslangic, bitis) for d in self._donmalar)
+            saat = datetime.fromtimestamp(baslangic_zamani + kok.baslangic).strftime("%H:%M:%S")
+            iid = self.tree.insert("", tk.END, values=(
+                kok.ad, saat, f"{(bitis - kok.baslangic) * 1000:.1f}",
+                *(f"{sureler[tur]:.1f}" for tur in self.TURLER), f"{donma:.1f}"))
+            self._islemler[iid] = (kok, uyeler, bitis)
+
+    def _secili_ciz(self):
+        """Seçili işlemin aralıklarını ve sırasındaki donmaları zaman ekseninde çizer"""
+        secili = self.tree.selection()
+        if not secili:
+            return
+        kok, uyeler, bitis = self._islemler[secili[0]]
+        donmalar = [d for d in self._donmalar if self._ortusme(d, kok.baslangic, bitis) > 0]
+        baslangic = min([kok.baslangic] + [d.baslangic for d in donmalar])
+        bitis = max([bitis] + [d.bitis for d in donmalar])
+        olcek = self.CIZIM_GENISLIGI / max(bitis - baslangic, 0.001)
+        
+        # Aralıkların derinliği (etikette girinti için)
+        ustler = {a.kimlik: a.ust for a in uyeler}
+        def derinlik(a):
+            d, ust = 0, a.ust
+            while ust in ustler:
+                d, ust = d + 1, ustler[ust]
+            return d
+        
+        self.canvas.delete("all")
+        h = self.SATIR_YUKSEKLIGI
+        
+        # Zaman ekseni
+        toplam_ms = (bitis - baslangic) * 1000
+        adim = next((a for a in (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+                     if toplam_ms / a <= 10), 10000)
+        for i in range(int(toplam_ms // adim) + 1):
+            x = self.SOL_BOSLUK + i * adim / 1000 * olcek
+            self.canvas.create_line(x, h, x, h * (len(uyeler) + len(donmalar) + 2), fill=BORDER_COLOR)
+            self.canvas.create_text(x, h / 2, text=f"{i * adim} ms", fill=TEXT_COLOR, font=FONT_PRIMARY)
+        
+        satirlar = donmalar + sorted(uyeler, key=lambda a: (a.baslangic, a.kimlik))
+        for i, a in enumerate(satirlar, start=1):
+            y = h * i + 3
+            x0 = self.SOL_BOSLUK + (a.baslangic - baslangic) * olcek
+            x1 = max(self.SOL_BOSLUK + (a.bitis - baslangic) * olcek, x0 + 2)
+            self.canvas.create_rectangle(x0, y, x1, y + h - 6, fill=self.RENKLER.get(a.tur, PRIMARY_COLOR),
+                                         outline="")
+            girinti = "" if a.tur == 'donma' else "  " * derinlik(a)
+            self.canvas.create_text(x1 + 5, y + (h - 6) / 2, anchor="w", fill=TEXT_COLOR, font=FONT_PRIMARY,
+                                    text=f"{girinti}{a.ad} [{a.tur}] {a.sure_ms:.1f} ms")
+        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+
+
 class StopTakipPro:
     def __init__(self, root):
         self.root = root
@@ -73,6 +586,10 @@ class StopTakipPro:
         # Varsayılan KDV oranı
         self.default_kdv_rate = 20  # %20
         
+        # Kullanıcı işlemlerinin zaman izleri (kapanışta izler.json'a yazılır)
+        self.izci = stok_zamanlama.Izci(os.path.join(get_app_data_path(), "izler.json"))
+        stok_zamanlama.mesaj_kutularini_izle(self.izci, messagebox)
+        
         # Veritabanı bağlantısı (EXE ile uyumlu)
         self.db_path = os.path.join(get_app_data_path(), "stop_takip.db")
         self._initialize_database()
@@ -84,60 +601,200 @@ class StopTakipPro:
         # Arayüz bileşenleri
         self._setup_ui()
         self._load_data()
+        self._load_arama_indeksleri()
+        
+        # Olay döngüsü donmalarını ölçen after() atımı
+        self.nabiz = stok_zamanlama.DonguNabzi(self.root, self.izci)
+        
+        if "--baslangic-olc" in sys.argv:
+            self._baslangici_olc()
         
     def _initialize_database(self):
         """Veritabanını başlatır ve bağlantıyı açar"""
-        # Veritabanı yoksa oluştur
-        db_exists = os.path.exists(self.db_path)
-        
-        self.conn = sqlite3.connect(self.db_path)
-        self.c = self.conn.cursor()
+        # Veritabanı yoksa oluşturulur, eski şemalar güncellenir; WAL kipinde
+        # tüm veri yazmaları yazma kuyruğunun tek bağlantısından yapılır,
+        # raporlar salt okunur bağlantı havuzundan okunur
+        ayarlar = ayarlari_oku()
+        self.sunucu_adresi = ayarlar.get("sunucu_adresi") or None
+        self.veri = stok_veri
+        self.dinleyici = None
+        if self.sunucu_adresi:
+            # Sunucu kipi: veri fonksiyonları ve bağlantılar sunucuya yönlenir.
+            # İstemci (http.client, sunucu modülü) yalnızca bu kipte yüklenir
+            import stok_istemci
+            try:
+                self.baglantilar = stok_istemci.UzakBaglantilar(self.sunucu_adresi)
+                self.veri = stok_istemci
+                self.dinleyici = stok_istemci.DegisiklikDinleyici(self.sunucu_adresi,
+                                                                 self.baglantilar.durum["son"])
+            except StokHatasi as e:
+                messagebox.showwarning("Sunucu", f"{e}\n\nYerel veritabanı kullanılacak.")
+                self.sunucu_adresi = None
+        self.izleyici = None
+        if not self.sunucu_adresi:
+            profil = stok_baglanti.PROFILLER.get(ayarlar.get("depolama_profili"),
+                                                 stok_baglanti.PROFILLER[stok_baglanti.VARSAYILAN_PROFIL])
+            # Eşiği aşan sorgular planıyla birlikte sorgu_gunlugu.log'a yazılır
+            self.izleyici = stok_izleme.SorguIzleyici(
+                esik_ms=ayarlar.get("sorgu_esigi_ms", stok_izleme.VARSAYILAN_ESIK_MS),
+                gunluk_yolu=os.path.join(get_app_data_path(), "sorgu_gunlugu.log"))
+            self.baglantilar = stok_baglanti.BaglantiYoneticisi(self.db_path, profil, self.izleyici)
+        self.conn = self.baglantilar.yazici
+        
+        # Giriş ve çıkışlar sıralı yazma kuyruğuyla, toplu commit edilerek yazılır
+        if self.sunucu_adresi:
+            self.yazma = stok_istemci.UzakYazmaKuyrugu(self.sunucu_adresi)
+        else:
+            self.yazma = stok_yazma.YazmaKuyrugu(self.baglantilar)
+        
+        # Rapor sonuçları veritabanı sürümüyle önbelleğe alınır; sürüm değişince geçersizdir
+        self.onbellek = stok_onbellek.SorguOnbellegi(self.baglantilar.veri_surumu)
+        
+        # Rapor sorguları arka planda, havuzdan alınan okuma bağlantılarıyla çalışır
+        self.sorgular = SorguCalistirici(self.root, self.baglantilar, self._set_mesgul, self.izci,
+                                         self.onbellek)
+        
+        # Otomatik tamamlama indeksleri (arka planda doldurulur, kayıtla güncellenir)
+        self.arama_indeksleri = {'ad': AramaIndeksi(), 'tedarikci': AramaIndeksi()}
+        self._autocomplete_zamanlayici = {}
+        
+        # Yazma işlemleri neyin değiştiğini yayınlar; görünümler buna göre yenilenir
+        self.degisiklikler = stok_veri.DegisiklikYayini()
+        self.degisiklikler.abone_ol(self._on_degisiklik)
+        if self.dinleyici:
+            self.root.after(self.DINLEME_ARALIGI, self._sunucu_degisikliklerini_al)
+        self._hareket_filtresi = None
+        self._stok_filtresi = None
+        self._aylik_filtresi = None
+        self._kategori_listesi = []
+        self._stoktaki = {}
+        self._cikti_etiketleri = {}  # combobox etiketi -> malzeme adı
+        self._cikti_secimi = None    # (etiket, malzeme adı); liste yenilense de seçim korunur
+
+    # Sunucudan gelen değişikliklerin arayüze aktarılma aralığı (ms)
+    DINLEME_ARALIGI = 200
+
+    def _sunucu_degisikliklerini_al(self):
+        """Sunucu kipinde başka istemcilerin (ve bu istemcinin) yazmalarını yayınlar"""
+        for degisiklik in self.dinleyici.bekleyenler():
+            self.degisiklikler.yayinla(degisiklik)
+        self.root.after(self.DINLEME_ARALIGI, self._sunucu_degisikliklerini_al)
+
+    # Yazma kuyruğundaki komutun sonucunun yoklanma aralığı (ms)
+    YAZMA_YOKLAMA_ARALIGI = 5
+
+    def _yaz(self, komut, parametreler, basarili, hata=None):
+        """Komutu yazma kuyruğuna gönderir; sonucu commit'ten sonra Tk iş parçacığında teslim eder
+        
+        Tk iş parçacığı commit'i (fsync) beklemez. Başarılı komutun değişikliği
+        yayınlanır ve basarili(YazmaSonucu) çağrılır; hata hata(istisna) ile
+        (verilmezse _sorgu_hatasi ile) gösterilir. Kuyruktan commit'e kadar
+        geçen süre ve sonucun işlenmesi çağıran işlemin izine eklenir.
+        """
+        baglam = self.izci.baglam()
+        baslangic = time.perf_counter()
+        gelecek = self.yazma.gonder(komut, **parametreler)
+        gelecek.add_done_callback(lambda _: self.izci.kaydet_araligi(
+            baglam, komut, 'commit', baslangic, time.perf_counter()))
+        
+        def yokla():
+            if not gelecek.done():
+                self.root.after(self.YAZMA_YOKLAMA_ARALIGI, yokla)
+                return
+            with self.izci.devam(baglam, komut, 'cizim'):
+                try:
+                    sonuc = gelecek.result()
+                except Exception as e:
+                    (hata or self._sorgu_hatasi)(e)
+                    return
+                if sonuc.degisiklik:
+                    self.degisiklikler.yayinla(sonuc.degisiklik)
+                basarili(sonuc)
+        
+        self.root.after(self.YAZMA_YOKLAMA_ARALIGI, yokla)
+
+    def _yerel_kipte(self):
+        """Sunucu kipinde yalnızca sunucu bilgisayarında yapılabilen işlemleri engeller"""
+        if self.sunucu_adresi:
+            messagebox.showinfo("Sunucu Kipi",
+                                "Bu işlem sunucu kipinde kullanılamaz; sunucunun "
+                                "bilgisayarında yerel olarak yapılmalıdır.")
+            return False
+        return True
+
+    def _set_mesgul(self, mesgul):
+        """Arka planda sorgu varken yükleniyor göstergesini açar/kapatır"""
+        if not hasattr(self, 'yukleniyor_frame'):
+            return
+        if mesgul:
+            self.yukleniyor_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=(0, 10))
+            self.yukleniyor_bar.start(15)
+        else:
+            self.yukleniyor_bar.stop()
+            self.yukleniyor_frame.pack_forget()
+
+    def _sorgu_hatasi(self, e):
+        """Arka plan sorgusundan gelen hatayı kullanıcıya gösterir"""
+        if isinstance(e, StokHatasi):
+            messagebox.showerror("Hata", str(e))
+        elif isinstance(e, sqlite3.Error):
+            messagebox.showerror("Veritabanı Hatası", f"Veritabanı hatası oluştu:\n{str(e)}")
+        else:
+            messagebox.showerror("Hata", f"Beklenmeyen bir hata oluştu:\n{str(e)}")
+
+    def _on_degisiklik(self, degisiklik):
+        """Yazma işleminden sonra yalnızca etkilenen görünümleri günceller"""
+        tumu = degisiklik.tur == 'tumu'
+        self.onbellek.degisti()
+        
+        # Raporlar: yalnızca kurulmuş sekmeler ve gösterilen filtre değişiklikten
+        # etkileniyorsa (kurulmamış sekme ilk seçildiğinde güncel veriyle dolar)
+        if hasattr(self, 'hareket_tablo') and (
+                self._hareket_filtresi is None or self._hareket_filtresi.etkilenir(degisiklik)):
+            self._load_hareket_raporu()
+        if hasattr(self, 'stok_tablo') and (
+                self._stok_filtresi is None or self._stok_filtresi.etkilenir(degisiklik)):
+            self._load_mevcut_stok()
+        if hasattr(self, 'aylik_tree') and (
+                self._aylik_filtresi is None or self._aylik_filtresi.etkilenir(degisiklik)):
+            self._load_aylik_rapor()
+        
+        # Dashboard yalnızca görünürken yenilenir (_show_dashboard açılışta yeniler)
+        if (degisiklik.tur != 'kategori_ekle' and hasattr(self, 'dashboard')
+                and self.dashboard.winfo_ismapped()):
+            self._update_dashboard()
+        
+        # Kategoriler: yeni kategori listeye eklenir, silme/temizlemede yeniden okunur
+        if tumu or degisiklik.tur in ('kategori_ekle', 'kategori_sil'):
+            self._load_categories()
+        elif degisiklik.kategori and degisiklik.kategori not in self._kategori_listesi:
+            self._show_categories(sorted(self._kategori_listesi + [degisiklik.kategori]))
+        
+        if tumu:
+            self._load_arama_indeksleri()
+        
+        # Çıkış formundaki stok listesi (sekme kurulduysa): yalnızca değişen malzemenin satırı
+        if hasattr(self, 'cikti_malzeme'):
+            if tumu:
+                self._update_malzeme_listesi()
+            elif degisiklik.malzeme:
+                self._update_malzeme_satiri(degisiklik.malzeme)
+            elif degisiklik.tur == 'cikis':
+                # Çok malzemeli çıkış fişi: liste bir kez yeniden okunur
+                self._update_malzeme_listesi()
         
-        if not db_exists:
-            self._create_database()
-    
-    def _create_database(self):
-        """Veritabanı tablosunu oluşturur"""
-        # Eski tabloları sil (sadece ilk kurulumda)
-        self.c.execute("DROP TABLE IF EXISTS malzeme_girisleri")
-        self.c.execute("DROP TABLE IF EXISTS malzeme_cikislari")
-        self.c.execute("DROP TABLE IF EXISTS mevcut_stok")
-    
-        # Yeni tabloları oluştur
-        self.c.execute('''CREATE TABLE IF NOT EXISTS malzeme_girisleri
-                          (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                           ad TEXT NOT NULL,
-                           fiyat REAL NOT NULL,
-                           adet INTEGER NOT NULL,
-                           kdv REAL NOT NULL,
-                           kdv_tutari REAL NOT NULL,
-                           toplam REAL NOT NULL,
-                           tarih TEXT NOT NULL,
-                           kategori TEXT,
-                           tedarikci TEXT)''')
-    
-        self.c.execute('''CREATE TABLE IF NOT EXISTS malzeme_cikislari
-                          (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                           giris_id INTEGER NOT NULL,
-                           malzeme_adi TEXT NOT NULL,
-                           cikis_adedi INTEGER NOT NULL,
-                           personel TEXT NOT NULL,
-                           aciklama TEXT,
-                           tarih TEXT NOT NULL,
-                           FOREIGN KEY(giris_id) REFERENCES malzeme_girisleri(id))''')
-    
-        self.c.execute('''CREATE TABLE IF NOT EXISTS mevcut_stok
-                          (malzeme_adi TEXT PRIMARY KEY,
-                           toplam_adet INTEGER NOT NULL)''')
-        self.conn.commit()
+        # Arama indekslerine yeni adları ekle
+        if degisiklik.tur == 'giris':
+            self.arama_indeksleri['ad'].ekle(degisiklik.malzeme)
+            if degisiklik.tedarikci:
+                self.arama_indeksleri['tedarikci'].ekle(degisiklik.tedarikci)
 
     def _load_data(self):
-        """Verileri yüklemek için genel metod"""
-        self._load_hareket_raporu()
+        """Sekmelerin ortak verilerini yükler
+        
+        Sekmeye özgü veriler sekme kurulurken (ilk seçildiğinde) bir kez yüklenir.
+        """
         self._load_categories()
-        self._update_dashboard()
-        self._update_malzeme_listesi()
-        self._load_mevcut_stok()
 
     def _configure_styles(self):
         """Tema ve stil ayarlarını yapar"""
@@ -353,6 +1010,13 @@ class StopTakipPro:
                             style="Sidebar.TButton", command=self._on_close)
         exit_btn.pack(side=tk.BOTTOM, fill=tk.X, pady=(0, 20))
         
+        # Arka plan sorgusu göstergesi (yalnızca sorgu sürerken görünür)
+        self.yukleniyor_frame = ttk.Frame(self.sidebar, style="Sidebar.TFrame")
+        ttk.Label(self.yukleniyor_frame, text="Yükleniyor...", 
+                 style="Sidebar.TLabel").pack(anchor="w")
+        self.yukleniyor_bar = ttk.Progressbar(self.yukleniyor_frame, mode="indeterminate")
+        self.yukleniyor_bar.pack(fill=tk.X)
+        
         # Ana içerik alanı
         self.content = ttk.Frame(self.main_container)
         self.content.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
@@ -360,32 +1024,61 @@ class StopTakipPro:
         # Ana notebook (sekmeler)
         self.notebook = ttk.Notebook(self.content)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        
-        # Malzeme Ekleme Sekmesi
-        self._setup_malzeme_ekleme()
-        
-        # Malzeme Çıktı Sekmesi
-        self._setup_malzeme_cikti()
-        
-        # Depo Takip Sekmesi
-        self._setup_depo_takip()
-        
-        # Aylık Rapor Sekmesi
-        self._setup_aylik_rapor()
-        
-        # Ayarlar Sekmesi
-        self._setup_ayarlar()
-        
-        # Dashboard (başlangıçta gizli)
-        self._setup_dashboard()
+        self.notebook.bind('<<NotebookTabChanged>>', self._sekme_degisti)
+        
+        # Sekmeler boş eklenir; içerikleri ilk seçildiklerinde kurulup doldurulur
+        self._kurulacak_sekmeler = {}
+        self._sekme_ekle(self.notebook, "➕ Malzeme Ekle", self._setup_malzeme_ekleme)
+        self._sekme_ekle(self.notebook, "➖ Malzeme Çıktı", self._setup_malzeme_cikti)
+        self._sekme_ekle(self.notebook, "📦 Depo Takip", self._setup_depo_takip)
+        self._sekme_ekle(self.notebook, "📈 Aylık Rapor", self._setup_aylik_rapor)
+        self._sekme_ekle(self.notebook, "⚙️ Ayarlar", self._setup_ayarlar)
+        self._sekmeyi_kur(self.notebook)
+        
+        # Dashboard ilk gösterildiğinde kurulur (_show_dashboard)
+
+    def _sekme_ekle(self, notebook, metin, kurucu):
+        """Notebook'a boş sekme ekler; kurucu(frame) sekme ilk seçildiğinde çağrılır"""
+        frame = ttk.Frame(notebook, style="Card.TFrame")
+        notebook.add(frame, text=metin)
+        self._kurulacak_sekmeler[str(frame)] = (kurucu, frame)
+
+    def _sekmeyi_kur(self, notebook):
+        """Seçili sekme henüz kurulmadıysa kurar"""
+        kurulum = self._kurulacak_sekmeler.pop(notebook.select(), None)
+        if kurulum:
+            kurucu, frame = kurulum
+            with self.izci.alt("kurulum", 'cizim'):
+                kurucu(frame)
+
+    def _sekme_degisti(self, event):
+        """Sekme geçişini, yeni sekmenin yerleşimi ve çizimiyle birlikte izler"""
+        notebook = event.widget
+        if not notebook.select():
+            return
+        with self.izci.islem(f"Sekme: {notebook.tab('current', 'text')}"):
+            self._sekmeyi_kur(notebook)
+            with self.izci.alt("yerleşim", 'cizim'):
+                notebook.update_idletasks()
 
     def _on_close(self):
         """Uygulama kapatılırken veritabanı bağlantısını kapat"""
+        if self.dinleyici:
+            self.dinleyici.durdur()
+        self.yazma.kapat()
         self.conn.close()
+        if self.izleyici:
+            self.izleyici.gunluk_kapat()
+        try:
+            self.izci.dosyaya_yaz()
+        except OSError:
+            pass
         self.root.quit()
 
     def _show_dashboard(self):
         """Dashboard'ı gösterir"""
+        if not hasattr(self, 'dashboard'):
+            self._setup_dashboard()
         self.notebook.pack_forget()
         self.dashboard.pack(fill=tk.BOTH, expand=True)
         self._update_dashboard()
@@ -432,31 +1125,20 @@ class StopTakipPro:
                  style="Header.TLabel").pack(pady=50)
         
     def _update_dashboard(self):
-        """Dashboard verilerini günceller"""
-        # Toplam malzeme
-        self.c.execute("SELECT SUM(adet) FROM malzeme_girisleri")
-        total = self.c.fetchone()[0] or 0
-        self.dashboard_toplam_malzeme.config(text=str(total))
-        
-        # Düşük stok (varsayılan olarak 10'dan az)
-        self.c.execute("SELECT COUNT(*) FROM malzeme_girisleri WHERE adet < 10")
-        low_stock = self.c.fetchone()[0] or 0
-        self.dashboard_düşük_stok.config(text=str(low_stock))
-        
-        # Toplam maliyet
-        self.c.execute("SELECT SUM(toplam) FROM malzeme_girisleri")
-        total_cost = self.c.fetchone()[0] or 0
-        self.dashboard_toplam_maliyet.config(text=f"{total_cost:.2f} ₺")
-        
-        # Kategori sayısı
-        self.c.execute("SELECT COUNT(DISTINCT kategori) FROM malzeme_girisleri WHERE kategori IS NOT NULL")
-        categories = self.c.fetchone()[0] or 0
-        self.dashboard_kategori_sayısı.config(text=str(categories))
-
-    def _setup_malzeme_ekleme(self):
+        """Dashboard verilerini arka planda yükler"""
+        self.sorgular.calistir("dashboard", self.veri.dashboard_ozeti,
+                               self._show_dashboard_ozeti, self._sorgu_hatasi,
+                               onbellek_anahtari=('dashboard',))
+
+    def _show_dashboard_ozeti(self, ozet):
+        """Dashboard kartlarını günceller"""
+        self.dashboard_toplam_malzeme.config(text=str(ozet.toplam_malzeme))
+        self.dashboard_düşük_stok.config(text=str(ozet.dusuk_stok))
+        self.dashboard_toplam_maliyet.config(text=f"{ozet.toplam_maliyet:.2f} ₺")
+        self.dashboard_kategori_sayısı.config(text=str(ozet.kategori_sayisi))
+
+    def _setup_malzeme_ekleme(self, frame):
         """Malzeme ekleme sekmesini oluşturur"""
-        frame = ttk.Frame(self.notebook, style="Card.TFrame")
-        self.notebook.add(frame, text="➕ Malzeme Ekle")
         
         # Başlık
         ttk.Label(frame, text="YENİ MALZEME EKLE", style="Title.TLabel").pack(pady=(20, 10))
@@ -489,24 +1171,18 @@ class StopTakipPro:
                 entry.set_date(datetime.now())
             elif label == "Kategori:":
                 entry = ttk.Combobox(row_frame, width=27, font=FONT_PRIMARY)
-                # Kategorileri yükle
-                self.c.execute("SELECT DISTINCT kategori FROM malzeme_girisleri WHERE kategori IS NOT NULL")
-                categories = [cat[0] for cat in self.c.fetchall()]
-                entry['values'] = categories
+                # Arka planda yüklenmiş kategori listesi (_show_categories günceller)
+                entry['values'] = self._kategori_listesi
             elif label == "Malzeme Adı:":
                 entry = ttk.Combobox(row_frame, width=30, font=FONT_PRIMARY)
-                # Malzeme adlarını yükle
-                self.c.execute("SELECT DISTINCT ad FROM malzeme_girisleri WHERE ad IS NOT NULL")
-                malzemeler = [malzeme[0] for malzeme in self.c.fetchall()]
-                entry['values'] = malzemeler
+                # İlk öneriler arama indeksinden (sınırlı sayıda)
+                entry['values'] = self.arama_indeksleri['ad'].ara('')
                 # Otomatik tamamlama
                 entry.bind('<KeyRelease>', lambda event: self._autocomplete(event, 'ad'))
             elif label == "Tedarikçi:":
                 entry = ttk.Combobox(row_frame, width=30, font=FONT_PRIMARY)
-                # Tedarikçileri yükle
-                self.c.execute("SELECT DISTINCT tedarikci FROM malzeme_girisleri WHERE tedarikci IS NOT NULL")
-                tedarikciler = [tedarikci[0] for tedarikci in self.c.fetchall()]
-                entry['values'] = tedarikciler
+                # İlk öneriler arama indeksinden (sınırlı sayıda)
+                entry['values'] = self.arama_indeksleri['tedarikci'].ara('')
                 # Otomatik tamamlama
                 entry.bind('<KeyRelease>', lambda event: self._autocomplete(event, 'tedarikci'))
             else:
@@ -525,12 +1201,12 @@ class StopTakipPro:
         ttk.Button(btn_frame, text="Temizle", style="Warning.TButton",
                   command=self._temizle_form).pack(side=tk.LEFT, padx=20, ipadx=20, ipady=8)
         ttk.Button(btn_frame, text="Kaydet", style="Success.TButton",
-                  command=self.malzeme_ekle).pack(side=tk.LEFT, padx=20, ipadx=25, ipady=8)
+                  command=self.izci.sar("Kaydet", self.malzeme_ekle)).pack(side=tk.LEFT, padx=20, ipadx=25, ipady=8)
+        ttk.Button(btn_frame, text="📥 Dosyadan Aktar", style="Primary.TButton",
+                  command=self._toplu_ice_aktar).pack(side=tk.LEFT, padx=20, ipadx=10, ipady=8)
 
-    def _setup_malzeme_cikti(self):
+    def _setup_malzeme_cikti(self, frame):
         """Malzeme çıktı sekmesini oluşturur"""
-        frame = ttk.Frame(self.notebook, style="Card.TFrame")
-        self.notebook.add(frame, text="➖ Malzeme Çıktı")
         
         # Başlık
         ttk.Label(frame, text="MALZEME ÇIKIŞI", style="Title.TLabel").pack(pady=(20, 10))
@@ -554,7 +1230,7 @@ class StopTakipPro:
         self.stok_bilgisi.pack(side=tk.LEFT, padx=20)
         
         # Malzeme seçildiğinde stok bilgisini güncelle
-        self.cikti_malzeme.bind('<<ComboboxSelected>>', self._update_stok_bilgisi)
+        self.cikti_malzeme.bind('<<ComboboxSelected>>', self._cikti_malzemesi_secildi)
         
         # Personel bilgisi
         row_frame = ttk.Frame(form_frame)
@@ -606,32 +1282,98 @@ class StopTakipPro:
         ttk.Button(btn_frame, text="Temizle", style="Warning.TButton",
                   command=self._temizle_cikti_form).pack(side=tk.LEFT, padx=20, ipadx=20, ipady=8)
         ttk.Button(btn_frame, text="Çıkış Yap", style="Danger.TButton",
-                  command=self.malzeme_cikisi_yap).pack(side=tk.LEFT, padx=20, ipadx=25, ipady=8)
+                  command=self.izci.sar("Çıkış Yap", self.malzeme_cikisi_yap)).pack(side=tk.LEFT, padx=20, ipadx=25, ipady=8)
+        ttk.Button(btn_frame, text="Fişe Ekle", style="Primary.TButton",
+                  command=self._fise_ekle).pack(side=tk.LEFT, padx=20, ipadx=20, ipady=8)
+        
+        # Çıkış fişi: aynı personelin birden çok malzemesi tek işlemde çıkılır
+        fis_frame = ttk.LabelFrame(form_frame, text="Çıkış Fişi", padding=(10, 5))
+        fis_frame.pack(fill=tk.BOTH, expand=True, pady=(10, 0))
+        
+        self.fis_tablosu = ttk.Treeview(fis_frame, columns=("Malzeme", "Miktar", "Açıklama"),
+                                        show="headings", height=6)
+        for col, width in (("Malzeme", 250), ("Miktar", 80), ("Açıklama", 250)):
+            self.fis_tablosu.heading(col, text=col)
+            self.fis_tablosu.column(col, width=width)
+        scrollbar = ttk.Scrollbar(fis_frame, orient=tk.VERTICAL, command=self.fis_tablosu.yview)
+        self.fis_tablosu.configure(yscrollcommand=scrollbar.set)
+        self.fis_tablosu.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.LEFT, fill=tk.Y)
+        
+        fis_btn_frame = ttk.Frame(fis_frame)
+        fis_btn_frame.pack(side=tk.LEFT, fill=tk.Y, padx=(10, 0))
+        ttk.Button(fis_btn_frame, text="Satırı Sil", style="Warning.TButton",
+                  command=self._fis_satiri_sil).pack(fill=tk.X, pady=5)
+        ttk.Button(fis_btn_frame, text="Fişi Onayla", style="Danger.TButton",
+                  command=self.izci.sar("Fişi Onayla", self.cikis_fisi_yap)).pack(fill=tk.X, pady=5)
+        self._fis_satirlari = {}  # treeview öğesi -> CikisSatiri
         
         # Malzeme listesini güncelle
         self._update_malzeme_listesi()
 
     def _update_malzeme_listesi(self):
         """Malzeme çıktı sekmesindeki malzeme listesini günceller"""
-        self.c.execute("SELECT malzeme_adi, toplam_adet FROM mevcut_stok WHERE toplam_adet > 0 ORDER BY malzeme_adi")
-        malzemeler = [f"{row[0]} (Stok: {row[1]})" for row in self.c.fetchall()]
-        self.cikti_malzeme['values'] = malzemeler
+        def goster(satirlar):
+            self._stoktaki = dict(satirlar)
+            self._show_malzeme_listesi()
+        self.sorgular.calistir("stoktaki_malzemeler", self.veri.stoktaki_malzemeler,
+                               goster, self._sorgu_hatasi,
+                               onbellek_anahtari=('stoktaki_malzemeler',))
+
+    def _update_malzeme_satiri(self, malzeme_adi):
+        """Çıkış listesinde yalnızca değişen malzemenin stok miktarını günceller"""
+        def goster(adet):
+            if adet:
+                self._stoktaki[malzeme_adi] = adet
+            else:
+                self._stoktaki.pop(malzeme_adi, None)
+            self._show_malzeme_listesi()
+            
+            if self._secili_cikti_malzemesi() == malzeme_adi:
+                self._show_stok_bilgisi(adet)
+        self.sorgular.calistir(f"stok_miktari:{malzeme_adi}",
+                               lambda conn: self.veri.stok_miktari(conn, malzeme_adi),
+                               goster, self._sorgu_hatasi,
+                               onbellek_anahtari=('stok_miktari', malzeme_adi))
+
+    def _show_malzeme_listesi(self):
+        self._cikti_etiketleri = {
+            f"{ad} (Stok: {adet})": ad for ad, adet in sorted(self._stoktaki.items()) if adet > 0
+        }
+        self.cikti_malzeme['values'] = list(self._cikti_etiketleri)
+
+    def _cikti_malzemesi_secildi(self, event=None):
+        """Listeden seçilen malzemenin adını etiketiyle birlikte saklar"""
+        etiket = self.cikti_malzeme.get()
+        self._cikti_secimi = (etiket, self._cikti_etiketleri.get(etiket, etiket.strip()))
+        self._update_stok_bilgisi()
+
+    def _secili_cikti_malzemesi(self):
+        """Çıkış formundaki malzeme adı (listeden seçildiyse etiketinden, değilse yazılan metin)"""
+        etiket = self.cikti_malzeme.get()
+        if self._cikti_secimi and self._cikti_secimi[0] == etiket:
+            return self._cikti_secimi[1]
+        return self._cikti_etiketleri.get(etiket, etiket.strip())
 
     def _update_stok_bilgisi(self, event=None):
         """Seçili malzemenin stok bilgisini gösterir"""
-        selected = self.cikti_malzeme.get()
-        if not selected:
+        malzeme_adi = self._secili_cikti_malzemesi()
+        if not malzeme_adi:
             return
-            
-        # Malzeme adını al (parantezden önceki kısım)
-        malzeme_adi = selected.split(' (Stok:')[0].strip()
-        
-        # Veritabanından stok bilgisini al
-        self.c.execute("SELECT toplam_adet FROM mevcut_stok WHERE malzeme_adi=?", (malzeme_adi,))
-        result = self.c.fetchone()
         
-        if result:
-            self.stok_bilgisi.config(text=f"Mevcut Stok: {result[0]}")
+        # Stok bilgisi arka planda okunur; yeni seçim önceki sorguyu iptal eder
+        def goster(adet):
+            if self._secili_cikti_malzemesi() == malzeme_adi:
+                self._show_stok_bilgisi(adet)
+        self.sorgular.calistir("stok_bilgisi",
+                               lambda conn: self.veri.stok_miktari(conn, malzeme_adi),
+                               goster, self._sorgu_hatasi,
+                               onbellek_anahtari=('stok_miktari', malzeme_adi))
+
+    def _show_stok_bilgisi(self, adet):
+        """Çıkış formundaki stok bilgisi etiketini günceller"""
+        if adet is not None:
+            self.stok_bilgisi.config(text=f"Mevcut Stok: {adet}")
         else:
             self.stok_bilgisi.config(text="Mevcut Stok: -")
 
@@ -648,74 +1390,92 @@ class StopTakipPro:
         """Malzeme çıkış işlemini gerçekleştirir"""
         try:
             # Form verilerini al
-            selected = self.cikti_malzeme.get()
+            malzeme_adi = self._secili_cikti_malzemesi()
             personel = self.cikti_personel.get().strip()
             miktar = int(self.cikti_miktar.get())
             aciklama = self.cikti_aciklama.get().strip()
-            tarih = self.cikti_tarih.get()
+            tarih = parse_date(self.cikti_tarih.get())
+        except ValueError:
+            messagebox.showerror("Hata", "Geçersiz miktar! Sayı giriniz.")
+            return
         
-            if not selected:
-                messagebox.showerror("Hata", "Malzeme seçiniz!")
-                return
-            
-            if not personel:
-                messagebox.showerror("Hata", "Personel bilgisi giriniz!")
-                return
+        def basarili(sonuc):
+            messagebox.showinfo("Başarılı", f"{malzeme_adi} malzemesinden {miktar} adet çıkış yapıldı.")
             
-            if miktar <= 0:
-                messagebox.showerror("Hata", "Geçerli bir miktar giriniz!")
-                return
+            # Formu temizle
+            self._temizle_cikti_form()
         
-            # Malzeme adını al (parantezden önceki kısım)
-            malzeme_adi = selected.split(' (Stok:')[0].strip()
+        # Etkilenen görünümler değişiklik bildirimiyle güncellenir
+        self._yaz('cikis', dict(malzeme_adi=malzeme_adi, miktar=miktar, personel=personel,
+                                tarih=tarih, aciklama=aciklama), basarili)
+
+    def _fise_ekle(self):
+        """Formdaki malzeme ve miktarı çıkış fişine satır olarak ekler"""
+        try:
+            malzeme_adi = self._secili_cikti_malzemesi()
+            miktar = int(self.cikti_miktar.get())
+        except ValueError:
+            messagebox.showerror("Hata", "Geçersiz miktar! Sayı giriniz.")
+            return
+        if not malzeme_adi:
+            messagebox.showerror("Hata", "Malzeme seçiniz!")
+            return
+        if miktar <= 0:
+            messagebox.showerror("Hata", "Geçerli bir miktar giriniz!")
+            return
         
-            # Mevcut stok kontrolü
-            self.c.execute("SELECT toplam_adet FROM mevcut_stok WHERE malzeme_adi=?", (malzeme_adi,))
-            result = self.c.fetchone()
+        # Ön kontrol; kesin kontrol fiş onaylanırken tek sorguyla yapılır
+        fisteki = sum(s.miktar for s in self._fis_satirlari.values() if s.malzeme_adi == malzeme_adi)
+        mevcut = self._stoktaki.get(malzeme_adi, 0)
+        if fisteki + miktar > mevcut:
+            messagebox.showerror("Hata", f"Yetersiz stok! Mevcut stok: {mevcut}, fişte: {fisteki}")
+            return
         
-            if not result or result[0] < miktar:
-                messagebox.showerror("Hata", f"Yetersiz stok! Mevcut stok: {result[0] if result else 0}")
-                return
+        satir = stok_veri.CikisSatiri(malzeme_adi, miktar, self.cikti_aciklama.get().strip() or None)
+        item = self.fis_tablosu.insert("", tk.END, values=(malzeme_adi, miktar, satir.aciklama or ""))
+        self._fis_satirlari[item] = satir
         
-            # En eski giriş kaydını bul (FIFO yöntemi)
-            self.c.execute(
-               "SELECT id, adet FROM malzeme_girisleri "
-                "WHERE ad=? AND adet > 0 ORDER BY tarih ASC LIMIT 1",
-                (malzeme_adi,)
-            )
-            giris_kaydi = self.c.fetchone()
+        # Personel ve tarih fiş boyunca korunur
+        self.cikti_malzeme.set('')
+        self.cikti_miktar.delete(0, tk.END)
+        self.cikti_aciklama.delete(0, tk.END)
+        self.stok_bilgisi.config(text="Mevcut Stok: -")
+        self.cikti_malzeme.focus_set()
+
+    def _fis_satiri_sil(self):
+        """Seçili satırları çıkış fişinden çıkarır"""
+        for item in self.fis_tablosu.selection():
+            self.fis_tablosu.delete(item)
+            self._fis_satirlari.pop(item, None)
+
+    def cikis_fisi_yap(self):
+        """Çıkış fişindeki tüm satırları tek işlemde kaydeder"""
+        satirlar = [self._fis_satirlari[item] for item in self.fis_tablosu.get_children()]
+        if not satirlar:
+            messagebox.showwarning("Uyarı", "Fişte malzeme satırı yok!")
+            return
+        try:
+            personel = self.cikti_personel.get().strip()
+            tarih = parse_date(self.cikti_tarih.get())
+        except ValueError as e:
+            messagebox.showerror("Hata", f"Geçersiz tarih!\n{str(e)}")
+            return
         
-            if not giris_kaydi:
-                messagebox.showerror("Hata", "Stok kaydı bulunamadı!")
-                return
+        def basarili(sonuc):
+            messagebox.showinfo("Başarılı", f"{personel} için {len(satirlar)} kalem çıkış yapıldı.")
             
-            giris_id, giris_adet = giris_kaydi
-        
-            # Çıkış kaydı oluştur
-            self.c.execute(
-                "INSERT INTO malzeme_cikislari (giris_id, malzeme_adi, cikis_adedi, personel, aciklama, tarih) VALUES (?, ?, ?, ?, ?, ?)",
-                (giris_id, malzeme_adi, miktar, personel, aciklama if aciklama else None, tarih)
-            )
-        
-            # Mevcut stok güncelleme
-            self.c.execute(
-                "UPDATE mevcut_stok SET toplam_adet = toplam_adet - ? WHERE malzeme_adi=?",
-                (miktar, malzeme_adi)
-            )
-        
-            self.conn.commit()
+            self.fis_tablosu.delete(*self.fis_tablosu.get_children())
+            self._fis_satirlari.clear()
+            self._temizle_cikti_form()
         
-            messagebox.showinfo("Başarılı", f"{malzeme_adi} malzemesinden {miktar} adet çıkış yapıldı.")
+        def hata(e):
+            if isinstance(e, StokHatasi):
+                messagebox.showerror("Hata", str(e))
+            else:
+                messagebox.showerror("Hata", f"Fiş kaydedilemedi, hiçbir çıkış yapılmadı!\n{str(e)}")
         
-            # Formu temizle ve verileri yenile
-            self._temizle_cikti_form()
-            self._update_malzeme_listesi()
-            self._load_data()
-    
-        except ValueError:
-            messagebox.showerror("Hata", "Geçersiz miktar! Sayı giriniz.")
-        except Exception as e:
-            messagebox.showerror("Hata", f"Bir hata oluştu:\n{str(e)}")   
+        # Fişin tamamı yazılır ya da hiçbiri; görünümler tek bildirimle güncellenir
+        self._yaz('cikis_fisi', dict(personel=personel, tarih=tarih, satirlar=satirlar), basarili, hata)
 
     def _temizle_form(self):
         """Formu temizler"""
@@ -729,20 +1489,37 @@ class StopTakipPro:
         self.entry_tedarikci.delete(0, tk.END)
         self.entry_ad.focus_set()
 
+    def _load_arama_indeksleri(self):
+        """Malzeme adı ve tedarikçi arama indekslerini arka planda yeniden kurar"""
+        def kur(conn):
+            return {
+                'ad': AramaIndeksi(self.veri.malzeme_adlari(conn)),
+                'tedarikci': AramaIndeksi(self.veri.tedarikciler(conn))
+            }
+        
+        def ata(indeksler):
+            self.arama_indeksleri = indeksler
+            # Giriş formu kurulduysa önerileri yeni indeksten yenile
+            if hasattr(self, 'entry_tedarikci'):
+                for alan, widget in (('ad', self.entry_ad), ('tedarikci', self.entry_tedarikci)):
+                    widget['values'] = indeksler[alan].ara(widget.get())
+        
+        self.sorgular.calistir("arama_indeksi", kur, ata, self._sorgu_hatasi)
+
     def _autocomplete(self, event, field_type):
-        """Otomatik tamamlama işlemini gerçekleştirir"""
+        """Otomatik tamamlamayı tuş vuruşları durulunca çalıştırır"""
         widget = event.widget
-        text = widget.get()
-    
-        if field_type == 'ad':
-            self.c.execute("SELECT DISTINCT ad FROM malzeme_girisleri WHERE ad LIKE ?", (f'%{text}%',))
-            values = [row[0] for row in self.c.fetchall()]
-        elif field_type == 'tedarikci':
-            self.c.execute("SELECT DISTINCT tedarikci FROM malzeme_girisleri WHERE tedarikci LIKE ?", (f'%{text}%',))
-            values = [row[0] for row in self.c.fetchall()]
-    
-        widget['values'] = values
-    
+        onceki = self._autocomplete_zamanlayici.get(widget)
+        if onceki:
+            self.root.after_cancel(onceki)
+        self._autocomplete_zamanlayici[widget] = self.root.after(
+            150, lambda: self._autocomplete_uygula(widget, field_type))
+
+    def _autocomplete_uygula(self, widget, field_type):
+        """Bellek içi indeksten önerileri alır ve widget'a yazar"""
+        self._autocomplete_zamanlayici.pop(widget, None)
+        widget['values'] = self.arama_indeksleri[field_type].ara(widget.get())
+
     def malzeme_ekle(self):
         """Yeni malzeme ekler"""
         try:
@@ -750,68 +1527,125 @@ class StopTakipPro:
             fiyat = float(self.entry_fiyat.get())
             adet = int(self.entry_adet.get())
             kdv_orani = float(self.entry_kdv.get()) / 100
-            tarih = self.entry_tarih.get()
+            tarih = parse_date(self.entry_tarih.get())
             kategori = self.entry_kategori.get().strip()
             tedarikci = self.entry_tedarikci.get().strip()
+        except ValueError as e:
+            messagebox.showerror("Hata", f"Geçersiz veri girişi!\n{str(e)}")
+            return
         
-            if not ad:
-                messagebox.showerror("Hata", "Malzeme adı boş olamaz!")
-                return
-        
-            # KDV hesaplamaları
-            kdvsiz_toplam = fiyat * adet
-            kdv_tutari = kdvsiz_toplam * kdv_orani
-            kdv_dahil_toplam = kdvsiz_toplam + kdv_tutari
-        
-            # Veritabanına ekle
-            self.c.execute(
-                "INSERT INTO malzeme_girisleri (ad, fiyat, adet, kdv, kdv_tutari, toplam, tarih, kategori, tedarikci) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                (ad, fiyat, adet, kdv_orani, kdv_tutari, kdv_dahil_toplam, tarih, kategori if kategori else None, tedarikci if tedarikci else None)
-            )
-        
-            # Mevcut stok güncelleme
-            self.c.execute(
-                "INSERT OR REPLACE INTO mevcut_stok (malzeme_adi, toplam_adet) "
-                "VALUES (?, COALESCE((SELECT toplam_adet FROM mevcut_stok WHERE malzeme_adi=?), 0) + ?)",
-                (ad, ad, adet)
-            )
-        
-            self.conn.commit()
-        
+        def basarili(sonuc):
+            tutarlar = sonuc.deger
             messagebox.showinfo("Başarılı", 
                               f"{ad} malzemesi başarıyla eklendi!\n"
-                              f"KDV'siz Toplam: {kdvsiz_toplam:.2f} ₺\n"
-                              f"KDV Tutarı: {kdv_tutari:.2f} ₺\n"
-                              f"KDV Dahil Toplam: {kdv_dahil_toplam:.2f} ₺")
-        
-            # Formu temizle ve verileri yenile
+                              f"KDV'siz Toplam: {tutarlar.kdvsiz_toplam:.2f} ₺\n"
+                              f"KDV Tutarı: {tutarlar.kdv_tutari:.2f} ₺\n"
+                              f"KDV Dahil Toplam: {tutarlar.kdv_dahil_toplam:.2f} ₺")
+            
+            # Formu temizle
             self._temizle_form()
-            self._load_data()
         
-        except ValueError as e:
-            messagebox.showerror("Hata", f"Geçersiz veri girişi!\n{str(e)}")
+        # Etkilenen görünümler değişiklik bildirimiyle güncellenir
+        self._yaz('giris', dict(ad=ad, fiyat=fiyat, adet=adet, kdv_orani=kdv_orani, tarih=tarih,
+                                kategori=kategori, tedarikci=tedarikci), basarili)
+
+    def _toplu_ice_aktar(self):
+        """CSV/Excel dosyasındaki girişleri tek işlemde ekler"""
+        if not self._yerel_kipte():
+            return
+        dosya = filedialog.askopenfilename(
+            title="İçe Aktarılacak Dosyayı Seçin",
+            filetypes=[("Excel / CSV", "*.xlsx *.csv"), ("Tüm Dosyalar", "*.*")]
+        )
+        if not dosya:
+            return
+
+        try:
+            kdv = float(self.entry_kdv.get() or self.default_kdv_rate)
+        except ValueError:
+            kdv = self.default_kdv_rate
+
+        try:
+            girisler, okuma_hatalari, toplam = stok_aktarim.giris_dosyasini_oku(dosya, kdv_varsayilan=kdv)
+        except StokHatasi as e:
+            messagebox.showerror("Hata", str(e))
+            return
         except Exception as e:
-            messagebox.showerror("Hata", f"Bir hata oluştu!\n{str(e)}")
+            messagebox.showerror("Hata", f"Dosya içe aktarılamadı, hiçbir kayıt eklenmedi!\n{str(e)}")
+            return
 
-    def _setup_depo_takip(self):
+        # İlerleme penceresi; kuyruk yalnızca sayacı yazar, çubuk Tk tarafında yoklanır
+        pencere = tk.Toplevel(self.root)
+        pencere.title("İçe Aktarılıyor")
+        pencere.transient(self.root)
+        pencere.grab_set()
+        etiket = ttk.Label(pencere, text=os.path.basename(dosya))
+        etiket.pack(padx=20, pady=(15, 5))
+        cubuk = ttk.Progressbar(pencere, mode='determinate', length=320)
+        cubuk.pack(padx=20, pady=(5, 15))
+        durum = {'islenen': 0, 'bitti': False}
+
+        def guncelle():
+            if durum['bitti']:
+                return
+            islenen = durum['islenen']
+            cubuk['maximum'] = max(toplam, islenen, 1)
+            cubuk['value'] = islenen
+            etiket.config(text=f"{islenen} / {toplam} satır")
+            self.root.after(100, guncelle)
+
+        def kapat():
+            durum['bitti'] = True
+            pencere.grab_release()
+            pencere.destroy()
+
+        def tamamlandi(sonuc):
+            kapat()
+            self._ice_aktarma_sonucu(sonuc.deger, okuma_hatalari)
+
+        def hata(e):
+            kapat()
+            if isinstance(e, StokHatasi):
+                messagebox.showerror("Hata", str(e))
+            else:
+                messagebox.showerror("Hata", f"Dosya içe aktarılamadı, hiçbir kayıt eklenmedi!\n{str(e)}")
+
+        # Dosya yazma kuyruğunun iş parçacığında okunur; tüm satırlar tek işlemde yazılır
+        self._yaz('toplu_giris',
+                  {'satirlar': girisler, 'ilerleme': lambda islenen: durum.update(islenen=islenen)},
+                  tamamlandi, hata)
+        guncelle()
+
+    def _ice_aktarma_sonucu(self, sonuc, okuma_hatalari):
+        """Toplu içe aktarmanın sonucunu ve atlanan satırları gösterir"""
+        sonuc.hatalar = sorted(sonuc.hatalar + okuma_hatalari)
+        mesaj = f"{sonuc.eklenen} giriş eklendi."
+        if sonuc.hatalar:
+            rapor_dir = os.path.join(get_app_data_path(), "exports")
+            os.makedirs(rapor_dir, exist_ok=True)
+            rapor = os.path.join(rapor_dir, f"aktarim_hatalari_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+            stok_aktarim.hata_raporu_yaz(sonuc, rapor)
+            ilk_hatalar = "\n".join(f"Satır {no}: {hata}" for no, hata in sonuc.hatalar[:10])
+            mesaj += f"\n{len(sonuc.hatalar)} satır atlandı:\n{ilk_hatalar}\n\nHata raporu:\n{rapor}"
+            messagebox.showwarning("İçe Aktarma", mesaj)
+        else:
+            messagebox.showinfo("Başarılı", mesaj)
+
+    def _setup_depo_takip(self, frame):
         """Depo takip sekmesini yeniden düzenler (basitleştirilmiş versiyon)"""
-        frame = ttk.Frame(self.notebook, style="Card.TFrame")
-        self.notebook.add(frame, text="📦 Depo Takip")
         
         # Notebook oluştur (alt sekmeler için)
         self.depo_notebook = ttk.Notebook(frame)
         self.depo_notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.depo_notebook.bind('<<NotebookTabChanged>>', self._sekme_degisti)
         
-        # Hareket Raporu Sekmesi
-        self._setup_hareket_raporu_tab()
-        
-        # Mevcut Stok Sekmesi
-        self._setup_mevcut_stok_tab()
+        # Alt sekmeler de ilk seçildiklerinde kurulur
+        self._sekme_ekle(self.depo_notebook, "Hareket Raporu", self._setup_hareket_raporu_tab)
+        self._sekme_ekle(self.depo_notebook, "Mevcut Stok", self._setup_mevcut_stok_tab)
+        self._sekmeyi_kur(self.depo_notebook)
 
-    def _setup_hareket_raporu_tab(self):
+    def _setup_hareket_raporu_tab(self, tab):
         """Hareket raporu alt sekmesini oluşturur"""
-        tab = ttk.Frame(self.depo_notebook, style="Card.TFrame")
-        self.depo_notebook.add(tab, text="Hareket Raporu")
 
         # Başlık
         ttk.Label(tab, text="DEPO HAREKET RAPORU", style="Title.TLabel").pack(pady=(10, 15))
@@ -856,7 +1690,7 @@ class StopTakipPro:
 
         # Filtrele butonu
         ttk.Button(filter_frame, text="Filtrele", style="Primary.TButton",
-                command=self._filter_hareket_raporu).grid(row=1, column=4, padx=10, ipadx=10, ipady=3)
+                command=self.izci.sar("Filtrele: Hareket", self._filter_hareket_raporu)).grid(row=1, column=4, padx=10, ipadx=10, ipady=3)
         ttk.Button(filter_frame, text="Filtreyi Temizle", style="Warning.TButton",
                 command=self._clear_hareket_filter).grid(row=1, column=5, padx=5, ipadx=10, ipady=3)
 
@@ -879,23 +1713,8 @@ class StopTakipPro:
             ("Açıklama", 200)
         ]
 
-        self.hareket_tree = ttk.Treeview(
-            self.hareket_tree_frame,
-            columns=[col[0] for col in columns],
-            show="headings",
-            selectmode="extended"
-        )
-
-        # Sütun başlıkları ve genişlikleri
-        for col, width in columns:
-            self.hareket_tree.heading(col, text=col)
-            self.hareket_tree.column(col, width=width, anchor=tk.CENTER)
-
-        # Scrollbar
-        scrollbar = ttk.Scrollbar(self.hareket_tree_frame, orient=tk.VERTICAL, command=self.hareket_tree.yview)
-        self.hareket_tree.configure(yscroll=scrollbar.set)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.hareket_tree.pack(fill=tk.BOTH, expand=True)
+        # Sanal tablo: yalnızca görünen satırlar oluşturulur
+        self.hareket_tablo = SanalTablo(self.hareket_tree_frame, columns)
 
         # Toplam paneli
         self.hareket_total_frame = ttk.Frame(tab, style="Card.TFrame", padding=(15, 10))
@@ -925,181 +1744,75 @@ class StopTakipPro:
         btn_frame = ttk.Frame(tab)
         btn_frame.pack(fill=tk.X, padx=20, pady=10)
 
-        ttk.Button(btn_frame, text="Excel'e Aktar", style="Success.TButton",
-                command=lambda: self._export_excel(self.hareket_tree)).pack(side=tk.LEFT, padx=10, ipadx=15, ipady=5)
+        ttk.Button(btn_frame, text="Dışa Aktar", style="Success.TButton",
+                command=lambda: self._disa_aktar('hareket')).pack(side=tk.LEFT, padx=10, ipadx=15, ipady=5)
         ttk.Button(btn_frame, text="Güncelle", style="Primary.TButton",
-                command=self._load_hareket_raporu).pack(side=tk.RIGHT, padx=10, ipadx=15, ipady=5)
+                command=self.izci.sar("Güncelle: Hareket", self._load_hareket_raporu)).pack(side=tk.RIGHT, padx=10, ipadx=15, ipady=5)
 
-        # İlk yükleme
+        # İlk yükleme (kategoriler açılışta okunmuştur)
+        self.kategori_filtre['values'] = self._kategori_listesi
         self._load_hareket_raporu()
-        self._load_categories()
         
     def _load_hareket_raporu(self):
         """Hareket raporu verilerini yükler ve görüntüler"""
+        # Tarih formatını kontrol et
         try:
-            # Treeview'ı temizle
-            for row in self.hareket_tree.get_children():
-                self.hareket_tree.delete(row)
-
-            # Filtreleri al ve doğrula
-            baslangic_tarih = self.hareket_baslangic_tarih.get()
-            bitis_tarih = self.hareket_bitis_tarih.get()
-            kategori = self.kategori_filtre.get()
-            malzeme = self.malzeme_filtre.get()
-            hareket_turu = self.hareket_turu_filtre.get()
-
-            # Tarih formatını kontrol et
-            try:
-                baslangic_date = datetime.strptime(baslangic_tarih, "%d.%m.%Y")
-                bitis_date = datetime.strptime(bitis_tarih, "%d.%m.%Y")
-
-                # Başlangıç tarihi bitiş tarihinden sonra olamaz
-                if baslangic_date > bitis_date:
-                    messagebox.showerror("Hata", "Başlangıç tarihi bitiş tarihinden sonra olamaz!")
-                    return
-
-            except ValueError:
-                messagebox.showerror("Hata", "Geçersiz tarih formatı! Lütfen dd.mm.yyyy formatında girin.")
-                return
+            baslangic_date = parse_date(self.hareket_baslangic_tarih.get())
+            bitis_date = parse_date(self.hareket_bitis_tarih.get())
+        except ValueError:
+            messagebox.showerror("Hata", "Geçersiz tarih formatı! Lütfen dd.mm.yyyy formatında girin.")
+            return
 
-            # Giriş hareketleri için sorgu
-            giris_query = """
-            SELECT 
-                mg.tarih AS hareket_tarih,
-                mg.ad AS malzeme_adi,
-                'Giriş' AS hareket_turu,
-                mg.adet AS miktar,
-                mg.fiyat AS birim_fiyat,
-                (mg.fiyat * mg.adet) AS kdvsiz_toplam,
-                mg.kdv_tutari AS kdv_tutari,
-                mg.toplam AS toplam_maliyet,
-                COALESCE(mg.tedarikci, 'Belirtilmemiş') AS tedarikci,
-                COALESCE(mg.kategori, 'Kategorisiz') AS kategori,
-                '' AS aciklama
-            FROM malzeme_girisleri mg
-            WHERE date(substr(mg.tarih, 7, 4) || '-' || substr(mg.tarih, 4, 2) || '-' || substr(mg.tarih, 1, 2)) 
-                BETWEEN date(?) AND date(?)
-            """
-
-            giris_params = [
-                baslangic_date.strftime("%Y-%m-%d"), 
-                bitis_date.strftime("%Y-%m-%d")
-            ]
-
-            if kategori and kategori.strip():
-                giris_query += " AND mg.kategori = ?"
-                giris_params.append(kategori.strip())
-
-            if malzeme and malzeme.strip():
-                giris_query += " AND mg.ad LIKE ?"
-                giris_params.append(f'%{malzeme.strip()}%')
-
-            # Çıkış hareketleri için sorgu
-            cikis_query = """
-            SELECT 
-                mc.tarih AS hareket_tarih,
-                mc.malzeme_adi AS malzeme_adi,
-                'Çıkış' AS hareket_turu,
-                mc.cikis_adedi AS miktar,
-                (SELECT mg.fiyat FROM malzeme_girisleri mg WHERE mg.id = mc.giris_id) AS birim_fiyat,
-                (mc.cikis_adedi * (SELECT mg.fiyat FROM malzeme_girisleri mg WHERE mg.id = mc.giris_id)) AS kdvsiz_toplam,
-                (mc.cikis_adedi * (SELECT mg.kdv_tutari/mg.adet FROM malzeme_girisleri mg WHERE mg.id = mc.giris_id)) AS kdv_tutari,
-                (mc.cikis_adedi * (SELECT mg.toplam/mg.adet FROM malzeme_girisleri mg WHERE mg.id = mc.giris_id)) AS toplam_maliyet,
-                mc.personel AS personel,
-                (SELECT COALESCE(mg.kategori, 'Kategorisiz') FROM malzeme_girisleri mg WHERE mg.id = mc.giris_id) AS kategori,
-                COALESCE(mc.aciklama, '') AS aciklama
-            FROM malzeme_cikislari mc
-            WHERE date(substr(mc.tarih, 7, 4) || '-' || substr(mc.tarih, 4, 2) || '-' || substr(mc.tarih, 1, 2)) 
-                BETWEEN date(?) AND date(?)
-            """
-
-            cikis_params = [
-                baslangic_date.strftime("%Y-%m-%d"), 
-                bitis_date.strftime("%Y-%m-%d")
-            ]
-
-            if kategori and kategori.strip():
-                cikis_query += " AND EXISTS (SELECT 1 FROM malzeme_girisleri mg WHERE mg.id = mc.giris_id AND mg.kategori = ?)"
-                cikis_params.append(kategori.strip())
-
-            if malzeme and malzeme.strip():
-                cikis_query += " AND mc.malzeme_adi LIKE ?"
-                cikis_params.append(f'%{malzeme.strip()}%')
-
-            # Sorguyu oluştur
-            if hareket_turu == 'Giriş':
-                query = giris_query + " ORDER BY date(substr(hareket_tarih, 7, 4) || '-' || substr(hareket_tarih, 4, 2) || '-' || substr(hareket_tarih, 1, 2)) DESC"
-                params = giris_params
-            elif hareket_turu == 'Çıkış':
-                query = cikis_query + " ORDER BY date(substr(hareket_tarih, 7, 4) || '-' || substr(hareket_tarih, 4, 2) || '-' || substr(hareket_tarih, 1, 2)) DESC"
-                params = cikis_params
-            else:  # Tümü
-                query = f"""
-                SELECT * FROM (
-                    {giris_query}
-                    UNION ALL
-                    {cikis_query}
-                ) 
-                ORDER BY date(substr(hareket_tarih, 7, 4) || '-' || substr(hareket_tarih, 4, 2) || '-' || substr(hareket_tarih, 1, 2)) DESC
-                """
-                params = giris_params + cikis_params
-
-            # Sorguyu çalıştır
-            self.c.execute(query, params)
-            rows = self.c.fetchall()
-
-            # Toplamları hesapla
-            toplam_giris = 0
-            toplam_cikis = 0
-            toplam_kdvsiz = 0.0
-            toplam_kdv = 0.0
-            toplam_maliyet = 0.0
-
-            for row in rows:
-                # Treeview'a ekle
-                self.hareket_tree.insert("", tk.END, values=row)
-
-                # Toplamları güncelle
-                if row[2] == 'Giriş':
-                    toplam_giris += row[3] if row[3] else 0
-                else:
-                    toplam_cikis += row[3] if row[3] else 0
-
-                toplam_kdvsiz += row[5] if row[5] else 0
-                toplam_kdv += row[6] if row[6] else 0
-                toplam_maliyet += row[7] if row[7] else 0
+        filtre = stok_veri.HareketFiltresi(
+            baslangic=baslangic_date,
+            bitis=bitis_date,
+            kategori=self.kategori_filtre.get(),
+            malzeme=self.malzeme_filtre.get(),
+            hareket_turu=self.hareket_turu_filtre.get()
+        )
+        self._hareket_filtresi = filtre
+
+        # Toplamlar ve ilk sayfa arka planda okunur; sayfa sınırları paralel
+        # hesaplanır, kalan sayfalar kaydırdıkça sınırlarından okunur
+        sinirlar = []
+
+        def sorgula(conn):
+            rapor = self.veri.hareket_toplamlari(conn, filtre)
+            ilk_sayfa = self.veri.hareket_sayfasi(conn, filtre, None, SanalTablo.SAYFA_BOYUTU)
+            return rapor, ilk_sayfa
+
+        def goster(sonuc):
+            rapor, ilk_sayfa = sonuc
+            self.hareket_tablo.yukle(
+                rapor.satir_sayisi,
+                self._sayfa_isteyici(
+                    "hareket_sayfa", sinirlar,
+                    lambda conn, boyut: self.veri.hareket_sayfa_sinirlari(conn, filtre, boyut),
+                    lambda conn, sonra, adet: self.veri.hareket_sayfasi(conn, filtre, sonra, adet)),
+                ilk_sayfa
+            )
 
             # Toplamları göster
-            self.label_toplam_giris.config(text=str(toplam_giris))
-            self.label_toplam_cikis.config(text=str(toplam_cikis))
-            self.label_kdvsiz_toplam.config(text=f"{toplam_kdvsiz:.2f} ₺")
-            self.label_kdv_tutari.config(text=f"{toplam_kdv:.2f} ₺")
-            self.label_toplam_maliyet.config(text=f"{toplam_maliyet:.2f} ₺")
-
-        except sqlite3.Error as e:
-            messagebox.showerror("Veritabanı Hatası", f"Veritabanı hatası oluştu:\n{str(e)}")
-        except Exception as e:
-            messagebox.showerror("Hata", f"Beklenmeyen bir hata oluştu:\n{str(e)}")
-
-    def _filter_hareket_raporu(self):
-        """Hareket raporu verilerini filtreler"""
-        self._load_hareket_raporu()
-
-    def _clear_hareket_filter(self):
-        """Hareket raporu filtrelerini temizler"""
-        self.hareket_baslangic_tarih.set_date(datetime.now().replace(day=1))
-        self.hareket_bitis_tarih.set_date(datetime.now())
-        self.kategori_filtre.set('')
-        self.malzeme_filtre.set('')
-        self.hareket_turu_filtre.current(0)
-        self._load_hareket_raporu()
-        
-
-
-    def _setup_mevcut_stok_tab(self):
+            self.label_toplam_giris.config(text=str(rapor.toplam_giris))
+            self.label_toplam_cikis.config(text=str(rapor.toplam_cikis))
+            self.label_kdvsiz_toplam.config(text=f"{rapor.toplam_kdvsiz:.2f} ₺")
+            self.label_kdv_tutari.config(text=f"{rapor.toplam_kdv:.2f} ₺")
+            self.label_toplam_maliyet.config(text=f"{rapor.toplam_maliyet:.2f} ₺")
+
+        def hata(e):
+            self.hareket_tablo.temizle()
+            self._sorgu_hatasi(e)
+
+        self.sorgular.calistir("hareket", sorgula, goster, hata,
+                               onbellek_anahtari=('hareket', filtre.anahtar()))
+        self.sorgular.calistir(
+            "hareket_sinirlari",
+            lambda conn: self.veri.hareket_sayfa_sinirlari(conn, filtre, SanalTablo.SAYFA_BOYUTU),
+            sinirlar.extend, self._sorgu_hatasi,
+            onbellek_anahtari=('hareket_sinirlari', filtre.anahtar()))
+
+    def _setup_mevcut_stok_tab(self, tab):
         """Mevcut stok alt sekmesini oluşturur"""
-        tab = ttk.Frame(self.depo_notebook, style="Card.TFrame")
-        self.depo_notebook.add(tab, text="Mevcut Stok")
         
         # Başlık
         ttk.Label(tab, text="MEVCUT STOK DURUMU", style="Title.TLabel").pack(pady=(10, 15))
@@ -1128,7 +1841,7 @@ class StopTakipPro:
         
         # Filtrele butonu
         ttk.Button(filter_frame, text="Filtrele", style="Primary.TButton",
-                  command=self._filter_mevcut_stok).grid(row=0, column=6, padx=10, ipadx=10, ipady=3)
+                  command=self.izci.sar("Filtrele: Stok", self._filter_mevcut_stok)).grid(row=0, column=6, padx=10, ipadx=10, ipady=3)
         ttk.Button(filter_frame, text="Filtreyi Temizle", style="Warning.TButton",
                   command=self._clear_stok_filter).grid(row=0, column=7, padx=5, ipadx=10, ipady=3)
         
@@ -1149,23 +1862,8 @@ class StopTakipPro:
             ("Son Giriş Tarihi", 120)
         ]
         
-        self.stok_tree = ttk.Treeview(
-            self.stok_tree_frame, 
-            columns=[col[0] for col in columns],
-            show="headings",
-            selectmode="extended"
-        )
-        
-        # Sütun başlıkları ve genişlikleri
-        for col, width in columns:
-            self.stok_tree.heading(col, text=col)
-            self.stok_tree.column(col, width=width, anchor=tk.CENTER)
-        
-        # Scrollbar
-        scrollbar = ttk.Scrollbar(self.stok_tree_frame, orient=tk.VERTICAL, command=self.stok_tree.yview)
-        self.stok_tree.configure(yscroll=scrollbar.set)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.stok_tree.pack(fill=tk.BOTH, expand=True)
+        # Sanal tablo: yalnızca görünen satırlar oluşturulur
+        self.stok_tablo = SanalTablo(self.stok_tree_frame, columns)
         
         # Toplam paneli
         self.stok_total_frame = ttk.Frame(tab, style="Card.TFrame", padding=(15, 10))
@@ -1195,92 +1893,81 @@ class StopTakipPro:
         btn_frame = ttk.Frame(tab)
         btn_frame.pack(fill=tk.X, padx=20, pady=10)
         
-        ttk.Button(btn_frame, text="Excel'e Aktar", style="Success.TButton",
-                  command=lambda: self._export_excel(self.stok_tree)).pack(side=tk.LEFT, padx=10, ipadx=15, ipady=5)
+        ttk.Button(btn_frame, text="Dışa Aktar", style="Success.TButton",
+                  command=lambda: self._disa_aktar('stok')).pack(side=tk.LEFT, padx=10, ipadx=15, ipady=5)
         ttk.Button(btn_frame, text="Güncelle", style="Primary.TButton",
-                  command=self._load_mevcut_stok).pack(side=tk.RIGHT, padx=10, ipadx=15, ipady=5)
+                  command=self.izci.sar("Güncelle: Stok", self._load_mevcut_stok)).pack(side=tk.RIGHT, padx=10, ipadx=15, ipady=5)
         
-        # İlk yükleme
+        # İlk yükleme (kategoriler açılışta okunmuştur)
+        self.stok_kategori_filtre['values'] = self._kategori_listesi
         self._load_mevcut_stok()
-        self._load_categories()
 
     def _load_mevcut_stok(self):
         """Mevcut stok verilerini yükler"""
-        # Treeview'ı temizle
-        for row in self.stok_tree.get_children():
-            self.stok_tree.delete(row)
-    
-        # Filtreleri al
-        kategori = self.stok_kategori_filtre.get()
-        malzeme = self.stok_malzeme_filtre.get()
-        stok_durumu = self.stok_durumu_filtre.get()
-    
-        # Sorguyu oluştur
-        query = """
-        SELECT 
-            ms.malzeme_adi AS malzeme_adi,
-            COALESCE((SELECT kategori FROM malzeme_girisleri WHERE ad=ms.malzeme_adi LIMIT 1), 'Kategorisiz') AS kategori,
-            ms.toplam_adet AS mevcut_stok,
-            (SELECT fiyat FROM malzeme_girisleri WHERE ad=ms.malzeme_adi ORDER BY tarih DESC LIMIT 1) AS birim_fiyat,
-            (ms.toplam_adet * (SELECT fiyat FROM malzeme_girisleri WHERE ad=ms.malzeme_adi ORDER BY tarih DESC LIMIT 1)) AS kdvsiz_toplam,
-            (ms.toplam_adet * (SELECT kdv_tutari/adet FROM malzeme_girisleri WHERE ad=ms.malzeme_adi ORDER BY tarih DESC LIMIT 1)) AS kdv_tutari,
-            (ms.toplam_adet * (SELECT toplam/adet FROM malzeme_girisleri WHERE ad=ms.malzeme_adi ORDER BY tarih DESC LIMIT 1)) AS toplam_maliyet,
-            COALESCE((SELECT tedarikci FROM malzeme_girisleri WHERE ad=ms.malzeme_adi ORDER BY tarih DESC LIMIT 1), 'Belirtilmemiş') AS tedarikci,
-            (SELECT MAX(tarih) FROM malzeme_girisleri WHERE ad=ms.malzeme_adi) AS son_giris_tarihi
-        FROM mevcut_stok ms
-        WHERE ms.toplam_adet > 0
+        filtre = stok_veri.StokFiltresi(
+            kategori=self.stok_kategori_filtre.get(),
+            malzeme=self.stok_malzeme_filtre.get(),
+            stok_durumu=self.stok_durumu_filtre.get()
+        )
+        self._stok_filtresi = filtre
+        
+        # Toplamlar ve ilk sayfa arka planda okunur; sayfa sınırları paralel
+        # hesaplanır, kalan sayfalar kaydırdıkça sınırlarından okunur
+        sinirlar = []
+
+        def sorgula(conn):
+            rapor = self.veri.stok_toplamlari(conn, filtre)
+            ilk_sayfa = self.veri.stok_sayfasi(conn, filtre, None, SanalTablo.SAYFA_BOYUTU)
+            return rapor, ilk_sayfa
+
+        def goster(sonuc):
+            rapor, ilk_sayfa = sonuc
+            self.stok_tablo.yukle(
+                rapor.satir_sayisi,
+                self._sayfa_isteyici(
+                    "stok_sayfa", sinirlar,
+                    lambda conn, boyut: self.veri.stok_sayfa_sinirlari(conn, filtre, boyut),
+                    lambda conn, sonra, adet: self.veri.stok_sayfasi(conn, filtre, sonra, adet)),
+                ilk_sayfa
+            )
+        
+            # Toplamları güncelle
+            self.stok_label_toplam_malzeme.config(text=str(rapor.toplam_malzeme))
+            self.stok_label_kdvsiz_toplam.config(text=f"{rapor.toplam_kdvsiz:.2f} ₺")
+            self.stok_label_kdv_tutari.config(text=f"{rapor.toplam_kdv:.2f} ₺")
+            self.stok_label_toplam_maliyet.config(text=f"{rapor.toplam_maliyet:.2f} ₺")
+            self.stok_label_dusuk_stok.config(text=str(rapor.dusuk_stok))
+
+        def hata(e):
+            self.stok_tablo.temizle()
+            self._sorgu_hatasi(e)
+
+        self.sorgular.calistir("stok", sorgula, goster, hata,
+                               onbellek_anahtari=('stok', filtre.anahtar()))
+        self.sorgular.calistir(
+            "stok_sinirlari",
+            lambda conn: self.veri.stok_sayfa_sinirlari(conn, filtre, SanalTablo.SAYFA_BOYUTU),
+            sinirlar.extend, self._sorgu_hatasi,
+            onbellek_anahtari=('stok_sinirlari', filtre.anahtar()))
+
+    def _sayfa_isteyici(self, anahtar, sinirlar, sinirlari_oku, sayfa_oku):
+        """SanalTablo için sayfaları arka planda okuma bağlantısıyla okuyan sayfa_iste fonksiyonu
+        
+        Her sayfa sinirlar listesindeki anahtarından itibaren okunur (OFFSET
+        yok). Liste henüz dolmadan sayfa istenirse iş sınırları kendisi hesaplar.
         """
-    
-        params = []
-    
-        if kategori:
-            query += " AND EXISTS (SELECT 1 FROM malzeme_girisleri mg WHERE mg.ad=ms.malzeme_adi AND mg.kategori = ?)"
-            params.append(kategori)
-    
-        if malzeme:
-            query += " AND ms.malzeme_adi LIKE ?"
-            params.append(f'%{malzeme}%')
-    
-        if stok_durumu == 'Düşük Stok (<10)':
-            query += " AND ms.toplam_adet < 10"
-        elif stok_durumu == 'Normal Stok':
-            query += " AND ms.toplam_adet >= 10"
-    
-        query += " ORDER BY ms.malzeme_adi"
-    
-        self.c.execute(query, params)
-        rows = self.c.fetchall()
-    
-        total_malzeme = 0
-        total_kdvsiz = 0.0
-        total_kdv = 0.0
-        total_maliyet = 0.0
-        dusuk_stok = 0
-    
-        for row in rows:
-            formatted_row = list(row)
-            # Tarih formatını düzelt
-            if formatted_row[8]:
-                try:
-                    tarih = datetime.strptime(formatted_row[8], "%d.%m.%Y").strftime("%d.%m.%Y")
-                    formatted_row[8] = tarih
-                except:
-                    formatted_row[8] = "Bilinmiyor"
-            
-            self.stok_tree.insert("", tk.END, values=formatted_row)
-            total_malzeme += row[2]
-            total_kdvsiz += row[4] if row[4] else 0
-            total_kdv += row[5] if row[5] else 0
-            total_maliyet += row[6] if row[6] else 0
-            if row[2] < 10:
-                dusuk_stok += 1
-    
-        # Toplamları güncelle
-        self.stok_label_toplam_malzeme.config(text=str(total_malzeme))
-        self.stok_label_kdvsiz_toplam.config(text=f"{total_kdvsiz:.2f} ₺")
-        self.stok_label_kdv_tutari.config(text=f"{total_kdv:.2f} ₺")
-        self.stok_label_toplam_maliyet.config(text=f"{total_maliyet:.2f} ₺")
-        self.stok_label_dusuk_stok.config(text=str(dusuk_stok))   
+        def sayfa_iste(sayfa_nolari, teslim, hata):
+            def oku(conn):
+                liste = sinirlar or sinirlari_oku(conn, SanalTablo.SAYFA_BOYUTU)
+                return {no: sayfa_oku(conn, liste[no], SanalTablo.SAYFA_BOYUTU) if no < len(liste) else []
+                        for no in sayfa_nolari}
+
+            def hata_goster(e):
+                hata(e)
+                self._sorgu_hatasi(e)
+
+            self.sorgular.calistir(anahtar, oku, teslim, hata_goster)
+        return sayfa_iste
 
     def _filter_hareket_raporu(self):
         """Hareket raporu verilerini filtreler"""
@@ -1306,10 +1993,8 @@ class StopTakipPro:
         self.stok_durumu_filtre.current(0)
         self._load_mevcut_stok()
 
-    def _setup_aylik_rapor(self):
+    def _setup_aylik_rapor(self, frame):
         """Aylık rapor sekmesini oluşturur"""
-        frame = ttk.Frame(self.notebook, style="Card.TFrame")
-        self.notebook.add(frame, text="📈 Aylık Rapor")
         
         # Başlık
         ttk.Label(frame, text="AYLIK MALZEME HAREKET RAPORU", style="Title.TLabel").pack(pady=(10, 15))
@@ -1338,7 +2023,7 @@ class StopTakipPro:
         
         # Filtrele butonu
         ttk.Button(filter_frame, text="Filtrele", style="Primary.TButton",
-                  command=self._load_aylik_rapor).grid(row=0, column=6, padx=10, ipadx=10, ipady=3)
+                  command=self.izci.sar("Filtrele: Aylık", self._load_aylik_rapor)).grid(row=0, column=6, padx=10, ipadx=10, ipady=3)
         ttk.Button(filter_frame, text="Filtreyi Temizle", style="Warning.TButton",
                   command=self._clear_aylik_filter).grid(row=0, column=7, padx=5, ipadx=10, ipady=3)
         
@@ -1407,131 +2092,47 @@ class StopTakipPro:
         btn_frame = ttk.Frame(frame)
         btn_frame.pack(fill=tk.X, padx=20, pady=10)
     
-        ttk.Button(btn_frame, text="Excel'e Aktar", style="Success.TButton",
-                  command=lambda: self._export_excel(self.aylik_tree)).pack(side=tk.LEFT, padx=10, ipadx=15, ipady=5)
+        ttk.Button(btn_frame, text="Dışa Aktar", style="Success.TButton",
+                  command=lambda: self._disa_aktar('aylik')).pack(side=tk.LEFT, padx=10, ipadx=15, ipady=5)
         ttk.Button(btn_frame, text="Güncelle", style="Primary.TButton",
-                  command=self._load_aylik_rapor).pack(side=tk.RIGHT, padx=10, ipadx=15, ipady=5)  # Burada _load_aylik_rapor yerine _load_aylik_rapor kullanıldı
+                  command=self.izci.sar("Güncelle: Aylık", self._load_aylik_rapor)).pack(side=tk.RIGHT, padx=10, ipadx=15, ipady=5)
     
-        # İlk yükleme
-        self._load_aylik_rapor()  # Burada da aynı değişiklik
-        self._load_categories()
+        # İlk yükleme (kategoriler açılışta okunmuştur)
+        self.aylik_kategori_filtre['values'] = self._kategori_listesi
+        self._load_aylik_rapor()
 
 
     def _load_aylik_rapor(self):
-        """Aylık rapor verilerini yükler"""
-        # Treeview'ı temizle
-        for row in self.aylik_tree.get_children():
-            self.aylik_tree.delete(row)
-        
-        # Yıl ve filtreleri al
-        yil = self.aylik_yil_filtre.get()
-        kategori = self.aylik_kategori_filtre.get()
-        malzeme = self.aylik_malzeme_filtre.get()
-        
+        """Aylık rapor verilerini arka planda yükler"""
         try:
-            yil = int(yil)
+            yil = int(self.aylik_yil_filtre.get())
         except ValueError:
             messagebox.showerror("Hata", "Geçersiz yıl değeri!")
             return
         
-        # Ayları tanımla
-        aylar = [
-            ("Ocak", 1), ("Şubat", 2), ("Mart", 3), ("Nisan", 4), 
-            ("Mayıs", 5), ("Haziran", 6), ("Temmuz", 7), ("Ağustos", 8), 
-            ("Eylül", 9), ("Ekim", 10), ("Kasım", 11), ("Aralık", 12)
-        ]
+        filtre = stok_veri.AylikFiltre(
+            yil=yil,
+            kategori=self.aylik_kategori_filtre.get(),
+            malzeme=self.aylik_malzeme_filtre.get()
+        )
+        self._aylik_filtresi = filtre
+        self.sorgular.calistir("aylik", lambda conn: self.veri.aylik_rapor(conn, filtre),
+                               self._show_aylik_rapor, self._sorgu_hatasi,
+                               onbellek_anahtari=('aylik', filtre.anahtar()))
+
+    def _show_aylik_rapor(self, rapor):
+        """Aylık rapor sonucunu tabloya ve yıllık toplamlara yazar"""
+        # Treeview'ı temizle
+        for row in self.aylik_tree.get_children():
+            self.aylik_tree.delete(row)
         
-        # Yıllık toplamlar
-        yillik_girdi_kdvsiz = 0.0
-        yillik_girdi_kdv = 0.0
-        yillik_girdi_toplam = 0.0
-        yillik_cikti_kdvsiz = 0.0
-        yillik_cikti_kdv = 0.0
-        yillik_cikti_toplam = 0.0
-        
-        for ay_adi, ay_no in aylar:
-            # Giriş sorgusu (DÜZELTİLMİŞ)
-            giris_query = """
-            SELECT 
-                SUM(mg.fiyat * mg.adet) AS kdvsiz_toplam,
-                SUM(mg.kdv_tutari) AS kdv_tutari,
-                SUM(mg.toplam) AS toplam_maliyet
-            FROM malzeme_girisleri mg
-            WHERE date(substr(mg.tarih, 7, 4) || '-' || substr(mg.tarih, 4, 2) || '-' || substr(mg.tarih, 1, 2)) 
-                  BETWEEN date(?) AND date(?)
-            """
-            
-            giris_params = [
-                datetime(yil, ay_no, 1).strftime("%Y-%m-%d"),
-                (datetime(yil, ay_no+1, 1) - timedelta(days=1)).strftime("%Y-%m-%d") if ay_no != 12 
-                else datetime(yil, ay_no, 31).strftime("%Y-%m-%d")
-            ]
-            
-            if kategori:
-                giris_query += " AND mg.kategori = ?"
-                giris_params.append(kategori)
-            
-            if malzeme:
-                giris_query += " AND mg.ad LIKE ?"
-                giris_params.append(f'%{malzeme}%')
-            
-            self.c.execute(giris_query, giris_params)
-            giris_result = self.c.fetchone()
-            girdi_kdvsiz = giris_result[0] or 0.0
-            girdi_kdv = giris_result[1] or 0.0
-            girdi_toplam = giris_result[2] or 0.0
-            
-            # Çıkış sorgusu (DÜZELTİLMİŞ)
-            cikis_query = """
-            SELECT 
-                SUM(mc.cikis_adedi * (SELECT mg.fiyat FROM malzeme_girisleri mg WHERE mg.id = mc.giris_id)) AS kdvsiz_toplam,
-                SUM(mc.cikis_adedi * (SELECT mg.kdv_tutari/mg.adet FROM malzeme_girisleri mg WHERE mg.id = mc.giris_id)) AS kdv_tutari,
-                SUM(mc.cikis_adedi * (SELECT mg.toplam/mg.adet FROM malzeme_girisleri mg WHERE mg.id = mc.giris_id)) AS toplam_maliyet
-            FROM malzeme_cikislari mc
-            WHERE date(substr(mc.tarih, 7, 4) || '-' || substr(mc.tarih, 4, 2) || '-' || substr(mc.tarih, 1, 2)) 
-                  BETWEEN date(?) AND date(?)
-            """
-            
-            cikis_params = [
-                datetime(yil, ay_no, 1).strftime("%Y-%m-%d"),
-                (datetime(yil, ay_no+1, 1) - timedelta(days=1)).strftime("%Y-%m-%d") if ay_no != 12 
-                else datetime(yil, ay_no, 31).strftime("%Y-%m-%d")
-            ]
-            
-            if kategori:
-                cikis_query += " AND EXISTS (SELECT 1 FROM malzeme_girisleri mg WHERE mg.id = mc.giris_id AND mg.kategori = ?)"
-                cikis_params.append(kategori)
-            
-            if malzeme:
-                cikis_query += " AND mc.malzeme_adi LIKE ?"
-                cikis_params.append(f'%{malzeme}%')
-            
-            self.c.execute(cikis_query, cikis_params)
-            cikis_result = self.c.fetchone()
-            cikti_kdvsiz = cikis_result[0] or 0.0
-            cikti_kdv = cikis_result[1] or 0.0
-            cikti_toplam = cikis_result[2] or 0.0
-            
-            # Treeview'a ekle
-            self.aylik_tree.insert("", tk.END, values=(
-                ay_adi,
-                f"{girdi_kdvsiz:.2f}",
-                f"{girdi_kdv:.2f}",
-                f"{girdi_toplam:.2f}",
-                f"{cikti_kdvsiz:.2f}",
-                f"{cikti_kdv:.2f}",
-                f"{cikti_toplam:.2f}"
-            ))
-            
-            # Yıllık toplamlara ekle
-            yillik_girdi_kdvsiz += girdi_kdvsiz
-            yillik_girdi_kdv += girdi_kdv
-            yillik_girdi_toplam += girdi_toplam
-            yillik_cikti_kdvsiz += cikti_kdvsiz
-            yillik_cikti_kdv += cikti_kdv
-            yillik_cikti_toplam += cikti_toplam
+        # Treeview'a ekle
+        for ay_adi, *tutarlar in rapor.satirlar:
+            self.aylik_tree.insert("", tk.END, values=(ay_adi, *(f"{tutar:.2f}" for tutar in tutarlar)))
         
         # Yıllık toplamları güncelle
+        (yillik_girdi_kdvsiz, yillik_girdi_kdv, yillik_girdi_toplam,
+         yillik_cikti_kdvsiz, yillik_cikti_kdv, yillik_cikti_toplam) = rapor.yillik
         self.aylik_label_girdi_kdvsiz.config(text=f"{yillik_girdi_kdvsiz:.2f} ₺")
         self.aylik_label_girdi_kdv.config(text=f"{yillik_girdi_kdv:.2f} ₺")
         self.aylik_label_girdi_toplam.config(text=f"{yillik_girdi_toplam:.2f} ₺")
@@ -1539,8 +2140,6 @@ class StopTakipPro:
         self.aylik_label_cikti_kdv.config(text=f"{yillik_cikti_kdv:.2f} ₺")
         self.aylik_label_cikti_toplam.config(text=f"{yillik_cikti_toplam:.2f} ₺")
 
-
-
     def _clear_aylik_filter(self):
         """Aylık rapor filtrelerini temizler"""
         self.aylik_yil_filtre.set(str(datetime.now().year))
@@ -1548,10 +2147,8 @@ class StopTakipPro:
         self.aylik_malzeme_filtre.set('')
         self._load_aylik_rapor()
 
-    def _setup_ayarlar(self):
+    def _setup_ayarlar(self, frame):
         """Ayarlar sekmesini oluşturur"""
-        frame = ttk.Frame(self.notebook, style="Card.TFrame")
-        self.notebook.add(frame, text="⚙️ Ayarlar")
         
         # Başlık
         ttk.Label(frame, text="AYARLAR PANELİ", style="Title.TLabel").pack(pady=(10, 20))
@@ -1574,11 +2171,106 @@ class StopTakipPro:
                                 style="Card.TFrame", padding=(15, 10))
         db_frame.pack(fill=tk.X, padx=20, pady=10)
         
-        ttk.Button(db_frame, text="Yedek Al", style="Primary.TButton",
-                  command=self._backup_db).pack(side=tk.LEFT, padx=10, ipadx=15, ipady=5)
+        self.yedek_butonu = ttk.Button(db_frame, text="Yedek Al", style="Primary.TButton",
+                                       command=self._backup_db)
+        self.yedek_butonu.pack(side=tk.LEFT, padx=10, ipadx=15, ipady=5)
         ttk.Button(db_frame, text="Yedekten Geri Yükle", style="Warning.TButton",
                   command=self._restore_db).pack(side=tk.LEFT, padx=10, ipadx=15, ipady=5)
-
+        
+        # Yedekleme arka planda sürerken ilerleme
+        self.yedek_bar = ttk.Progressbar(db_frame, mode='determinate', length=180)
+        self.yedek_bar.pack(side=tk.RIGHT, padx=10)
+        self.yedek_durum = ttk.Label(db_frame, text="", style="TLabel")
+        self.yedek_durum.pack(side=tk.RIGHT, padx=5)
+        
+        # Sunucu kipi: adres boşsa yerel veritabanı kullanılır
+        sunucu_frame = ttk.LabelFrame(frame, text="Sunucu (Çok Kullanıcılı)", 
+                                    style="Card.TFrame", padding=(15, 10))
+        sunucu_frame.pack(fill=tk.X, padx=20, pady=10)
+        
+        ttk.Label(sunucu_frame, text="Sunucu Adresi:", style="TLabel").pack(side=tk.LEFT, padx=5)
+        self.sunucu_adresi_giris = ttk.Entry(sunucu_frame, width=25, font=FONT_PRIMARY)
+        self.sunucu_adresi_giris.pack(side=tk.LEFT, padx=5)
+        self.sunucu_adresi_giris.insert(0, ayarlari_oku().get("sunucu_adresi") or "")
+        ttk.Button(sunucu_frame, text="Kaydet", style="Success.TButton",
+                  command=self._sunucu_adresini_kaydet).pack(side=tk.LEFT, padx=10, ipadx=15, ipady=3)
+        durum = (f"Bağlı: {self.sunucu_adresi} (şema {self.baglantilar.durum['sema_surumu']}, "
+                 f"{self.baglantilar.durum['profil']})" if self.sunucu_adresi else "Yerel veritabanı")
+        ttk.Label(sunucu_frame, text=durum, style="Accent.TLabel").pack(side=tk.LEFT, padx=10)
+        
+        # Depolama profili (WAL + PRAGMA ayarları) ve ölçülen commit süresi
+        depo_frame = ttk.LabelFrame(frame, text="Depolama", 
+                                  style="Card.TFrame", padding=(15, 10))
+        if not self.sunucu_adresi:
+            depo_frame.pack(fill=tk.X, padx=20, pady=10)
+        
+        ttk.Label(depo_frame, text="Profil:", style="TLabel").grid(row=0, column=0, padx=5, pady=5, sticky="w")
+        self.depolama_profili = ttk.Combobox(depo_frame, values=list(stok_baglanti.PROFILLER),
+                                             state="readonly", width=12, font=FONT_PRIMARY)
+        self.depolama_profili.set(stok_baglanti.VARSAYILAN_PROFIL if self.sunucu_adresi
+                                  else self.baglantilar.profil.ad)
+        self.depolama_profili.grid(row=0, column=1, padx=5, pady=5, sticky="w")
+        self.depolama_profili.bind('<<ComboboxSelected>>', self._depolama_profili_degisti)
+        
+        ttk.Button(depo_frame, text="Commit Süresini Ölç", style="Primary.TButton",
+                  command=self._commit_gecikmesi_olc).grid(row=0, column=2, padx=10, ipadx=10, ipady=3)
+        self.commit_gecikmesi = ttk.Label(depo_frame, text="Commit: -", style="Accent.TLabel")
+        self.commit_gecikmesi.grid(row=0, column=3, padx=10, sticky="w")
+        
+        self.depolama_bilgisi = ttk.Label(depo_frame, text="", style="TLabel", justify=tk.LEFT)
+        self.depolama_bilgisi.grid(row=1, column=0, columnspan=4, padx=5, pady=(5, 0), sticky="w")
+        if not self.sunucu_adresi:
+            self._show_depolama_bilgisi()
+        
+        # Yavaş sorgu günlüğü ve sorgu istatistikleri (yalnızca yerel kipte)
+        sorgu_frame = ttk.LabelFrame(frame, text="Sorgu Günlüğü", 
+                                   style="Card.TFrame", padding=(15, 10))
+        if not self.sunucu_adresi:
+            sorgu_frame.pack(fill=tk.BOTH, padx=20, pady=10, expand=True)
+        
+        ust_frame = ttk.Frame(sorgu_frame)
+        ust_frame.pack(fill=tk.X, pady=(0, 5))
+        ttk.Label(ust_frame, text="Eşik (ms):", style="TLabel").pack(side=tk.LEFT, padx=5)
+        self.sorgu_esigi = ttk.Entry(ust_frame, width=7, font=FONT_PRIMARY)
+        self.sorgu_esigi.pack(side=tk.LEFT, padx=5)
+        self.sorgu_esigi.insert(0, f"{self.izleyici.esik_ms:g}" if self.izleyici else "")
+        ttk.Button(ust_frame, text="Kaydet", style="Success.TButton",
+                  command=self._sorgu_esigini_kaydet).pack(side=tk.LEFT, padx=10, ipadx=15, ipady=3)
+        
+        self.sorgu_siralama = ttk.Combobox(ust_frame, values=["En yavaş", "En sık"],
+                                           state="readonly", width=10, font=FONT_PRIMARY)
+        self.sorgu_siralama.set("En yavaş")
+        self.sorgu_siralama.pack(side=tk.LEFT, padx=(20, 5))
+        self.sorgu_siralama.bind('<<ComboboxSelected>>', lambda e: self._load_sorgu_istatistikleri())
+        ttk.Button(ust_frame, text="Yenile", style="Primary.TButton",
+                  command=self._load_sorgu_istatistikleri).pack(side=tk.LEFT, padx=5, ipadx=10, ipady=3)
+        ttk.Button(ust_frame, text="Sıfırla", style="Warning.TButton",
+                  command=self._sorgu_istatistiklerini_sifirla).pack(side=tk.LEFT, padx=5, ipadx=10, ipady=3)
+        
+        columns = ("İfade", "Sayı", "Ort. ms", "En Uzun ms", "Satır", "Parametreler")
+        self.sorgu_tree = ttk.Treeview(sorgu_frame, columns=columns, show="headings", height=5)
+        for col, genislik in zip(columns, (420, 60, 80, 90, 80, 160)):
+            self.sorgu_tree.heading(col, text=col)
+            self.sorgu_tree.column(col, width=genislik, anchor=tk.W if col in ("İfade", "Parametreler") else tk.E)
+        self.sorgu_tree.pack(fill=tk.BOTH, expand=True)
+        self.sorgu_tree.bind('<<TreeviewSelect>>', self._sorgu_plani_goster)
+        
+        # Seçili ifadenin eşiği aştığı en yavaş çalışmasındaki sorgu planı
+        self.sorgu_plani = ttk.Label(sorgu_frame, text="", style="TLabel", justify=tk.LEFT,
+                                     font=("Consolas", 9))
+        self.sorgu_plani.pack(fill=tk.X, pady=(5, 0))
+        self._sorgu_satirlari = {}
+        
+        # İşlem izleri ve olay döngüsü gecikmesi
+        perf_frame = ttk.LabelFrame(frame, text="Performans İzleme", 
+                                  style="Card.TFrame", padding=(15, 10))
+        perf_frame.pack(fill=tk.X, padx=20, pady=10)
+        
+        ttk.Button(perf_frame, text="Zaman Çizelgesi", style="Primary.TButton",
+                  command=lambda: ZamanCizelgesi(self.root, self.izci, self.nabiz)).pack(
+                      side=tk.LEFT, padx=10, ipadx=15, ipady=3)
+        ttk.Label(perf_frame, text=f"İzler kapanışta kaydedilir: {self.izci.dosya_yolu}",
+                 style="TLabel").pack(side=tk.LEFT, padx=10)
         
         # Kategoriler
         cat_frame = ttk.LabelFrame(frame, text="Kategori Yönetimi", 
@@ -1615,6 +2307,8 @@ class StopTakipPro:
                   command=self._load_categories).pack(pady=5, ipadx=10, ipady=3)
         ttk.Button(btn_frame, text="Sil", style="Danger.TButton",
                   command=self._remove_category).pack(pady=5, ipadx=10, ipady=3)
+        for cat in self._kategori_listesi:
+            self.category_list.insert(tk.END, cat)
 
     def _save_settings(self):
         """Ayarları kaydeder"""
@@ -1629,94 +2323,251 @@ class StopTakipPro:
         except ValueError as e:
             messagebox.showerror("Hata", f"Geçersiz KDV oranı!\n{str(e)}")
 
-    def _backup_db(self):
-        """Veritabanı yedeği alır"""
+    def _sunucu_adresini_kaydet(self):
+        """Sunucu adresini kaydeder (uygulama yeniden başlatılınca geçerli olur)"""
+        adres = self.sunucu_adresi_giris.get().strip()
+        ayarlar = ayarlari_oku()
+        ayarlar["sunucu_adresi"] = adres
+        ayarlari_yaz(ayarlar)
+        messagebox.showinfo("Başarılı", "Sunucu adresi kaydedildi. Değişiklik, uygulama "
+                            "yeniden başlatıldığında geçerli olur."
+                            + ("" if adres else "\n\nYerel veritabanı kullanılacak."))
+
+    def _show_depolama_bilgisi(self):
+        """Etkin depolama profilinin ayarlarını gösterir"""
+        profil = self.baglantilar.profil
+        journal = self.conn.execute("PRAGMA journal_mode").fetchone()[0].upper()
+        mmap = f"{profil.mmap_size // (1024 * 1024)} MB" if profil.mmap_size else "kapalı"
+        self.depolama_bilgisi.config(
+            text=f"journal_mode={journal}  synchronous={profil.synchronous}  "
+                 f"cache_size={-profil.cache_size // 1000} MB  mmap_size={mmap}  "
+                 f"temp_store={profil.temp_store}\n{profil.aciklama}")
+
+    def _depolama_profili_degisti(self, event=None):
+        """Seçilen profili bağlantılara uygular ve kaydeder"""
+        profil = stok_baglanti.PROFILLER[self.depolama_profili.get()]
+        self.baglantilar.profil_degistir(profil)
+        self.sorgular.yeniden_baglan()
+        
+        ayarlar = ayarlari_oku()
+        ayarlar["depolama_profili"] = profil.ad
+        ayarlari_yaz(ayarlar)
+        
+        self._show_depolama_bilgisi()
+        self._commit_gecikmesi_olc()
+
+    def _sorgu_esigini_kaydet(self):
+        """Yavaş sorgu eşiğini uygular ve kaydeder"""
         try:
-            backup_dir = os.path.join(get_app_data_path(), "backups")
-            if not os.path.exists(backup_dir):
-                os.makedirs(backup_dir)
-            
-            backup_filename = f"stop_takip_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
-            backup_path = os.path.join(backup_dir, backup_filename)
-            
-            # Veritabanını kopyala
-            shutil.copy2(self.db_path, backup_path)
+            esik = float(self.sorgu_esigi.get().replace(',', '.'))
+            if esik < 0:
+                raise ValueError("Eşik negatif olamaz.")
+        except ValueError as e:
+            messagebox.showerror("Hata", f"Geçersiz eşik değeri!\n{str(e)}")
+            return
+        if self.izleyici:
+            self.izleyici.esik_ms = esik
+        
+        ayarlar = ayarlari_oku()
+        ayarlar["sorgu_esigi_ms"] = esik
+        ayarlari_yaz(ayarlar)
+        messagebox.showinfo("Başarılı", "Sorgu eşiği kaydedildi!")
+
+    def _load_sorgu_istatistikleri(self):
+        """İzlenen ifadeleri seçili sıralamayla listeler"""
+        self.sorgu_tree.delete(*self.sorgu_tree.get_children())
+        self.sorgu_plani.config(text="")
+        self._sorgu_satirlari = {}
+        if not self.izleyici:
+            return
+        if self.sorgu_siralama.get() == "En sık":
+            istatistikler = self.izleyici.en_siklar()
+        else:
+            istatistikler = self.izleyici.en_yavaslar()
+        for ist in istatistikler:
+            iid = self.sorgu_tree.insert("", tk.END, values=(
+                ist.sorgu[:200], ist.sayi, f"{ist.ortalama_ms:.1f}", f"{ist.en_uzun_ms:.1f}",
+                ist.satir, ist.parametreler))
+            self._sorgu_satirlari[iid] = ist
+
+    def _sorgu_plani_goster(self, event=None):
+        """Seçili ifadenin kaydedilmiş sorgu planını gösterir"""
+        secili = self.sorgu_tree.selection()
+        ist = self._sorgu_satirlari.get(secili[0]) if secili else None
+        if ist is None:
+            self.sorgu_plani.config(text="")
+        elif ist.plan:
+            self.sorgu_plani.config(text=ist.plan)
+        else:
+            self.sorgu_plani.config(text="Plan yok (eşik aşılmadı veya ifadenin planı alınamıyor)")
+
+    def _sorgu_istatistiklerini_sifirla(self):
+        """Toplanan sorgu istatistiklerini siler"""
+        if self.izleyici:
+            self.izleyici.sifirla()
+        self._load_sorgu_istatistikleri()
+
+    def _commit_gecikmesi_olc(self):
+        """Etkin profilin commit süresini arka planda ölçer"""
+        if not self._yerel_kipte():
+            return
+        self.commit_gecikmesi.config(text="Commit: ölçülüyor...")
+        self.sorgular.calistir(
+            "commit_olcum", lambda conn: self.baglantilar.commit_gecikmesi_olc(),
+            lambda ms: self.commit_gecikmesi.config(text=f"Commit: {ms:.2f} ms"),
+            lambda e: self.commit_gecikmesi.config(text=f"Commit: ölçülemedi ({e})"))
+
+    def _backup_db(self):
+        """Veritabanı yedeğini (tam veya fark) arka planda, çevrimiçi yedekleme API'siyle alır"""
+        if not self._yerel_kipte():
+            return
+        backup_dir = os.path.join(get_app_data_path(), "backups")
+        
+        # İşçi yalnızca sayfa sayaçlarını yazar; çubuk Tk tarafında yoklanır
+        durum = {'kopyalanan': 0, 'toplam': 0, 'bitti': False}
+        
+        def guncelle():
+            if durum['bitti']:
+                return
+            if durum['toplam']:
+                self.yedek_bar.config(mode='determinate', maximum=durum['toplam'], value=durum['kopyalanan'])
+                self.yedek_durum.config(text=f"Yedekleniyor... %{100 * durum['kopyalanan'] // durum['toplam']}")
+            self.root.after(100, guncelle)
+        
+        def yedekle(conn):
+            return stok_yedek.yedekle(conn, backup_dir,
+                                      ilerleme=lambda kopyalanan, toplam: durum.update(kopyalanan=kopyalanan, toplam=toplam))
+        
+        def bitir():
+            durum['bitti'] = True
+            self.yedek_butonu.config(state=tk.NORMAL)
+            self.yedek_bar.config(value=0)
+            self.yedek_durum.config(text="")
+        
+        def basarili(kayit):
+            bitir()
             
-            # Yedek klasörünü aç
-            if os.name == 'nt':  # Windows
-                os.startfile(backup_dir)
-            elif os.name == 'posix':  # macOS ve Linux
-                os.system(f'open "{backup_dir}"' if sys.platform == 'darwin' else f'xdg-open "{backup_dir}"')
+            # Yedeğe giren günlük kayıtlarına artık gerek yok
+            self._yaz('gunlugu_kirp', {'son': kayit.son}, lambda sonuc: None)
             
-            messagebox.showinfo("Başarılı", f"Veritabanı yedeği alındı:\n{backup_path}")
+            tur = "Tam yedek" if kayit.tur == 'tam' else f"Fark yedeği ({kayit.degisiklik} değişiklik)"
+            messagebox.showinfo("Başarılı", f"{tur} alındı ({kayit.boyut / 1024:.0f} KB):\n"
+                                            f"{os.path.join(backup_dir, kayit.dosya)}")
         
-        except Exception as e:
+        def hata(e):
+            bitir()
             messagebox.showerror("Hata", f"Yedek alınamadı:\n{str(e)}")
+        
+        self.yedek_butonu.config(state=tk.DISABLED)
+        self.yedek_durum.config(text="Yedekleniyor...")
+        self.sorgular.calistir("yedek", yedekle, basarili, hata)
+        guncelle()
 
     def _restore_db(self):
-        """Yedekten geri yükler"""
-        try:
-            backup_file = filedialog.askopenfilename(
-                title="Yedek Dosyasını Seçin",
-                filetypes=[("Veritabanı Dosyaları", "*.db"), ("Tüm Dosyalar", "*.*")],
-                initialdir=os.path.join(get_app_data_path(), "backups")
+        """Seçilen yedek anına veya bir yedek dosyasına geri döner"""
+        if not self._yerel_kipte():
+            return
+        backup_dir = os.path.join(get_app_data_path(), "backups")
+        noktalar = stok_yedek.geri_yukleme_noktalari(backup_dir)
+        
+        pencere = tk.Toplevel(self.root)
+        pencere.title("Yedekten Geri Yükle")
+        pencere.transient(self.root)
+        pencere.grab_set()
+        
+        ttk.Label(pencere, text="Geri dönülecek yedek anını seçin:").pack(padx=15, pady=(15, 5), anchor="w")
+        liste = ttk.Treeview(pencere, columns=("Zaman", "Tür", "Boyut"), show="headings", height=12)
+        for col, width in (("Zaman", 180), ("Tür", 160), ("Boyut", 100)):
+            liste.heading(col, text=col)
+            liste.column(col, width=width)
+        liste.pack(fill=tk.BOTH, expand=True, padx=15)
+        for kayit in noktalar:
+            tur = "Tam" if kayit.tur == 'tam' else f"Fark ({kayit.degisiklik} değişiklik)"
+            liste.insert("", tk.END, iid=kayit.dosya,
+                         values=(kayit.zaman.replace("T", " "), tur, f"{kayit.boyut / 1024:.0f} KB"))
+        
+        def onayla():
+            return messagebox.askyesno(
+                "Onay", 
+                "Yedekten geri yükleme yapılacak. Bu işlem mevcut verilerin üzerine yazacak.\n"
+                "Devam etmek istiyor musunuz?",
+                parent=pencere
             )
+        
+        def yukle(kaynak_yol):
+            # Veritabanı dosyası değiştirilmez, içerik açık bağlantıya kopyalanır
+            stok_yedek.veritabanina_yukle(self.conn, kaynak_yol, backup_dir)
+            self.baglantilar.yeniden_ac()
+            self.sorgular.yeniden_baglan()
             
-            if backup_file:
-                confirm = messagebox.askyesno(
-                    "Onay", 
-                    "Yedekten geri yükleme yapılacak. Bu işlem mevcut verilerin üzerine yazacak.\n"
-                    "Devam etmek istiyor musunuz?"
-                )
-                
-                if confirm:
-                    # Veritabanı bağlantılarını kapat
-                    self.conn.close()
-                    
-                    # Yedek dosyayı kopyala
-                    shutil.copy2(backup_file, self.db_path)
-                    
-                    # Yeni bağlantı aç
-                    self.conn = sqlite3.connect(self.db_path)
-                    self.c = self.conn.cursor()
-                    
-                    # Verileri yenile
-                    self._load_hareket_raporu()
-                    self._load_categories()
-                    self._update_dashboard()
-                    self._update_malzeme_listesi()
-                    messagebox.showinfo("Başarılı", "Veritabanı başarıyla geri yüklendi!")
+            # Tüm görünümleri yenile
+            self.degisiklikler.yayinla(stok_veri.Degisiklik('tumu'))
+            messagebox.showinfo("Başarılı", "Veritabanı başarıyla geri yüklendi!")
         
-        except Exception as e:
-            messagebox.showerror("Hata", f"Geri yükleme başarısız:\n{str(e)}")
+        def noktaya_don():
+            secili = liste.selection()
+            if not secili or not onayla():
+                return
+            kayit = next(k for k in noktalar if k.dosya == secili[0])
+            gecici = os.path.join(backup_dir, "geri_yukleme.db")
+            
+            def bitti(_):
+                try:
+                    yukle(gecici)
+                except Exception as e:
+                    messagebox.showerror("Hata", f"Geri yükleme başarısız:\n{str(e)}")
+                finally:
+                    if os.path.exists(gecici):
+                        os.remove(gecici)
+            
+            def hata(e):
+                if os.path.exists(gecici):
+                    os.remove(gecici)
+                messagebox.showerror("Hata", f"Geri yükleme başarısız:\n{str(e)}")
             
-            # Bağlantıyı yeniden açmaya çalış
+            pencere.destroy()
+            # Zincir arka planda ayrı bir dosyada kurulur; canlı veritabanına en sonda kopyalanır
+            self.sorgular.calistir(
+                "geri_yukle", lambda conn: stok_yedek.geri_yukleme_dosyasi_hazirla(backup_dir, kayit, gecici),
+                bitti, hata)
+        
+        def dosyadan():
+            backup_file = filedialog.askopenfilename(
+                title="Yedek Dosyasını Seçin",
+                filetypes=[("Veritabanı Dosyaları", "*.db"), ("Tüm Dosyalar", "*.*")],
+                initialdir=backup_dir,
+                parent=pencere
+            )
+            if not backup_file or not onayla():
+                return
+            pencere.destroy()
             try:
-                self.conn = sqlite3.connect(self.db_path)
-                self.c = self.conn.cursor()
-            except:
-                pass
+                yukle(backup_file)
+            except Exception as e:
+                messagebox.showerror("Hata", f"Geri yükleme başarısız:\n{str(e)}")
+        
+        btn_frame = ttk.Frame(pencere)
+        btn_frame.pack(fill=tk.X, padx=15, pady=15)
+        ttk.Button(btn_frame, text="Geri Yükle", style="Warning.TButton",
+                  command=noktaya_don).pack(side=tk.LEFT, padx=5, ipadx=10, ipady=4)
+        ttk.Button(btn_frame, text="Dosyadan...", style="Primary.TButton",
+                  command=dosyadan).pack(side=tk.LEFT, padx=5, ipadx=10, ipady=4)
+        ttk.Button(btn_frame, text="Vazgeç",
+                  command=pencere.destroy).pack(side=tk.RIGHT, padx=5, ipadx=10, ipady=4)
 
     def _clear_db(self):
         """Veritabanını temizler"""
+        if not self._yerel_kipte():
+            return
         confirm = messagebox.askyesno(
             "Onay", 
             "TÜM verileri silmek istediğinize emin misiniz?\nBu işlem geri alınamaz!"
         )
         
         if confirm:
-            try:
-                self.c.execute("DELETE FROM malzeme_girisleri")
-                self.c.execute("DELETE FROM malzeme_cikislari")
-                self.c.execute("DELETE FROM mevcut_stok")
-                self.conn.commit()
-                messagebox.showinfo("Başarılı", "Tüm veriler silindi!")
-                self._load_hareket_raporu()
-                self._load_categories()
-                self._update_dashboard()
-                self._update_malzeme_listesi()
-            except Exception as e:
-                messagebox.showerror("Hata", f"Veriler silinirken hata oluştu:\n{str(e)}")
+            self._yaz('verileri_temizle', {},
+                      lambda sonuc: messagebox.showinfo("Başarılı", "Tüm veriler silindi!"),
+                      lambda e: messagebox.showerror("Hata", f"Veriler silinirken hata oluştu:\n{str(e)}"))
 
     def _add_category(self):
         """Yeni kategori ekler"""
@@ -1725,20 +2576,17 @@ class StopTakipPro:
             messagebox.showwarning("Uyarı", "Kategori adı boş olamaz!")
             return
         
-        # Kategorileri güncelle
-        self._load_categories()  # Önce mevcut kategorileri yükle
+        def eklendi(sonuc):
+            messagebox.showinfo("Başarılı", f"'{new_cat}' kategorisi eklendi!")
+            self.new_category.delete(0, tk.END)
         
-        # Kategoriyi veritabanına eklemek için bir malzeme ekliyoruz (geçici çözüm)
-        # Aslında ayrı bir kategori tablosu olmalı
-        self.c.execute(
-            "INSERT INTO malzeme_girisleri (ad, fiyat, adet, kdv, kdv_tutari, toplam, tarih, kategori) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-            ("KATEGORI_OLUSTURMA", 0, 0, 0, 0, 0, datetime.now().strftime("%d.%m.%Y"), new_cat)
-        )
-        self.conn.commit()
+        def hata(e):
+            if isinstance(e, StokHatasi):
+                messagebox.showwarning("Uyarı", str(e))
+            else:
+                self._sorgu_hatasi(e)
         
-        messagebox.showinfo("Başarılı", f"'{new_cat}' kategorisi eklendi!")
-        self.new_category.delete(0, tk.END)
-        self._load_categories()  # Kategorileri yeniden yükle
+        self._yaz('kategori_ekle', {'kategori': new_cat}, eklendi, hata)
 
     def _remove_category(self):
         """Kategori siler"""
@@ -1751,22 +2599,19 @@ class StopTakipPro:
         confirm = messagebox.askyesno("Onay", f"'{cat}' kategorisini silmek istediğinize emin misiniz?\n\nBu kategorideki tüm malzemeler 'Kategorisiz' olarak işaretlenecek.")
         
         if confirm:
-            # Kategorideki malzemeleri güncelle
-            self.c.execute("UPDATE malzeme_girisleri SET kategori=NULL WHERE kategori=?", (cat,))
-            self.conn.commit()
-            
-            # Kategoriyi silmek için geçici kaydı sil
-            self.c.execute("DELETE FROM malzeme_girisleri WHERE ad='KATEGORI_OLUSTURMA' AND kategori=?", (cat,))
-            self.conn.commit()
-            
-            messagebox.showinfo("Başarılı", f"'{cat}' kategorisi silindi!")
-            self._load_categories()  # Kategorileri yeniden yükle
+            self._yaz('kategori_sil', {'kategori': cat},
+                      lambda sonuc: messagebox.showinfo("Başarılı", f"'{cat}' kategorisi silindi!"))
 
     def _load_categories(self):
-        """Kategorileri yükler ve combobox'ları günceller"""
-        self.c.execute("SELECT DISTINCT kategori FROM malzeme_girisleri WHERE kategori IS NOT NULL AND kategori != ''")
-        categories = sorted([cat[0] for cat in self.c.fetchall()])
-    
+        """Kategorileri arka planda yükler"""
+        self.sorgular.calistir("kategoriler", self.veri.kategoriler,
+                               self._show_categories, self._sorgu_hatasi,
+                               onbellek_anahtari=('kategoriler',))
+
+    def _show_categories(self, categories):
+        """Kategori combobox'larını ve listesini günceller"""
+        self._kategori_listesi = list(categories)
+        
         # Kategori filtreleme combobox'larını güncelle
         if hasattr(self, 'kategori_filtre'):
             self.kategori_filtre['values'] = categories
@@ -1785,45 +2630,117 @@ class StopTakipPro:
             for cat in categories:
                 self.category_list.insert(tk.END, cat)
 
-    def _export_excel(self, tree):
-        """Treeview verilerini Excel'e aktarır"""
-        try:
-            items = []
-            for item in tree.get_children():
-                items.append(tree.item(item)['values'])
-            
-            if not items:
-                messagebox.showwarning("Uyarı", "Aktarılacak veri yok!")
-                return
-            
-            # Sütun başlıklarını al
-            columns = [tree.heading(col)['text'] for col in tree['columns']]
-            
-            # DataFrame oluştur
-            df = pd.DataFrame(items, columns=columns)
-            
-            # Excel dosyasını kaydetmek için klasör oluştur
-            export_dir = os.path.join(get_app_data_path(), "exports")
-            if not os.path.exists(export_dir):
-                os.makedirs(export_dir)
-            
-            # Dosya yolu
-            filename = f"stok_rapor_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-            filepath = os.path.join(export_dir, filename)
-            
-            # Excel'e yaz
-            df.to_excel(filepath, index=False)
+    def _disa_aktar(self, rapor):
+        """Gösterilen raporu Tk'ye uğramadan doğrudan sorgudan dosyaya aktarır
+        
+        Satırlar arka plan işçisinde imleçten parça parça okunup yazılır;
+        bellek kullanımı rapor boyutundan bağımsızdır.
+        """
+        if rapor == 'hareket':
+            filtre, toplam = self._hareket_filtresi, self.hareket_tablo.toplam
+            sutunlar, satirlar = stok_veri.HAREKET_SUTUNLARI, self.veri.hareket_satirlari
+        elif rapor == 'stok':
+            filtre, toplam = self._stok_filtresi, self.stok_tablo.toplam
+            sutunlar, satirlar = stok_veri.STOK_SUTUNLARI, self.veri.stok_satirlari
+        else:
+            filtre, toplam = self._aylik_filtresi, len(stok_veri.AY_ADLARI)
+            sutunlar = stok_veri.AYLIK_SUTUNLARI
+            satirlar = lambda conn, filtre: self.veri.aylik_rapor(conn, filtre).satirlar
+        
+        if filtre is None or not toplam:
+            messagebox.showwarning("Uyarı", "Aktarılacak veri yok!")
+            return
+        
+        export_dir = os.path.join(get_app_data_path(), "exports")
+        os.makedirs(export_dir, exist_ok=True)
+        filepath = filedialog.asksaveasfilename(
+            title="Raporu Dışa Aktar",
+            initialdir=export_dir,
+            initialfile=f"stok_rapor_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+            defaultextension=".xlsx",
+            filetypes=[(aciklama, f"*{uzanti}") for uzanti, aciklama in stok_aktarim.DISA_AKTARMA_BICIMLERI.items()]
+        )
+        if not filepath:
+            return
+        
+        # İlerleme penceresi; işçi yalnızca sayacı yazar, Tk tarafı yoklar
+        durum = {'yazilan': 0, 'iptal': False}
+        pencere = tk.Toplevel(self.root)
+        pencere.title("Dışa Aktarılıyor")
+        pencere.transient(self.root)
+        pencere.grab_set()
+        etiket = ttk.Label(pencere, text=os.path.basename(filepath))
+        etiket.pack(padx=20, pady=(15, 5))
+        cubuk = ttk.Progressbar(pencere, mode='determinate', length=320, maximum=toplam)
+        cubuk.pack(padx=20, pady=5)
+        ttk.Button(pencere, text="İptal", style="Warning.TButton",
+                  command=lambda: durum.update(iptal=True)).pack(pady=(5, 15))
+        
+        def guncelle():
+            if pencere.winfo_exists():
+                cubuk['value'] = durum['yazilan']
+                etiket.config(text=f"{durum['yazilan']} / {toplam} satır")
+                self.root.after(100, guncelle)
+        
+        def aktar(conn):
+            return stok_aktarim.disa_aktar(
+                satirlar(conn, filtre), sutunlar, filepath,
+                ilerleme=lambda yazilan: durum.update(yazilan=yazilan),
+                iptal=lambda: durum['iptal'])
+        
+        def bitti(yazilan):
+            pencere.destroy()
             
             # Klasörü aç
             if os.name == 'nt':  # Windows
-                os.startfile(export_dir)
+                os.startfile(os.path.dirname(filepath))
             elif os.name == 'posix':  # macOS ve Linux
-                os.system(f'open "{export_dir}"' if sys.platform == 'darwin' else f'xdg-open "{export_dir}"')
+                klasor = os.path.dirname(filepath)
+                os.system(f'open "{klasor}"' if sys.platform == 'darwin' else f'xdg-open "{klasor}"')
             
-            messagebox.showinfo("Başarılı", f"Excel raporu oluşturuldu:\n{filepath}")
+            messagebox.showinfo("Başarılı", f"{yazilan} satır dışa aktarıldı:\n{filepath}")
         
-        except Exception as e:
-            messagebox.showerror("Hata", f"Excel oluşturulamadı:\n{str(e)}")
+        def hata(e):
+            pencere.destroy()
+            if not isinstance(e, stok_aktarim.AktarmaIptal):
+                messagebox.showerror("Hata", f"Rapor dışa aktarılamadı:\n{str(e)}")
+        
+        self.sorgular.calistir("disa_aktarma", aktar, bitti, hata)
+        guncelle()
+
+    def _baslangici_olc(self):
+        """Açılış süresini ölçer, raporlar ve uygulamayı kapatır (--baslangic-olc)
+        
+        İlk etkileşimli pencere: pencere ekranda ve olay döngüsü ilk kez boşta,
+        yani kullanıcı girdisi hemen işlenebilir. Süreler betiğin yüklenmeye
+        başlamasından itibaren ölçülür (EXE'nin açılması hariç).
+        """
+        kurulum = time.perf_counter()
+        olcumler = {}
+        
+        def etkilesimli():
+            if not self.root.winfo_viewable():
+                self.root.after(10, etkilesimli)
+                return
+            olcumler['etkilesim'] = time.perf_counter()
+            veriler_geldi()
+        
+        def veriler_geldi():
+            if self.sorgular.mesgul:
+                self.root.after(10, veriler_geldi)
+                return
+            bitis = time.perf_counter()
+            rapor = (f"Pencere kuruldu: {(kurulum - _ACILIS) * 1000:.0f} ms\n"
+                     f"İlk etkileşimli pencere: {(olcumler['etkilesim'] - _ACILIS) * 1000:.0f} ms\n"
+                     f"İlk veriler yüklendi: {(bitis - _ACILIS) * 1000:.0f} ms")
+            if sys.stdout:
+                print(rapor)
+            else:
+                # Konsolsuz EXE
+                messagebox.showinfo("Açılış Süresi", rapor)
+            self._on_close()
+        
+        self.root.after_idle(etkilesimli)
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,1888 @@
+"""Stok takip veri erişim katmanı
+
+Tüm SQL sorguları burada toplanır. Modül Tk'ye bağımlı değildir; fonksiyonlar
+bir sqlite3 bağlantısı ve filtre parametreleri alıp satır veya özet döndürür.
+Böylece sorgular arayüz olmadan çalıştırılabilir, ölçülebilir ve test edilebilir.
+"""
+import os
+import sqlite3
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+# urllib.request (http.client, ssl, email...) yalnızca pathname2url için
+# yüklenmesin; urllib.request de bunları platforma göre buradan alır
+if os.name == 'nt':
+    from nturl2path import pathname2url
+else:
+    from urllib.parse import quote as pathname2url
+
+# Dışa aktarma gibi tüm sonucu dolaşan okumalarda tek seferde alınan satır sayısı
+IMLEC_PARCA_BOYUTU = 5000
+
+# Aylık rapor ay adları (ay numarası sırasıyla)
+AY_ADLARI = [
+    "Ocak", "Şubat", "Mart", "Nisan", "Mayıs", "Haziran",
+    "Temmuz", "Ağustos", "Eylül", "Ekim", "Kasım", "Aralık"
+]
+
+# Düşük stok eşiği
+DUSUK_STOK_ESIGI = 10
+
+# Güncel şema sürümü (PRAGMA user_version)
+SEMA_SURUMU = 8
+
+# Değişiklik günlüğüne yazılan tablolar ve satır anahtarları (fark yedekleri için).
+# Malzemenin kategorisi yazma sırasına bağlı olduğundan yeniden hesaplanmaz,
+# saklanır; girişlerin tetikleyicileri onu değiştirdiği için malzemeler
+# farklarda girişlerden sonra uygulanır (sözlük sırası uygulama sırasıdır).
+# Kategoriler, onlara başvuran girişlerden önce uygulanır.
+GUNLUKLU_TABLOLAR = {
+    "kategoriler": "id",
+    "malzeme_girisleri": "id",
+    "malzeme_cikislari": "id",
+    "cikis_dagilimlari": "cikis_id",
+    "malzemeler": "id",
+    "mevcut_stok": "malzeme_id",
+    "malzeme_ozet": "malzeme_id",
+}
+
+# Sürüm 8 göçünde giriş/çıkış satırlarının tek INSERT ile kopyalanan kimlik aralığı
+GOC_PARTI_BOYUTU = 50000
+
+
+class StokHatasi(Exception):
+    """Kullanıcıya gösterilecek iş kuralı hatası (yetersiz stok vb.)"""
+
+
+# Tarih dönüşümü (arayüz: dd.mm.yyyy, veritabanı sıralama/indeks: yyyy-mm-dd)
+def to_iso_date(tarih: str) -> str:
+    """dd.mm.yyyy biçimindeki tarihi sıralanabilir ISO biçimine (yyyy-mm-dd) çevirir"""
+    return datetime.strptime(tarih, "%d.%m.%Y").strftime("%Y-%m-%d")
+
+
+# ---------------------------------------------------------------------------
+# Bağlantı ve şema
+# ---------------------------------------------------------------------------
+
+def connect(db_path: str, factory: type = sqlite3.Connection) -> sqlite3.Connection:
+    """Veritabanına bağlanır; gerekirse oluşturur ve şemayı günceller"""
+    db_exists = os.path.exists(db_path)
+
+    conn = sqlite3.connect(db_path, factory=factory)
+
+    if not db_exists:
+        create_database(conn)
+    migrate_database(conn)
+    return conn
+
+
+def connect_salt_okunur(db_path: str, factory: type = sqlite3.Connection) -> sqlite3.Connection:
+    """Arka plan rapor sorguları için salt okunur bağlantı açar
+    
+    Bağlantı başka bir iş parçacığından interrupt() ile kesilebilsin diye
+    check_same_thread kapalıdır; şema connect() ile önceden hazırlanmış olmalıdır.
+    """
+    uri = "file:" + pathname2url(os.path.abspath(db_path)) + "?mode=ro"
+    return sqlite3.connect(uri, uri=True, check_same_thread=False, timeout=10, factory=factory)
+
+
+def create_database(conn: sqlite3.Connection) -> None:
+    """Veritabanı tablolarını oluşturur (temel şema, sürüm 0)"""
+    c = conn.cursor()
+
+    # Eski tabloları sil (sadece ilk kurulumda)
+    c.execute("DROP TABLE IF EXISTS malzeme_girisleri")
+    c.execute("DROP TABLE IF EXISTS malzeme_cikislari")
+    c.execute("DROP TABLE IF EXISTS mevcut_stok")
+
+    # Yeni tabloları oluştur
+    c.execute('''CREATE TABLE IF NOT EXISTS malzeme_girisleri
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  ad TEXT NOT NULL,
+                  fiyat REAL NOT NULL,
+                  adet INTEGER NOT NULL,
+                  kdv REAL NOT NULL,
+                  kdv_tutari REAL NOT NULL,
+                  toplam REAL NOT NULL,
+                  tarih TEXT NOT NULL,
+                  kategori TEXT,
+                  tedarikci TEXT)''')
+
+    c.execute('''CREATE TABLE IF NOT EXISTS malzeme_cikislari
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  giris_id INTEGER NOT NULL,
+                  malzeme_adi TEXT NOT NULL,
+                  cikis_adedi INTEGER NOT NULL,
+                  personel TEXT NOT NULL,
+                  aciklama TEXT,
+                  tarih TEXT NOT NULL,
+                  FOREIGN KEY(giris_id) REFERENCES malzeme_girisleri(id))''')
+
+    c.execute('''CREATE TABLE IF NOT EXISTS mevcut_stok
+                 (malzeme_adi TEXT PRIMARY KEY,
+                  toplam_adet INTEGER NOT NULL)''')
+    conn.commit()
+
+
+def migrate_database(conn: sqlite3.Connection) -> None:
+    """Veritabanı şemasını güncel sürüme yükseltir (PRAGMA user_version)"""
+    c = conn.cursor()
+    surum = c.execute("PRAGMA user_version").fetchone()[0]
+    if surum >= SEMA_SURUMU:
+        return
+
+    # Tüm adımlar tek işlemde uygulanır; türetilmiş tablolar en sonda, son şemaya
+    # göre bir kez yeniden hesaplanır
+    c.execute("BEGIN")
+    yeniden_hesapla = set()
+
+    if surum < 1:
+        # Sürüm 1: indekslenebilir ISO tarih sütunları ve aralık indeksleri
+        for tablo in ("malzeme_girisleri", "malzeme_cikislari"):
+            c.execute(f"PRAGMA table_info({tablo})")
+            if "tarih_iso" not in [row[1] for row in c.fetchall()]:
+                c.execute(f"ALTER TABLE {tablo} ADD COLUMN tarih_iso TEXT")
+            c.execute(
+                f"UPDATE {tablo} SET tarih_iso = "
+                "substr(tarih, 7, 4) || '-' || substr(tarih, 4, 2) || '-' || substr(tarih, 1, 2) "
+                "WHERE tarih_iso IS NULL"
+            )
+
+        c.execute("CREATE INDEX IF NOT EXISTS idx_giris_tarih_ad ON malzeme_girisleri(tarih_iso, ad)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_giris_tarih_kategori ON malzeme_girisleri(tarih_iso, kategori)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_giris_ad_tarih ON malzeme_girisleri(ad, tarih_iso)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_cikis_tarih_malzeme ON malzeme_cikislari(tarih_iso, malzeme_adi)")
+        c.execute("PRAGMA user_version = 1")
+
+    if surum < 2:
+        # Sürüm 2: ay × malzeme × kategori özet tablosu (Aylık Rapor)
+        c.execute('''CREATE TABLE IF NOT EXISTS aylik_ozet
+                     (ay TEXT NOT NULL,
+                      malzeme_adi TEXT NOT NULL,
+                      kategori TEXT NOT NULL DEFAULT '',
+                      girdi_kdvsiz REAL NOT NULL DEFAULT 0,
+                      girdi_kdv REAL NOT NULL DEFAULT 0,
+                      girdi_toplam REAL NOT NULL DEFAULT 0,
+                      cikti_kdvsiz REAL NOT NULL DEFAULT 0,
+                      cikti_kdv REAL NOT NULL DEFAULT 0,
+                      cikti_toplam REAL NOT NULL DEFAULT 0,
+                      PRIMARY KEY (ay, malzeme_adi, kategori)) WITHOUT ROWID''')
+
+        # Her giriş/çıkış kaydı aynı işlem içinde özet tabloya işlenir
+        c.execute('''CREATE TRIGGER IF NOT EXISTS trg_aylik_ozet_giris
+                     AFTER INSERT ON malzeme_girisleri
+                     WHEN NEW.ad != 'KATEGORI_OLUSTURMA'
+                     BEGIN
+                         INSERT OR IGNORE INTO aylik_ozet (ay, malzeme_adi, kategori)
+                         VALUES (substr(NEW.tarih_iso, 1, 7), NEW.ad, COALESCE(NEW.kategori, ''));
+                         UPDATE aylik_ozet SET
+                             girdi_kdvsiz = girdi_kdvsiz + NEW.fiyat * NEW.adet,
+                             girdi_kdv = girdi_kdv + NEW.kdv_tutari,
+                             girdi_toplam = girdi_toplam + NEW.toplam
+                         WHERE ay = substr(NEW.tarih_iso, 1, 7)
+                           AND malzeme_adi = NEW.ad
+                           AND kategori = COALESCE(NEW.kategori, '');
+                     END''')
+
+        c.execute('''CREATE TRIGGER IF NOT EXISTS trg_aylik_ozet_cikis
+                     AFTER INSERT ON malzeme_cikislari
+                     BEGIN
+                         INSERT OR IGNORE INTO aylik_ozet (ay, malzeme_adi, kategori)
+                         SELECT substr(NEW.tarih_iso, 1, 7), NEW.malzeme_adi, COALESCE(mg.kategori, '')
+                         FROM malzeme_girisleri mg WHERE mg.id = NEW.giris_id;
+                         UPDATE aylik_ozet SET
+                             cikti_kdvsiz = cikti_kdvsiz + NEW.cikis_adedi * (SELECT mg.fiyat FROM malzeme_girisleri mg WHERE mg.id = NEW.giris_id),
+                             cikti_kdv = cikti_kdv + NEW.cikis_adedi * (SELECT mg.kdv_tutari / mg.adet FROM malzeme_girisleri mg WHERE mg.id = NEW.giris_id),
+                             cikti_toplam = cikti_toplam + NEW.cikis_adedi * (SELECT mg.toplam / mg.adet FROM malzeme_girisleri mg WHERE mg.id = NEW.giris_id)
+                         WHERE ay = substr(NEW.tarih_iso, 1, 7)
+                           AND malzeme_adi = NEW.malzeme_adi
+                           AND kategori = (SELECT COALESCE(mg.kategori, '') FROM malzeme_girisleri mg WHERE mg.id = NEW.giris_id);
+                     END''')
+
+        yeniden_hesapla.add("aylik_ozet")
+        c.execute("PRAGMA user_version = 2")
+
+    if surum < 3:
+        # Sürüm 3: malzeme başına son giriş özeti (Mevcut Stok)
+        c.execute('''CREATE TABLE IF NOT EXISTS malzeme_ozet
+                     (malzeme_adi TEXT PRIMARY KEY,
+                      kategori TEXT,
+                      son_fiyat REAL,
+                      son_birim_kdv REAL,
+                      son_birim_toplam REAL,
+                      son_tedarikci TEXT,
+                      son_giris_tarihi TEXT,
+                      son_giris_id INTEGER)''')
+        c.execute("CREATE INDEX IF NOT EXISTS idx_malzeme_ozet_kategori ON malzeme_ozet(kategori)")
+
+        # Yeni giriş, tarihçe olarak en son kayıtsa özeti günceller
+        c.execute('''CREATE TRIGGER IF NOT EXISTS trg_malzeme_ozet_giris
+                     AFTER INSERT ON malzeme_girisleri
+                     WHEN NEW.ad != 'KATEGORI_OLUSTURMA'
+                     BEGIN
+                         INSERT OR IGNORE INTO malzeme_ozet (malzeme_adi) VALUES (NEW.ad);
+                         UPDATE malzeme_ozet SET
+                             kategori = COALESCE(NEW.kategori, kategori),
+                             son_fiyat = NEW.fiyat,
+                             son_birim_kdv = NEW.kdv_tutari / NEW.adet,
+                             son_birim_toplam = NEW.toplam / NEW.adet,
+                             son_tedarikci = NEW.tedarikci,
+                             son_giris_tarihi = NEW.tarih_iso,
+                             son_giris_id = NEW.id
+                         WHERE malzeme_adi = NEW.ad
+                           AND (son_giris_tarihi IS NULL
+                                OR son_giris_tarihi < NEW.tarih_iso
+                                OR (son_giris_tarihi = NEW.tarih_iso AND son_giris_id < NEW.id));
+                         UPDATE malzeme_ozet SET kategori = NEW.kategori
+                         WHERE malzeme_adi = NEW.ad AND kategori IS NULL;
+                     END''')
+
+        yeniden_hesapla.add("malzeme_ozet")
+        c.execute("PRAGMA user_version = 3")
+
+    if surum < 4:
+        # Sürüm 4: dashboard sayaçları (mevcut stok, düşük stok, stok değeri, kategoriler)
+        c.execute('''CREATE TABLE IF NOT EXISTS sayaclar
+                     (id INTEGER PRIMARY KEY CHECK (id = 1),
+                      toplam_adet INTEGER NOT NULL DEFAULT 0,
+                      dusuk_stok INTEGER NOT NULL DEFAULT 0,
+                      stok_degeri REAL NOT NULL DEFAULT 0)''')
+        c.execute("INSERT OR IGNORE INTO sayaclar (id) VALUES (1)")
+
+        # Kategori başına kayıt sayısı: sayı sıfıra inince kategori listeden düşer
+        c.execute('''CREATE TABLE IF NOT EXISTS kategori_kullanimi
+                     (kategori TEXT PRIMARY KEY,
+                      kayit_sayisi INTEGER NOT NULL) WITHOUT ROWID''')
+
+        _sayac_tetikleyicileri(c, "malzeme_adi")
+
+        c.execute('''CREATE TRIGGER IF NOT EXISTS trg_kategori_kullanimi_insert
+                     AFTER INSERT ON malzeme_girisleri
+                     WHEN NEW.kategori IS NOT NULL AND NEW.kategori != ''
+                     BEGIN
+                         INSERT OR IGNORE INTO kategori_kullanimi (kategori, kayit_sayisi) VALUES (NEW.kategori, 0);
+                         UPDATE kategori_kullanimi SET kayit_sayisi = kayit_sayisi + 1 WHERE kategori = NEW.kategori;
+                     END''')
+        c.execute('''CREATE TRIGGER IF NOT EXISTS trg_kategori_kullanimi_update
+                     AFTER UPDATE OF kategori ON malzeme_girisleri
+                     WHEN OLD.kategori IS NOT NEW.kategori
+                     BEGIN
+                         UPDATE kategori_kullanimi SET kayit_sayisi = kayit_sayisi - 1 WHERE kategori = OLD.kategori;
+                         DELETE FROM kategori_kullanimi WHERE kategori = OLD.kategori AND kayit_sayisi <= 0;
+                         INSERT OR IGNORE INTO kategori_kullanimi (kategori, kayit_sayisi)
+                         SELECT NEW.kategori, 0 WHERE NEW.kategori IS NOT NULL AND NEW.kategori != '';
+                         UPDATE kategori_kullanimi SET kayit_sayisi = kayit_sayisi + 1 WHERE kategori = NEW.kategori;
+                     END''')
+        c.execute('''CREATE TRIGGER IF NOT EXISTS trg_kategori_kullanimi_delete
+                     AFTER DELETE ON malzeme_girisleri
+                     WHEN OLD.kategori IS NOT NULL AND OLD.kategori != ''
+                     BEGIN
+                         UPDATE kategori_kullanimi SET kayit_sayisi = kayit_sayisi - 1 WHERE kategori = OLD.kategori;
+                         DELETE FROM kategori_kullanimi WHERE kategori = OLD.kategori AND kayit_sayisi <= 0;
+                     END''')
+
+        yeniden_hesapla.add("sayaclar")
+        c.execute("PRAGMA user_version = 4")
+
+    if surum < 5:
+        # Sürüm 5: lot bazında FIFO (kalan adet, çıkış dağılımları, çıkış maliyetleri)
+        c.execute("ALTER TABLE malzeme_girisleri ADD COLUMN kalan_adet INTEGER")
+        for sutun in ("kdvsiz_toplam", "kdv_tutari", "toplam_maliyet"):
+            c.execute(f"ALTER TABLE malzeme_cikislari ADD COLUMN {sutun} REAL")
+
+        # Yalnızca tükenmemiş lotlar indekslenir; (ad, tarih, id) sırası FIFO sırasıdır
+        c.execute('''CREATE INDEX IF NOT EXISTS idx_giris_fifo
+                     ON malzeme_girisleri(ad, tarih_iso) WHERE kalan_adet > 0''')
+
+        # Bir çıkışın hangi lottan kaç adet tükettiği
+        c.execute('''CREATE TABLE IF NOT EXISTS cikis_dagilimlari
+                     (cikis_id INTEGER NOT NULL REFERENCES malzeme_cikislari(id),
+                      giris_id INTEGER NOT NULL REFERENCES malzeme_girisleri(id),
+                      adet INTEGER NOT NULL,
+                      PRIMARY KEY (cikis_id, giris_id)) WITHOUT ROWID''')
+        c.execute("CREATE INDEX IF NOT EXISTS idx_dagilim_giris ON cikis_dagilimlari(giris_id)")
+
+        # Çıkış maliyeti artık kayıtta saklanır; aylık özet doğrudan onu kullanır
+        c.execute("DROP TRIGGER IF EXISTS trg_aylik_ozet_cikis")
+        c.execute('''CREATE TRIGGER trg_aylik_ozet_cikis
+                     AFTER INSERT ON malzeme_cikislari
+                     BEGIN
+                         INSERT OR IGNORE INTO aylik_ozet (ay, malzeme_adi, kategori)
+                         SELECT substr(NEW.tarih_iso, 1, 7), NEW.malzeme_adi, COALESCE(mg.kategori, '')
+                         FROM malzeme_girisleri mg WHERE mg.id = NEW.giris_id;
+                         UPDATE aylik_ozet SET
+                             cikti_kdvsiz = cikti_kdvsiz + NEW.kdvsiz_toplam,
+                             cikti_kdv = cikti_kdv + NEW.kdv_tutari,
+                             cikti_toplam = cikti_toplam + NEW.toplam_maliyet
+                         WHERE ay = substr(NEW.tarih_iso, 1, 7)
+                           AND malzeme_adi = NEW.malzeme_adi
+                           AND kategori = (SELECT COALESCE(mg.kategori, '') FROM malzeme_girisleri mg WHERE mg.id = NEW.giris_id);
+                     END''')
+
+        yeniden_hesapla.update(("fifo", "aylik_ozet"))
+        c.execute("PRAGMA user_version = 5")
+
+    if surum < 6:
+        # Sürüm 6: fark yedekleri için değişiklik günlüğü (hangi satır değişti)
+        c.execute('''CREATE TABLE IF NOT EXISTS degisiklik_gunlugu
+                     (seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                      tablo TEXT NOT NULL,
+                      anahtar NOT NULL)''')
+        for tablo, anahtar in (("malzeme_girisleri", "id"), ("malzeme_cikislari", "id"),
+                               ("cikis_dagilimlari", "cikis_id"), ("mevcut_stok", "malzeme_adi"),
+                               ("malzeme_ozet", "malzeme_adi")):
+            _gunluk_tetikleyicileri(c, tablo, anahtar)
+        c.execute("PRAGMA user_version = 6")
+
+    if surum < 7:
+        # Sürüm 7: kategoriler tablosu. Girişler kategoriye tamsayı kimlikle
+        # bağlanır; KATEGORI_OLUSTURMA yer tutucu girişleri kategori kaydına
+        # dönüştürülüp silinir, özetler kategori kimliğiyle tutulur.
+        c.execute('''CREATE TABLE IF NOT EXISTS kategoriler
+                     (id INTEGER PRIMARY KEY,
+                      ad TEXT NOT NULL UNIQUE)''')
+        c.execute('''INSERT OR IGNORE INTO kategoriler (ad)
+                     SELECT DISTINCT kategori FROM malzeme_girisleri
+                     WHERE kategori IS NOT NULL AND kategori != ''
+                     ORDER BY kategori''')
+
+        c.execute("DROP TRIGGER IF EXISTS trg_aylik_ozet_cikis")
+        c.execute("DROP TABLE IF EXISTS kategori_kullanimi")
+        _tabloyu_yeniden_kur(c, "malzeme_girisleri", '''
+            (id INTEGER PRIMARY KEY AUTOINCREMENT,
+             ad TEXT NOT NULL,
+             fiyat REAL NOT NULL,
+             adet INTEGER NOT NULL,
+             kdv REAL NOT NULL,
+             kdv_tutari REAL NOT NULL,
+             toplam REAL NOT NULL,
+             tarih TEXT NOT NULL,
+             kategori_id INTEGER REFERENCES kategoriler(id),
+             tedarikci TEXT,
+             tarih_iso TEXT,
+             kalan_adet INTEGER)''', '''
+            SELECT mg.id, mg.ad, mg.fiyat, mg.adet, mg.kdv, mg.kdv_tutari, mg.toplam, mg.tarih,
+                   k.id, mg.tedarikci, mg.tarih_iso, mg.kalan_adet
+            FROM malzeme_girisleri mg
+            LEFT JOIN kategoriler k ON k.ad = mg.kategori
+            WHERE mg.ad != 'KATEGORI_OLUSTURMA'
+        ''')
+        c.execute("CREATE INDEX idx_giris_tarih_ad ON malzeme_girisleri(tarih_iso, ad)")
+        c.execute("CREATE INDEX idx_giris_tarih_kategori ON malzeme_girisleri(tarih_iso, kategori_id)")
+        c.execute("CREATE INDEX idx_giris_ad_tarih ON malzeme_girisleri(ad, tarih_iso)")
+        c.execute('''CREATE INDEX idx_giris_fifo
+                     ON malzeme_girisleri(ad, tarih_iso) WHERE kalan_adet > 0''')
+
+        # malzeme_ozet'in kategorisi yazma sırasına bağlı olduğundan kopyalanır
+        _tabloyu_yeniden_kur(c, "malzeme_ozet", '''
+            (malzeme_adi TEXT PRIMARY KEY,
+             kategori_id INTEGER REFERENCES kategoriler(id),
+             son_fiyat REAL,
+             son_birim_kdv REAL,
+             son_birim_toplam REAL,
+             son_tedarikci TEXT,
+             son_giris_tarihi TEXT,
+             son_giris_id INTEGER)''', '''
+            SELECT mo.malzeme_adi, k.id, mo.son_fiyat, mo.son_birim_kdv, mo.son_birim_toplam,
+                   mo.son_tedarikci, mo.son_giris_tarihi, mo.son_giris_id
+            FROM malzeme_ozet mo
+            LEFT JOIN kategoriler k ON k.ad = mo.kategori''')
+        c.execute("CREATE INDEX idx_malzeme_ozet_kategori ON malzeme_ozet(kategori_id)")
+
+        # Aylık özet türetilmiştir; kategorisizler 0 kimliğiyle tutulur
+        c.execute("DROP TABLE aylik_ozet")
+        c.execute('''CREATE TABLE aylik_ozet
+                     (ay TEXT NOT NULL,
+                      malzeme_adi TEXT NOT NULL,
+                      kategori_id INTEGER NOT NULL DEFAULT 0,
+                      girdi_kdvsiz REAL NOT NULL DEFAULT 0,
+                      girdi_kdv REAL NOT NULL DEFAULT 0,
+                      girdi_toplam REAL NOT NULL DEFAULT 0,
+                      cikti_kdvsiz REAL NOT NULL DEFAULT 0,
+                      cikti_kdv REAL NOT NULL DEFAULT 0,
+                      cikti_toplam REAL NOT NULL DEFAULT 0,
+                      PRIMARY KEY (ay, malzeme_adi, kategori_id)) WITHOUT ROWID''')
+
+        c.execute('''CREATE TRIGGER trg_aylik_ozet_giris
+                     AFTER INSERT ON malzeme_girisleri
+                     BEGIN
+                         INSERT OR IGNORE INTO aylik_ozet (ay, malzeme_adi, kategori_id)
+                         VALUES (substr(NEW.tarih_iso, 1, 7), NEW.ad, COALESCE(NEW.kategori_id, 0));
+                         UPDATE aylik_ozet SET
+                             girdi_kdvsiz = girdi_kdvsiz + NEW.fiyat * NEW.adet,
+                             girdi_kdv = girdi_kdv + NEW.kdv_tutari,
+                             girdi_toplam = girdi_toplam + NEW.toplam
+                         WHERE ay = substr(NEW.tarih_iso, 1, 7)
+                           AND malzeme_adi = NEW.ad
+                           AND kategori_id = COALESCE(NEW.kategori_id, 0);
+                     END''')
+        c.execute('''CREATE TRIGGER trg_aylik_ozet_cikis
+                     AFTER INSERT ON malzeme_cikislari
+                     BEGIN
+                         INSERT OR IGNORE INTO aylik_ozet (ay, malzeme_adi, kategori_id)
+                         SELECT substr(NEW.tarih_iso, 1, 7), NEW.malzeme_adi, COALESCE(mg.kategori_id, 0)
+                         FROM malzeme_girisleri mg WHERE mg.id = NEW.giris_id;
+                         UPDATE aylik_ozet SET
+                             cikti_kdvsiz = cikti_kdvsiz + NEW.kdvsiz_toplam,
+                             cikti_kdv = cikti_kdv + NEW.kdv_tutari,
+                             cikti_toplam = cikti_toplam + NEW.toplam_maliyet
+                         WHERE ay = substr(NEW.tarih_iso, 1, 7)
+                           AND malzeme_adi = NEW.malzeme_adi
+                           AND kategori_id = (SELECT COALESCE(mg.kategori_id, 0) FROM malzeme_girisleri mg WHERE mg.id = NEW.giris_id);
+                     END''')
+        c.execute('''CREATE TRIGGER trg_malzeme_ozet_giris
+                     AFTER INSERT ON malzeme_girisleri
+                     BEGIN
+                         INSERT OR IGNORE INTO malzeme_ozet (malzeme_adi) VALUES (NEW.ad);
+                         UPDATE malzeme_ozet SET
+                             kategori_id = COALESCE(NEW.kategori_id, kategori_id),
+                             son_fiyat = NEW.fiyat,
+                             son_birim_kdv = NEW.kdv_tutari / NEW.adet,
+                             son_birim_toplam = NEW.toplam / NEW.adet,
+                             son_tedarikci = NEW.tedarikci,
+                             son_giris_tarihi = NEW.tarih_iso,
+                             son_giris_id = NEW.id
+                         WHERE malzeme_adi = NEW.ad
+                           AND (son_giris_tarihi IS NULL
+                                OR son_giris_tarihi < NEW.tarih_iso
+                                OR (son_giris_tarihi = NEW.tarih_iso AND son_giris_id < NEW.id));
+                         UPDATE malzeme_ozet SET kategori_id = NEW.kategori_id
+                         WHERE malzeme_adi = NEW.ad AND kategori_id IS NULL;
+                     END''')
+        _sayac_tetikleyicileri(c, "malzeme_adi")
+        for tablo, anahtar in (("kategoriler", "id"), ("malzeme_girisleri", "id"),
+                               ("malzeme_ozet", "malzeme_adi")):
+            _gunluk_tetikleyicileri(c, tablo, anahtar)
+
+        yeniden_hesapla.add("aylik_ozet")
+        c.execute("PRAGMA user_version = 7")
+
+    if surum < 8:
+        # Sürüm 8: malzemeler ana tablosu. Malzemeler tamsayı kimlik, benzersiz
+        # kod ve birimle tanımlanır; girişler, çıkışlar, stok ve özetler malzemeye
+        # kimlikle bağlanır. Malzemenin kategorisi malzeme_ozet'ten buraya taşınır.
+        c.execute('''CREATE TABLE IF NOT EXISTS malzemeler
+                     (id INTEGER PRIMARY KEY,
+                      kod TEXT UNIQUE,
+                      ad TEXT NOT NULL UNIQUE,
+                      birim TEXT NOT NULL DEFAULT 'Adet',
+                      kategori_id INTEGER REFERENCES kategoriler(id))''')
+        c.execute("CREATE INDEX IF NOT EXISTS idx_malzemeler_kategori ON malzemeler(kategori_id)")
+        # Kodu verilmeyen malzemeye kimliğinden bir kod atanır (M000001)
+        c.execute('''CREATE TRIGGER IF NOT EXISTS trg_malzeme_kodu
+                     AFTER INSERT ON malzemeler
+                     WHEN NEW.kod IS NULL
+                     BEGIN
+                         UPDATE malzemeler SET kod = printf('M%06d', NEW.id) WHERE id = NEW.id;
+                     END''')
+        c.execute('''INSERT OR IGNORE INTO malzemeler (ad)
+                     SELECT ad FROM malzeme_girisleri
+                     UNION SELECT malzeme_adi FROM malzeme_cikislari
+                     UNION SELECT malzeme_adi FROM mevcut_stok
+                     ORDER BY 1''')
+
+        for tetikleyici in ("trg_aylik_ozet_giris", "trg_aylik_ozet_cikis", "trg_malzeme_ozet_giris"):
+            c.execute(f"DROP TRIGGER IF EXISTS {tetikleyici}")
+        _tabloyu_yeniden_kur(c, "malzeme_girisleri", '''
+            (id INTEGER PRIMARY KEY AUTOINCREMENT,
+             malzeme_id INTEGER NOT NULL REFERENCES malzemeler(id),
+             fiyat REAL NOT NULL,
+             adet INTEGER NOT NULL,
+             kdv REAL NOT NULL,
+             kdv_tutari REAL NOT NULL,
+             toplam REAL NOT NULL,
+             tarih TEXT NOT NULL,
+             kategori_id INTEGER REFERENCES kategoriler(id),
+             tedarikci TEXT,
+             tarih_iso TEXT,
+             kalan_adet INTEGER)''', '''
+            SELECT mg.id, m.id, mg.fiyat, mg.adet, mg.kdv, mg.kdv_tutari, mg.toplam, mg.tarih,
+                   mg.kategori_id, mg.tedarikci, mg.tarih_iso, mg.kalan_adet
+            FROM malzeme_girisleri mg
+            JOIN malzemeler m ON m.ad = mg.ad
+            WHERE mg.id BETWEEN ? AND ?
+        ''', parti_boyutu=GOC_PARTI_BOYUTU)
+        c.execute("CREATE INDEX idx_giris_tarih_malzeme ON malzeme_girisleri(tarih_iso, malzeme_id)")
+        c.execute("CREATE INDEX idx_giris_tarih_kategori ON malzeme_girisleri(tarih_iso, kategori_id)")
+        c.execute("CREATE INDEX idx_giris_malzeme_tarih ON malzeme_girisleri(malzeme_id, tarih_iso)")
+        c.execute('''CREATE INDEX idx_giris_fifo
+                     ON malzeme_girisleri(malzeme_id, tarih_iso) WHERE kalan_adet > 0''')
+
+        _tabloyu_yeniden_kur(c, "malzeme_cikislari", '''
+            (id INTEGER PRIMARY KEY AUTOINCREMENT,
+             giris_id INTEGER NOT NULL REFERENCES malzeme_girisleri(id),
+             malzeme_id INTEGER NOT NULL REFERENCES malzemeler(id),
+             cikis_adedi INTEGER NOT NULL,
+             personel TEXT NOT NULL,
+             aciklama TEXT,
+             tarih TEXT NOT NULL,
+             tarih_iso TEXT,
+             kdvsiz_toplam REAL,
+             kdv_tutari REAL,
+             toplam_maliyet REAL)''', '''
+            SELECT mc.id, mc.giris_id, m.id, mc.cikis_adedi, mc.personel, mc.aciklama, mc.tarih,
+                   mc.tarih_iso, mc.kdvsiz_toplam, mc.kdv_tutari, mc.toplam_maliyet
+            FROM malzeme_cikislari mc
+            JOIN malzemeler m ON m.ad = mc.malzeme_adi
+            WHERE mc.id BETWEEN ? AND ?
+        ''', parti_boyutu=GOC_PARTI_BOYUTU)
+        c.execute("CREATE INDEX idx_cikis_tarih_malzeme ON malzeme_cikislari(tarih_iso, malzeme_id)")
+
+        _tabloyu_yeniden_kur(c, "mevcut_stok", '''
+            (malzeme_id INTEGER PRIMARY KEY REFERENCES malzemeler(id),
+             toplam_adet INTEGER NOT NULL)''', '''
+            SELECT m.id, ms.toplam_adet
+            FROM mevcut_stok ms
+            JOIN malzemeler m ON m.ad = ms.malzeme_adi''')
+
+        # Malzemenin kategorisi: özetteki kategori, yoksa kategorili en son girişinki
+        c.execute('''UPDATE malzemeler SET kategori_id = COALESCE(
+                         (SELECT mo.kategori_id FROM malzeme_ozet mo WHERE mo.malzeme_adi = malzemeler.ad),
+                         (SELECT mg.kategori_id FROM malzeme_girisleri mg
+                          WHERE mg.malzeme_id = malzemeler.id AND mg.kategori_id IS NOT NULL
+                          ORDER BY mg.tarih_iso DESC, mg.id DESC LIMIT 1))''')
+        c.execute("DROP TABLE malzeme_ozet")
+        c.execute('''CREATE TABLE malzeme_ozet
+                     (malzeme_id INTEGER PRIMARY KEY REFERENCES malzemeler(id),
+                      son_fiyat REAL,
+                      son_birim_kdv REAL,
+                      son_birim_toplam REAL,
+                      son_tedarikci TEXT,
+                      son_giris_tarihi TEXT,
+                      son_giris_id INTEGER)''')
+
+        c.execute("DROP TABLE aylik_ozet")
+        c.execute('''CREATE TABLE aylik_ozet
+                     (ay TEXT NOT NULL,
+                      malzeme_id INTEGER NOT NULL,
+                      kategori_id INTEGER NOT NULL DEFAULT 0,
+                      girdi_kdvsiz REAL NOT NULL DEFAULT 0,
+                      girdi_kdv REAL NOT NULL DEFAULT 0,
+                      girdi_toplam REAL NOT NULL DEFAULT 0,
+                      cikti_kdvsiz REAL NOT NULL DEFAULT 0,
+                      cikti_kdv REAL NOT NULL DEFAULT 0,
+                      cikti_toplam REAL NOT NULL DEFAULT 0,
+                      PRIMARY KEY (ay, malzeme_id, kategori_id)) WITHOUT ROWID''')
+
+        c.execute('''CREATE TRIGGER trg_aylik_ozet_giris
+                     AFTER INSERT ON malzeme_girisleri
+                     BEGIN
+                         INSERT OR IGNORE INTO aylik_ozet (ay, malzeme_id, kategori_id)
+                         VALUES (substr(NEW.tarih_iso, 1, 7), NEW.malzeme_id, COALESCE(NEW.kategori_id, 0));
+                         UPDATE aylik_ozet SET
+                             girdi_kdvsiz = girdi_kdvsiz + NEW.fiyat * NEW.adet,
+                             girdi_kdv = girdi_kdv + NEW.kdv_tutari,
+                             girdi_toplam = girdi_toplam + NEW.toplam
+                         WHERE ay = substr(NEW.tarih_iso, 1, 7)
+                           AND malzeme_id = NEW.malzeme_id
+                           AND kategori_id = COALESCE(NEW.kategori_id, 0);
+                     END''')
+        c.execute('''CREATE TRIGGER trg_aylik_ozet_cikis
+                     AFTER INSERT ON malzeme_cikislari
+                     BEGIN
+                         INSERT OR IGNORE INTO aylik_ozet (ay, malzeme_id, kategori_id)
+                         SELECT substr(NEW.tarih_iso, 1, 7), NEW.malzeme_id, COALESCE(mg.kategori_id, 0)
+                         FROM malzeme_girisleri mg WHERE mg.id = NEW.giris_id;
+                         UPDATE aylik_ozet SET
+                             cikti_kdvsiz = cikti_kdvsiz + NEW.kdvsiz_toplam,
+                             cikti_kdv = cikti_kdv + NEW.kdv_tutari,
+                             cikti_toplam = cikti_toplam + NEW.toplam_maliyet
+                         WHERE ay = substr(NEW.tarih_iso, 1, 7)
+                           AND malzeme_id = NEW.malzeme_id
+                           AND kategori_id = (SELECT COALESCE(mg.kategori_id, 0) FROM malzeme_girisleri mg WHERE mg.id = NEW.giris_id);
+                     END''')
+        # Tarihçe olarak en son giriş özeti günceller. Malzemenin kategorisi en son
+        # girişin kategorisi olur; kategorisiz malzeme ilk kategorili girişinkini alır.
+        c.execute('''CREATE TRIGGER trg_malzeme_ozet_giris
+                     AFTER INSERT ON malzeme_girisleri
+                     BEGIN
+                         INSERT OR IGNORE INTO malzeme_ozet (malzeme_id) VALUES (NEW.malzeme_id);
+                         UPDATE malzeme_ozet SET
+                             son_fiyat = NEW.fiyat,
+                             son_birim_kdv = NEW.kdv_tutari / NEW.adet,
+                             son_birim_toplam = NEW.toplam / NEW.adet,
+                             son_tedarikci = NEW.tedarikci,
+                             son_giris_tarihi = NEW.tarih_iso,
+                             son_giris_id = NEW.id
+                         WHERE malzeme_id = NEW.malzeme_id
+                           AND (son_giris_tarihi IS NULL
+                                OR son_giris_tarihi < NEW.tarih_iso
+                                OR (son_giris_tarihi = NEW.tarih_iso AND son_giris_id < NEW.id));
+                         UPDATE malzemeler SET kategori_id = NEW.kategori_id
+                         WHERE id = NEW.malzeme_id
+                           AND NEW.kategori_id IS NOT NULL
+                           AND kategori_id IS NOT NEW.kategori_id
+                           AND (kategori_id IS NULL
+                                OR NEW.id = (SELECT son_giris_id FROM malzeme_ozet WHERE malzeme_id = NEW.malzeme_id));
+                     END''')
+        _sayac_tetikleyicileri(c, "malzeme_id")
+        for tablo in ("malzeme_girisleri", "malzeme_cikislari", "malzemeler", "mevcut_stok", "malzeme_ozet"):
+            _gunluk_tetikleyicileri(c, tablo, GUNLUKLU_TABLOLAR[tablo])
+
+        yeniden_hesapla.update(("malzeme_ozet", "aylik_ozet", "sayaclar"))
+        c.execute("PRAGMA user_version = 8")
+
+    if "fifo" in yeniden_hesapla:
+        rebuild_fifo(conn)
+    if "malzeme_ozet" in yeniden_hesapla:
+        rebuild_malzeme_ozet(conn)
+    if "aylik_ozet" in yeniden_hesapla:
+        rebuild_aylik_ozet(conn)
+    if "sayaclar" in yeniden_hesapla:
+        rebuild_sayaclar(conn)
+
+    conn.commit()
+
+
+def _tabloyu_yeniden_kur(c: sqlite3.Cursor, tablo: str, tanim: str, secim: str,
+                         parti_boyutu: Optional[int] = None) -> None:
+    """Tabloyu yeni sütun tanımıyla kopyalayıp yeniden kurar (açık işlem içinde)
+
+    Eski tablonun indeksleri ve tetikleyicileri silinir, çağıran yeniden
+    oluşturur. AUTOINCREMENT sayacı korunur; silinmiş kimlikler geri gelmez.
+    parti_boyutu verilirse seçim "id BETWEEN ? AND ?" koşulunu taşır ve satırlar
+    bu genişlikte kimlik aralıklarıyla kopyalanır.
+    """
+    sayac = c.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (tablo,)).fetchone()
+    c.execute(f"CREATE TABLE {tablo}_yeni {tanim}")
+    if parti_boyutu is None:
+        c.execute(f"INSERT INTO {tablo}_yeni {secim}")
+    else:
+        en_kucuk, en_buyuk = c.execute(f"SELECT MIN(id), MAX(id) FROM {tablo}").fetchone()
+        if en_kucuk is not None:
+            for bas in range(en_kucuk, en_buyuk + 1, parti_boyutu):
+                c.execute(f"INSERT INTO {tablo}_yeni {secim}", (bas, bas + parti_boyutu - 1))
+    c.execute(f"DROP TABLE {tablo}")
+    # Başka tabloların tetikleyicileri eski tabloya başvurabilir; yeni tablo
+    # aynı adı alacağından yeniden adlandırmada şema denetimi atlanır
+    c.execute("PRAGMA legacy_alter_table = ON")
+    try:
+        c.execute(f"ALTER TABLE {tablo}_yeni RENAME TO {tablo}")
+    finally:
+        c.execute("PRAGMA legacy_alter_table = OFF")
+    if sayac:
+        c.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?", (sayac[0], tablo))
+
+
+def _sayac_tetikleyicileri(c: sqlite3.Cursor, anahtar: str) -> None:
+    """mevcut_stok ve malzeme_ozet satırlarını dashboard sayaçlarına bağlayan tetikleyiciler
+
+    Malzemenin sayaçlara katkısı: stoktaki adet (> 0), adet × son birim maliyet
+    ve 0 < adet < eşik ise düşük stok. mevcut_stok veya malzeme_ozet satırı
+    değiştiğinde eski katkı çıkarılıp yenisi eklenir. anahtar iki tabloyu
+    birleştiren malzeme sütunudur.
+    """
+    for olay, eski, yeni in (("INSERT", None, "NEW"), ("UPDATE", "OLD", "NEW"), ("DELETE", "OLD", None)):
+        ad = f"{yeni or eski}.{anahtar}"
+        adet_farki = " - ".join(
+            f"MAX({k}.toplam_adet, 0)" if k else "0" for k in (yeni, eski)
+        )
+        dusuk_farki = " - ".join(
+            f"({k}.toplam_adet > 0 AND {k}.toplam_adet < {DUSUK_STOK_ESIGI})" if k else "0"
+            for k in (yeni, eski)
+        )
+        c.execute(f'''CREATE TRIGGER IF NOT EXISTS trg_sayaclar_stok_{olay.lower()}
+                      AFTER {olay} ON mevcut_stok
+                      BEGIN
+                          UPDATE sayaclar SET
+                              toplam_adet = toplam_adet + ({adet_farki}),
+                              dusuk_stok = dusuk_stok + ({dusuk_farki}),
+                              stok_degeri = stok_degeri + ({adet_farki}) *
+                                  COALESCE((SELECT son_birim_toplam FROM malzeme_ozet WHERE {anahtar} = {ad}), 0)
+                          WHERE id = 1;
+                      END''')
+
+        birim_farki = " - ".join(
+            f"COALESCE({k}.son_birim_toplam, 0)" if k else "0" for k in (yeni, eski)
+        )
+        ozet_olayi = "UPDATE OF son_birim_toplam" if olay == "UPDATE" else olay
+        c.execute(f'''CREATE TRIGGER IF NOT EXISTS trg_sayaclar_ozet_{olay.lower()}
+                      AFTER {ozet_olayi} ON malzeme_ozet
+                      BEGIN
+                          UPDATE sayaclar SET
+                              stok_degeri = stok_degeri + ({birim_farki}) *
+                                  COALESCE((SELECT MAX(toplam_adet, 0) FROM mevcut_stok WHERE {anahtar} = {ad}), 0)
+                          WHERE id = 1;
+                      END''')
+
+
+def _gunluk_tetikleyicileri(c: sqlite3.Cursor, tablo: str, anahtar: str) -> None:
+    """Tablonun değişen satır anahtarlarını degisiklik_gunlugu'ne yazan tetikleyiciler"""
+    c.execute(f'''CREATE TRIGGER IF NOT EXISTS trg_gunluk_{tablo}_insert
+                 AFTER INSERT ON {tablo}
+                 BEGIN
+                     INSERT INTO degisiklik_gunlugu (tablo, anahtar) VALUES ('{tablo}', NEW.{anahtar});
+                 END''')
+    c.execute(f'''CREATE TRIGGER IF NOT EXISTS trg_gunluk_{tablo}_update
+                 AFTER UPDATE ON {tablo}
+                 BEGIN
+                     INSERT INTO degisiklik_gunlugu (tablo, anahtar) VALUES ('{tablo}', NEW.{anahtar});
+                     INSERT INTO degisiklik_gunlugu (tablo, anahtar)
+                     SELECT '{tablo}', OLD.{anahtar} WHERE OLD.{anahtar} IS NOT NEW.{anahtar};
+                 END''')
+    c.execute(f'''CREATE TRIGGER IF NOT EXISTS trg_gunluk_{tablo}_delete
+                 AFTER DELETE ON {tablo}
+                 BEGIN
+                     INSERT INTO degisiklik_gunlugu (tablo, anahtar) VALUES ('{tablo}', OLD.{anahtar});
+                 END''')
+
+
+def rebuild_malzeme_ozet(conn: sqlite3.Connection) -> None:
+    """Malzeme özet tablosunu her malzemenin en son giriş kaydından yeniden oluşturur"""
+    conn.execute("DELETE FROM malzeme_ozet")
+    conn.execute('''
+        INSERT INTO malzeme_ozet (malzeme_id, son_fiyat, son_birim_kdv, son_birim_toplam,
+                                  son_tedarikci, son_giris_tarihi, son_giris_id)
+        SELECT mg.malzeme_id,
+               mg.fiyat, mg.kdv_tutari / mg.adet, mg.toplam / mg.adet,
+               mg.tedarikci, mg.tarih_iso, mg.id
+        FROM malzeme_girisleri mg
+        WHERE mg.id = (SELECT id FROM malzeme_girisleri
+                       WHERE malzeme_id = mg.malzeme_id
+                       ORDER BY tarih_iso DESC, id DESC LIMIT 1)
+    ''')
+
+
+def rebuild_sayaclar(conn: sqlite3.Connection) -> None:
+    """Dashboard sayaçlarını baştan hesaplar"""
+    conn.execute(f'''
+        INSERT OR REPLACE INTO sayaclar (id, toplam_adet, dusuk_stok, stok_degeri)
+        SELECT 1,
+               COALESCE(SUM(MAX(ms.toplam_adet, 0)), 0),
+               COALESCE(SUM(ms.toplam_adet > 0 AND ms.toplam_adet < {DUSUK_STOK_ESIGI}), 0),
+               COALESCE(SUM(MAX(ms.toplam_adet, 0) * COALESCE(mo.son_birim_toplam, 0)), 0)
+        FROM mevcut_stok ms
+        LEFT JOIN malzeme_ozet mo ON mo.malzeme_id = ms.malzeme_id
+    ''')
+
+
+def rebuild_fifo(conn: sqlite3.Connection) -> None:
+    """Lot kalan adetlerini, çıkış dağılımlarını ve çıkış maliyetlerini FIFO ile yeniden hesaplar
+    
+    Çıkışlar kayıt sırasıyla (tarih, id) işlenir ve her biri malzemenin en eski
+    kalan lotlarından düşülür. Eski sürümlerde her çıkış ilk lota yazıldığı için
+    geçiş sırasında bir kez çalıştırılır.
+    """
+    conn.execute("DELETE FROM cikis_dagilimlari")
+    conn.execute("UPDATE malzeme_girisleri SET kalan_adet = adet")
+
+    lotlar = defaultdict(deque)
+    for lot in conn.execute(
+        "SELECT malzeme_id, id, adet, fiyat, kdv_tutari / adet, toplam / adet FROM malzeme_girisleri "
+        "WHERE adet > 0 ORDER BY malzeme_id, tarih_iso, id"
+    ):
+        lotlar[lot[0]].append(list(lot[1:]))
+
+    kalanlar, dagilimlar, maliyetler = {}, [], []
+    for cikis_id, malzeme_id, adet in conn.execute(
+        "SELECT id, malzeme_id, cikis_adedi FROM malzeme_cikislari ORDER BY tarih_iso, id"
+    ).fetchall():
+        kuyruk = lotlar[malzeme_id]
+        ilk_lot = kuyruk[0][0] if kuyruk else None
+        kdvsiz = kdv = toplam = 0.0
+        while adet > 0 and kuyruk:
+            lot = kuyruk[0]
+            alinan = min(adet, lot[1])
+            lot[1] -= alinan
+            adet -= alinan
+            kdvsiz += alinan * lot[2]
+            kdv += alinan * lot[3]
+            toplam += alinan * lot[4]
+            dagilimlar.append((cikis_id, lot[0], alinan))
+            kalanlar[lot[0]] = lot[1]
+            if lot[1] == 0:
+                kuyruk.popleft()
+        maliyetler.append((kdvsiz, kdv, toplam, ilk_lot, cikis_id))
+
+    conn.executemany("UPDATE malzeme_girisleri SET kalan_adet = ? WHERE id = ?",
+                     [(kalan, lot_id) for lot_id, kalan in kalanlar.items()])
+    conn.executemany("INSERT INTO cikis_dagilimlari (cikis_id, giris_id, adet) VALUES (?, ?, ?)", dagilimlar)
+    conn.executemany(
+        "UPDATE malzeme_cikislari SET kdvsiz_toplam = ?, kdv_tutari = ?, toplam_maliyet = ?, "
+        "giris_id = COALESCE(?, giris_id) WHERE id = ?",
+        maliyetler
+    )
+
+
+def rebuild_aylik_ozet(conn: sqlite3.Connection) -> None:
+    """Aylık özet tablosunu hareket tablolarından tek geçişte yeniden oluşturur"""
+    conn.execute("DELETE FROM aylik_ozet")
+    conn.execute('''
+        INSERT INTO aylik_ozet (ay, malzeme_id, kategori_id,
+                                girdi_kdvsiz, girdi_kdv, girdi_toplam,
+                                cikti_kdvsiz, cikti_kdv, cikti_toplam)
+        SELECT ay, malzeme_id, kategori_id,
+               SUM(girdi_kdvsiz), SUM(girdi_kdv), SUM(girdi_toplam),
+               SUM(cikti_kdvsiz), SUM(cikti_kdv), SUM(cikti_toplam)
+        FROM (
+            SELECT substr(mg.tarih_iso, 1, 7) AS ay, mg.malzeme_id AS malzeme_id,
+                   COALESCE(mg.kategori_id, 0) AS kategori_id,
+                   mg.fiyat * mg.adet AS girdi_kdvsiz, mg.kdv_tutari AS girdi_kdv, mg.toplam AS girdi_toplam,
+                   0 AS cikti_kdvsiz, 0 AS cikti_kdv, 0 AS cikti_toplam
+            FROM malzeme_girisleri mg
+            UNION ALL
+            SELECT substr(mc.tarih_iso, 1, 7), mc.malzeme_id, COALESCE(mg.kategori_id, 0),
+                   0, 0, 0,
+                   COALESCE(mc.kdvsiz_toplam, 0), COALESCE(mc.kdv_tutari, 0), COALESCE(mc.toplam_maliyet, 0)
+            FROM malzeme_cikislari mc
+            JOIN malzeme_girisleri mg ON mg.id = mc.giris_id
+        )
+        GROUP BY ay, malzeme_id, kategori_id
+    ''')
+
+
+# ---------------------------------------------------------------------------
+# Değişiklik bildirimleri
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class Degisiklik:
+    """Bir yazma işleminin neyi değiştirdiği (görünümler yalnızca etkilenince yenilenir)"""
+    tur: str                        # 'giris', 'cikis', 'kategori_ekle', 'kategori_sil' veya 'tumu'
+    malzeme: Optional[str] = None   # None: bilinmiyor veya birden çok malzeme (çıkış fişi)
+    kategori: Optional[str] = None
+    tarih: Optional[date] = None
+    tedarikci: Optional[str] = None
+
+
+class DegisiklikYayini:
+    """Yazma işlemlerinden gelen değişiklikleri abonelere iletir"""
+
+    def __init__(self):
+        self._aboneler: List[Callable[[Degisiklik], None]] = []
+
+    def abone_ol(self, abone: Callable[[Degisiklik], None]) -> None:
+        self._aboneler.append(abone)
+
+    def yayinla(self, degisiklik: Degisiklik) -> None:
+        for abone in list(self._aboneler):
+            abone(degisiklik)
+
+
+def _metin_eslesir(aranan: str, deger: Optional[str]) -> bool:
+    """LIKE '%aranan%' filtresinin değeri kapsayıp kapsamadığı (bilinmiyorsa True)"""
+    aranan = aranan.strip()
+    return not aranan or deger is None or aranan.casefold() in deger.casefold()
+
+
+def _kategori_eslesir(kategori: str, deger: Optional[str]) -> bool:
+    """Kategori filtresinin değeri kapsayıp kapsamadığı (bilinmiyorsa True)"""
+    kategori = kategori.strip()
+    return not kategori or deger is None or kategori == deger
+
+
+# ---------------------------------------------------------------------------
+# Raporlar
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class HareketFiltresi:
+    """Hareket raporu filtre parametreleri"""
+    baslangic: date
+    bitis: date
+    kategori: str = ''
+    malzeme: str = ''
+    hareket_turu: str = 'Tümü'  # 'Tümü', 'Giriş' veya 'Çıkış'
+
+    def anahtar(self) -> tuple:
+        """Aynı sonucu veren filtreler için aynı olan önbellek anahtarı"""
+        # Giriş/Çıkış dışındaki türler sorguda 'Tümü' gibi davranır
+        tur = self.hareket_turu if self.hareket_turu in ('Giriş', 'Çıkış') else 'Tümü'
+        return (self.baslangic, self.bitis, self.kategori.strip(), self.malzeme.strip(), tur)
+
+    def etkilenir(self, degisiklik: Degisiklik) -> bool:
+        """Değişikliğin bu filtreyle gösterilen raporu değiştirip değiştirmediği"""
+        if degisiklik.tur in ('tumu', 'kategori_sil'):
+            return True
+        if degisiklik.tur == 'giris':
+            tur_uygun = self.hareket_turu != 'Çıkış'
+        elif degisiklik.tur == 'cikis':
+            tur_uygun = self.hareket_turu != 'Giriş'
+        else:
+            return False
+        return (tur_uygun
+                and (degisiklik.tarih is None or self.baslangic <= degisiklik.tarih <= self.bitis)
+                and _kategori_eslesir(self.kategori, degisiklik.kategori)
+                and _metin_eslesir(self.malzeme, degisiklik.malzeme))
+
+
+@dataclass
+class HareketRaporu:
+    """Hareket raporu satırları ve toplamları"""
+    satirlar: List[tuple] = field(default_factory=list)
+    toplam_giris: int = 0
+    toplam_cikis: int = 0
+    toplam_kdvsiz: float = 0.0
+    toplam_kdv: float = 0.0
+    toplam_maliyet: float = 0.0
+    satir_sayisi: int = 0
+
+
+# Hareket raporu sütunları (satırlar bu sırayla döner)
+HAREKET_SUTUNLARI = [
+    "Tarih", "Malzeme Adı", "Hareket Türü", "Miktar", "Birim Fiyat",
+    "KDV'siz Toplam", "KDV Tutarı", "Toplam Maliyet", "Personel/Tedarikçi",
+    "Kategori", "Açıklama"
+]
+
+
+# Hareket raporunun sıralaması; sayfa sınırları bu sıradaki
+# (siralama_tarihi, hareket_turu, kayit_id) anahtarlarıdır
+HAREKET_SIRALAMASI = " ORDER BY siralama_tarihi DESC, hareket_turu, kayit_id DESC"
+
+# Anahtar sınırında kimlik koşulunu devre dışı bırakan değer (SQLite INTEGER üst sınırı)
+_EN_BUYUK_ID = 2 ** 63 - 1
+
+
+def _sonraki_kosulu(tablo: str, tur: str, sonra) -> Tuple[str, list]:
+    """Bir kolda sıralamada sonra anahtarından sonra gelen satırların koşulu
+
+    Kol tek bir hareket türü içerir; aynı tarihte bu tür anahtarın türünden
+    önce geliyorsa o tarihin satırlarının hiçbiri, sonra geliyorsa hepsi,
+    aynıysa yalnızca daha küçük kimlikliler koşula uyar. Tarih sınırı ayrıca
+    yazılır ki tarih indeksinde aralık taraması yapılabilsin.
+    """
+    tarih, anahtar_turu, kayit_id = sonra
+    if tur == anahtar_turu:
+        sinir = kayit_id
+    else:
+        sinir = _EN_BUYUK_ID if tur > anahtar_turu else 0
+    return (f" AND {tablo}.tarih_iso <= ? AND ({tablo}.tarih_iso < ? OR {tablo}.id < ?)",
+            [tarih, tarih, sinir])
+
+
+def _hareket_sorgusu(filtre: HareketFiltresi, sirali: bool = True, sonra=None,
+                     yalniz_anahtar: bool = False) -> Tuple[str, list]:
+    """Hareket raporu sorgusunu ve parametrelerini oluşturur
+
+    Satırların sonunda yalnızca sıralama için kullanılan iki gizli sütun
+    (ISO tarih ve kayıt id) bulunur; sıralama sayfalama için kararlıdır.
+    sonra verilirse yalnızca sıralamada o anahtardan sonra gelen satırlar
+    döner (anahtar kümesiyle sayfalama). yalniz_anahtar ile satırlar yalnızca
+    sıralama anahtarlarından oluşur ve join'ler atlanır.
+    """
+    if filtre.baslangic > filtre.bitis:
+        raise StokHatasi("Başlangıç tarihi bitiş tarihinden sonra olamaz!")
+
+    kategori = filtre.kategori.strip()
+    malzeme = filtre.malzeme.strip()
+    tarih_araligi = [filtre.baslangic.isoformat(), filtre.bitis.isoformat()]
+
+    # Giriş hareketleri için sorgu
+    if yalniz_anahtar:
+        giris_query = """
+    SELECT mg.tarih_iso AS siralama_tarihi, 'Giriş' AS hareket_turu, mg.id AS kayit_id
+    FROM malzeme_girisleri mg
+    WHERE mg.tarih_iso BETWEEN ? AND ?
+    """
+    else:
+        giris_query = """
+    SELECT
+        mg.tarih AS hareket_tarih,
+        m.ad AS malzeme_adi,
+        'Giriş' AS hareket_turu,
+        mg.adet AS miktar,
+        mg.fiyat AS birim_fiyat,
+        (mg.fiyat * mg.adet) AS kdvsiz_toplam,
+        mg.kdv_tutari AS kdv_tutari,
+        mg.toplam AS toplam_maliyet,
+        COALESCE(mg.tedarikci, 'Belirtilmemiş') AS tedarikci,
+        COALESCE(k.ad, 'Kategorisiz') AS kategori,
+        '' AS aciklama,
+        mg.tarih_iso AS siralama_tarihi,
+        mg.id AS kayit_id
+    FROM malzeme_girisleri mg
+    JOIN malzemeler m ON m.id = mg.malzeme_id
+    LEFT JOIN kategoriler k ON k.id = mg.kategori_id
+    WHERE mg.tarih_iso BETWEEN ? AND ?
+    """
+    giris_params = list(tarih_araligi)
+
+    if kategori:
+        giris_query += " AND mg.kategori_id = (SELECT id FROM kategoriler WHERE ad = ?)"
+        giris_params.append(kategori)
+
+    if malzeme:
+        giris_query += " AND mg.malzeme_id IN (SELECT id FROM malzemeler WHERE ad LIKE ?)"
+        giris_params.append(f'%{malzeme}%')
+
+    if sonra is not None:
+        kosul, kosul_params = _sonraki_kosulu("mg", 'Giriş', sonra)
+        giris_query += kosul
+        giris_params += kosul_params
+
+    # Çıkış hareketleri için sorgu
+    if yalniz_anahtar:
+        cikis_query = """
+    SELECT mc.tarih_iso AS siralama_tarihi, 'Çıkış' AS hareket_turu, mc.id AS kayit_id
+    FROM malzeme_cikislari mc
+    WHERE mc.tarih_iso BETWEEN ? AND ?
+    """
+    else:
+        cikis_query = """
+    SELECT
+        mc.tarih AS hareket_tarih,
+        m.ad AS malzeme_adi,
+        'Çıkış' AS hareket_turu,
+        mc.cikis_adedi AS miktar,
+        (mc.kdvsiz_toplam / mc.cikis_adedi) AS birim_fiyat,
+        mc.kdvsiz_toplam AS kdvsiz_toplam,
+        mc.kdv_tutari AS kdv_tutari,
+        mc.toplam_maliyet AS toplam_maliyet,
+        mc.personel AS personel,
+        (SELECT COALESCE(k.ad, 'Kategorisiz') FROM malzeme_girisleri mg
+         LEFT JOIN kategoriler k ON k.id = mg.kategori_id WHERE mg.id = mc.giris_id) AS kategori,
+        COALESCE(mc.aciklama, '') AS aciklama,
+        mc.tarih_iso AS siralama_tarihi,
+        mc.id AS kayit_id
+    FROM malzeme_cikislari mc
+    JOIN malzemeler m ON m.id = mc.malzeme_id
+    WHERE mc.tarih_iso BETWEEN ? AND ?
+    """
+    cikis_params = list(tarih_araligi)
+
+    if kategori:
+        cikis_query += (" AND EXISTS (SELECT 1 FROM malzeme_girisleri mg WHERE mg.id = mc.giris_id"
+                        " AND mg.kategori_id = (SELECT id FROM kategoriler WHERE ad = ?))")
+        cikis_params.append(kategori)
+
+    if malzeme:
+        cikis_query += " AND mc.malzeme_id IN (SELECT id FROM malzemeler WHERE ad LIKE ?)"
+        cikis_params.append(f'%{malzeme}%')
+
+    if sonra is not None:
+        kosul, kosul_params = _sonraki_kosulu("mc", 'Çıkış', sonra)
+        cikis_query += kosul
+        cikis_params += kosul_params
+
+    if filtre.hareket_turu == 'Giriş':
+        query, params = giris_query, giris_params
+    elif filtre.hareket_turu == 'Çıkış':
+        query, params = cikis_query, cikis_params
+    else:
+        query, params = giris_query + " UNION ALL " + cikis_query, giris_params + cikis_params
+
+    # Tarih indeksleriyle sıralı okunan iki kol birleştirilir (MERGE UNION ALL)
+    if sirali:
+        query += HAREKET_SIRALAMASI
+    return query, params
+
+
+def _sayfa_sinirlari(imlec: sqlite3.Cursor, sayfa_boyutu: int) -> List[Optional[tuple]]:
+    """Sıralı anahtar satırlarından her sayfanın başlangıç sınırını çıkarır
+
+    Dönen listenin p. öğesi p. sayfadan hemen önceki satırın anahtarıdır
+    (ilk sayfa için None); liste uzunluğu sayfa sayısıdır.
+    """
+    sinirlar = [None]
+    sira = 0
+    for anahtar in _parca_parca(imlec):
+        sira += 1
+        if sira % sayfa_boyutu == 0:
+            sinirlar.append(tuple(anahtar))
+    if sira and sira % sayfa_boyutu == 0:
+        sinirlar.pop()
+    return sinirlar
+
+
+def hareket_raporu(conn: sqlite3.Connection, filtre: HareketFiltresi) -> HareketRaporu:
+    """Filtreye uyan giriş/çıkış hareketlerini ve toplamlarını döndürür"""
+    query, params = _hareket_sorgusu(filtre)
+    rapor = HareketRaporu()
+
+    for row in conn.execute(query, params):
+        # Gizli sıralama sütunlarını at
+        row = row[:len(HAREKET_SUTUNLARI)]
+        rapor.satirlar.append(row)
+        rapor.satir_sayisi += 1
+
+        if row[2] == 'Giriş':
+            rapor.toplam_giris += row[3] if row[3] else 0
+        else:
+            rapor.toplam_cikis += row[3] if row[3] else 0
+
+        rapor.toplam_kdvsiz += row[5] if row[5] else 0
+        rapor.toplam_kdv += row[6] if row[6] else 0
+        rapor.toplam_maliyet += row[7] if row[7] else 0
+
+    return rapor
+
+
+def hareket_toplamlari(conn: sqlite3.Connection, filtre: HareketFiltresi) -> HareketRaporu:
+    """Hareket raporunun satır sayısını ve toplamlarını satırları okumadan hesaplar"""
+    query, params = _hareket_sorgusu(filtre, sirali=False)
+    row = conn.execute(f"""
+        SELECT COUNT(*),
+               SUM(CASE WHEN hareket_turu = 'Giriş' THEN miktar ELSE 0 END),
+               SUM(CASE WHEN hareket_turu = 'Çıkış' THEN miktar ELSE 0 END),
+               SUM(kdvsiz_toplam), SUM(kdv_tutari), SUM(toplam_maliyet)
+        FROM ({query})
+    """, params).fetchone()
+
+    return HareketRaporu(
+        satir_sayisi=row[0],
+        toplam_giris=row[1] or 0,
+        toplam_cikis=row[2] or 0,
+        toplam_kdvsiz=row[3] or 0.0,
+        toplam_kdv=row[4] or 0.0,
+        toplam_maliyet=row[5] or 0.0,
+    )
+
+
+def hareket_sayfa_sinirlari(conn: sqlite3.Connection, filtre: HareketFiltresi,
+                            sayfa_boyutu: int) -> List[Optional[tuple]]:
+    """Hareket raporunun sayfa sınırlarını (bkz. hareket_sayfasi) döndürür
+
+    Yalnızca sıralama anahtarları kapsayan indekslerden okunur; tüm rapor
+    bir kez taranır, bu yüzden arka planda çağrılmalıdır.
+    """
+    query, params = _hareket_sorgusu(filtre, yalniz_anahtar=True)
+    return _sayfa_sinirlari(conn.execute(query, params), sayfa_boyutu)
+
+
+def hareket_sayfasi(conn: sqlite3.Connection, filtre: HareketFiltresi,
+                    sonra: Optional[tuple], adet: int) -> List[tuple]:
+    """Hareket raporunda sonra anahtarından sonraki adet satırı döndürür
+
+    sonra None ise rapor baştan okunur. OFFSET kullanılmaz; sayfa, sıralama
+    anahtarının tarih indeksindeki konumundan okunduğu için raporun
+    neresinde olursa olsun aynı sürede gelir.
+    """
+    query, params = _hareket_sorgusu(filtre, sonra=sonra)
+    rows = conn.execute(query + " LIMIT ?", params + [adet])
+    return [row[:len(HAREKET_SUTUNLARI)] for row in rows]
+
+
+def _parca_parca(imlec: sqlite3.Cursor, kesit: Optional[int] = None) -> Iterator[tuple]:
+    """İmleci parça parça okur; bellekte en fazla bir parça tutulur"""
+    while True:
+        parca = imlec.fetchmany(IMLEC_PARCA_BOYUTU)
+        if not parca:
+            return
+        for row in parca:
+            yield row if kesit is None else row[:kesit]
+
+
+def hareket_satirlari(conn: sqlite3.Connection, filtre: HareketFiltresi) -> Iterator[tuple]:
+    """Hareket raporunun tüm satırlarını sırayla, belleğe almadan üretir"""
+    query, params = _hareket_sorgusu(filtre)
+    return _parca_parca(conn.execute(query, params), len(HAREKET_SUTUNLARI))
+
+
+@dataclass(frozen=True)
+class StokFiltresi:
+    """Mevcut stok filtre parametreleri"""
+    kategori: str = ''
+    malzeme: str = ''
+    stok_durumu: str = 'Tümü'  # 'Tümü', 'Düşük Stok (<10)' veya 'Normal Stok'
+
+    def anahtar(self) -> tuple:
+        """Aynı sonucu veren filtreler için aynı olan önbellek anahtarı"""
+        durum = self.stok_durumu if self.stok_durumu in ('Düşük Stok (<10)', 'Normal Stok') else 'Tümü'
+        return (self.kategori.strip(), self.malzeme.strip(), durum)
+
+    def etkilenir(self, degisiklik: Degisiklik) -> bool:
+        """Değişikliğin bu filtreyle gösterilen stok listesini değiştirip değiştirmediği"""
+        if degisiklik.tur in ('tumu', 'kategori_sil'):
+            return True
+        if degisiklik.tur not in ('giris', 'cikis'):
+            return False
+        # Stok durumu miktarla değiştiği için burada ayrıca elenmez
+        return (_kategori_eslesir(self.kategori, degisiklik.kategori)
+                and _metin_eslesir(self.malzeme, degisiklik.malzeme))
+
+
+@dataclass
+class StokRaporu:
+    """Mevcut stok satırları ve toplamları"""
+    satirlar: List[tuple] = field(default_factory=list)
+    toplam_malzeme: int = 0
+    toplam_kdvsiz: float = 0.0
+    toplam_kdv: float = 0.0
+    toplam_maliyet: float = 0.0
+    dusuk_stok: int = 0
+    satir_sayisi: int = 0
+
+
+# Mevcut stok sütunları (satırlar bu sırayla döner)
+STOK_SUTUNLARI = [
+    "Malzeme Adı", "Kategori", "Mevcut Stok", "Birim Fiyat (₺)",
+    "KDV'siz Toplam (₺)", "KDV Tutarı (₺)", "Toplam Maliyet (₺)",
+    "Tedarikçi", "Son Giriş Tarihi"
+]
+
+
+def _stok_sorgusu(filtre: StokFiltresi, sirali: bool = True, sonra=None) -> Tuple[str, list]:
+    """Mevcut stok sorgusunu ve parametrelerini oluşturur
+
+    Satırlar (benzersiz) malzeme adına göre sıralıdır; sonra verilirse
+    yalnızca adı o anahtardan sonra gelen malzemeler döner.
+    """
+    # Son giriş bilgileri özet tablodan tek bir join ile gelir
+    query = """
+    SELECT
+        m.ad AS malzeme_adi,
+        COALESCE(k.ad, 'Kategorisiz') AS kategori,
+        ms.toplam_adet AS mevcut_stok,
+        mo.son_fiyat AS birim_fiyat,
+        (ms.toplam_adet * mo.son_fiyat) AS kdvsiz_toplam,
+        (ms.toplam_adet * mo.son_birim_kdv) AS kdv_tutari,
+        (ms.toplam_adet * mo.son_birim_toplam) AS toplam_maliyet,
+        COALESCE(mo.son_tedarikci, 'Belirtilmemiş') AS tedarikci,
+        COALESCE(strftime('%d.%m.%Y', mo.son_giris_tarihi), 'Bilinmiyor') AS son_giris_tarihi
+    FROM mevcut_stok ms
+    JOIN malzemeler m ON m.id = ms.malzeme_id
+    LEFT JOIN malzeme_ozet mo ON mo.malzeme_id = ms.malzeme_id
+    LEFT JOIN kategoriler k ON k.id = m.kategori_id
+    WHERE ms.toplam_adet > 0
+    """
+    params = []
+    kategori = filtre.kategori.strip()
+    malzeme = filtre.malzeme.strip()
+
+    if kategori:
+        query += " AND m.kategori_id = (SELECT id FROM kategoriler WHERE ad = ?)"
+        params.append(kategori)
+
+    if malzeme:
+        query += " AND m.ad LIKE ?"
+        params.append(f'%{malzeme}%')
+
+    if filtre.stok_durumu == 'Düşük Stok (<10)':
+        query += f" AND ms.toplam_adet < {DUSUK_STOK_ESIGI}"
+    elif filtre.stok_durumu == 'Normal Stok':
+        query += f" AND ms.toplam_adet >= {DUSUK_STOK_ESIGI}"
+
+    if sonra is not None:
+        query += " AND m.ad > ?"
+        params.append(sonra[0])
+
+    if sirali:
+        query += " ORDER BY m.ad"
+    return query, params
+
+
+def mevcut_stok(conn: sqlite3.Connection, filtre: StokFiltresi) -> StokRaporu:
+    """Stokta bulunan malzemeleri son giriş bilgileriyle döndürür"""
+    query, params = _stok_sorgusu(filtre)
+    rapor = StokRaporu()
+
+    for row in conn.execute(query, params):
+        rapor.satirlar.append(row)
+        rapor.satir_sayisi += 1
+        rapor.toplam_malzeme += row[2]
+        rapor.toplam_kdvsiz += row[4] if row[4] else 0
+        rapor.toplam_kdv += row[5] if row[5] else 0
+        rapor.toplam_maliyet += row[6] if row[6] else 0
+        if row[2] < DUSUK_STOK_ESIGI:
+            rapor.dusuk_stok += 1
+
+    return rapor
+
+
+def stok_toplamlari(conn: sqlite3.Connection, filtre: StokFiltresi) -> StokRaporu:
+    """Mevcut stok raporunun satır sayısını ve toplamlarını satırları okumadan hesaplar"""
+    query, params = _stok_sorgusu(filtre, sirali=False)
+    row = conn.execute(f"""
+        SELECT COUNT(*), SUM(mevcut_stok), SUM(kdvsiz_toplam), SUM(kdv_tutari),
+               SUM(toplam_maliyet), SUM(mevcut_stok < {DUSUK_STOK_ESIGI})
+        FROM ({query})
+    """, params).fetchone()
+
+    return StokRaporu(
+        satir_sayisi=row[0],
+        toplam_malzeme=row[1] or 0,
+        toplam_kdvsiz=row[2] or 0.0,
+        toplam_kdv=row[3] or 0.0,
+        toplam_maliyet=row[4] or 0.0,
+        dusuk_stok=row[5] or 0,
+    )
+
+
+def stok_sayfa_sinirlari(conn: sqlite3.Connection, filtre: StokFiltresi,
+                         sayfa_boyutu: int) -> List[Optional[tuple]]:
+    """Mevcut stok raporunun sayfa sınırlarını (bkz. stok_sayfasi) döndürür"""
+    query, params = _stok_sorgusu(filtre)
+    return _sayfa_sinirlari(conn.execute(f"SELECT malzeme_adi FROM ({query})", params), sayfa_boyutu)
+
+
+def stok_sayfasi(conn: sqlite3.Connection, filtre: StokFiltresi,
+                 sonra: Optional[tuple], adet: int) -> List[tuple]:
+    """Mevcut stok raporunda sonra anahtarından (malzeme adı) sonraki adet satırı döndürür"""
+    query, params = _stok_sorgusu(filtre, sonra=sonra)
+    return conn.execute(query + " LIMIT ?", params + [adet]).fetchall()
+
+
+def stok_satirlari(conn: sqlite3.Connection, filtre: StokFiltresi) -> Iterator[tuple]:
+    """Mevcut stok raporunun tüm satırlarını sırayla, belleğe almadan üretir"""
+    query, params = _stok_sorgusu(filtre)
+    return _parca_parca(conn.execute(query, params))
+
+
+@dataclass(frozen=True)
+class AylikFiltre:
+    """Aylık rapor filtre parametreleri"""
+    yil: int
+    kategori: str = ''
+    malzeme: str = ''
+
+    def anahtar(self) -> tuple:
+        """Aynı sonucu veren filtreler için aynı olan önbellek anahtarı"""
+        return (self.yil, self.kategori.strip(), self.malzeme.strip())
+
+    def etkilenir(self, degisiklik: Degisiklik) -> bool:
+        """Değişikliğin bu filtreyle gösterilen aylık raporu değiştirip değiştirmediği"""
+        if degisiklik.tur in ('tumu', 'kategori_sil'):
+            return True
+        if degisiklik.tur not in ('giris', 'cikis'):
+            return False
+        return ((degisiklik.tarih is None or degisiklik.tarih.year == self.yil)
+                and _kategori_eslesir(self.kategori, degisiklik.kategori)
+                and _metin_eslesir(self.malzeme, degisiklik.malzeme))
+
+
+@dataclass
+class AylikRapor:
+    """Aylık rapor satırları (ay adı + 6 tutar) ve yıllık toplamlar"""
+    satirlar: List[tuple] = field(default_factory=list)
+    yillik: Tuple[float, ...] = (0.0,) * 6
+
+
+AYLIK_SUTUNLARI = [
+    "Ay", "Girdi KDV'siz (₺)", "Girdi KDV Tutarı (₺)", "Girdi Toplam (₺)",
+    "Çıktı KDV'siz (₺)", "Çıktı KDV Tutarı (₺)", "Çıktı Toplam (₺)"
+]
+
+
+def aylik_rapor(conn: sqlite3.Connection, filtre: AylikFiltre) -> AylikRapor:
+    """Yılın 12 ayı için giriş/çıkış tutarlarını özet tablodan döndürür"""
+    # Tüm yıl, özet tablodan tek bir gruplanmış sorguyla okunur
+    query = """
+    SELECT
+        CAST(substr(ay, 6, 2) AS INTEGER) AS ay_no,
+        SUM(girdi_kdvsiz), SUM(girdi_kdv), SUM(girdi_toplam),
+        SUM(cikti_kdvsiz), SUM(cikti_kdv), SUM(cikti_toplam)
+    FROM aylik_ozet
+    WHERE ay BETWEEN ? AND ?
+    """
+    params = [f"{filtre.yil:04d}-01", f"{filtre.yil:04d}-12"]
+    kategori = filtre.kategori.strip()
+    malzeme = filtre.malzeme.strip()
+
+    if kategori:
+        query += " AND kategori_id = (SELECT id FROM kategoriler WHERE ad = ?)"
+        params.append(kategori)
+
+    if malzeme:
+        query += " AND malzeme_id IN (SELECT id FROM malzemeler WHERE ad LIKE ?)"
+        params.append(f'%{malzeme}%')
+
+    query += " GROUP BY ay"
+
+    aylik_sonuclar = {row[0]: [value or 0.0 for value in row[1:]]
+                      for row in conn.execute(query, params)}
+
+    rapor = AylikRapor()
+    yillik = [0.0] * 6
+    for ay_no, ay_adi in enumerate(AY_ADLARI, start=1):
+        tutarlar = aylik_sonuclar.get(ay_no, [0.0] * 6)
+        rapor.satirlar.append((ay_adi, *tutarlar))
+        yillik = [toplam + tutar for toplam, tutar in zip(yillik, tutarlar)]
+    rapor.yillik = tuple(yillik)
+    return rapor
+
+
+@dataclass
+class DashboardOzeti:
+    """Dashboard kartlarında gösterilen değerler"""
+    toplam_malzeme: int = 0
+    dusuk_stok: int = 0
+    toplam_maliyet: float = 0.0
+    kategori_sayisi: int = 0
+
+
+def dashboard_ozeti(conn: sqlite3.Connection) -> DashboardOzeti:
+    """Dashboard istatistiklerini tetikleyicilerle güncel tutulan sayaçlardan döndürür
+
+    Değerler Mevcut Stok raporunun "Tümü" toplamlarıyla aynıdır: eldeki adet,
+    stoğu eşiğin altında olan malzeme sayısı ve son birim maliyetle stok değeri.
+    """
+    row = conn.execute(
+        "SELECT toplam_adet, dusuk_stok, stok_degeri, (SELECT COUNT(*) FROM kategoriler) "
+        "FROM sayaclar WHERE id = 1"
+    ).fetchone()
+    if row is None:
+        return DashboardOzeti()
+    return DashboardOzeti(
+        toplam_malzeme=row[0],
+        dusuk_stok=row[1],
+        # Artımlı güncellemelerin kuruş altı artığı (ve -0.0) gösterilmez
+        toplam_maliyet=round(row[2], 2) or 0.0,
+        kategori_sayisi=row[3],
+    )
+
+
+# ---------------------------------------------------------------------------
+# Liste sorguları (combobox'lar ve otomatik tamamlama)
+# ---------------------------------------------------------------------------
+
+def kategoriler(conn: sqlite3.Connection) -> List[str]:
+    """Tanımlı kategorileri alfabetik sırayla döndürür"""
+    rows = conn.execute("SELECT ad FROM kategoriler ORDER BY ad").fetchall()
+    return [row[0] for row in rows]
+
+
+def malzeme_adlari(conn: sqlite3.Connection, arama: str = '') -> List[str]:
+    """Tanımlı malzeme adlarını (isteğe bağlı arama metniyle) döndürür"""
+    rows = conn.execute("SELECT ad FROM malzemeler WHERE ad LIKE ?", (f'%{arama}%',))
+    return [row[0] for row in rows]
+
+
+def tedarikciler(conn: sqlite3.Connection, arama: str = '') -> List[str]:
+    """Giriş kayıtlarındaki tedarikçileri (isteğe bağlı arama metniyle) döndürür"""
+    rows = conn.execute("SELECT DISTINCT tedarikci FROM malzeme_girisleri WHERE tedarikci LIKE ?", (f'%{arama}%',))
+    return [row[0] for row in rows]
+
+
+def stoktaki_malzemeler(conn: sqlite3.Connection) -> List[Tuple[str, int]]:
+    """Stoğu sıfırdan büyük malzemeleri (ad, adet) olarak döndürür"""
+    return conn.execute(
+        "SELECT m.ad, ms.toplam_adet FROM mevcut_stok ms JOIN malzemeler m ON m.id = ms.malzeme_id "
+        "WHERE ms.toplam_adet > 0 ORDER BY m.ad"
+    ).fetchall()
+
+
+def stok_miktari(conn: sqlite3.Connection, malzeme_adi: str) -> Optional[int]:
+    """Malzemenin mevcut stok miktarını döndürür (kayıt yoksa None)"""
+    result = conn.execute(
+        "SELECT ms.toplam_adet FROM malzemeler m JOIN mevcut_stok ms ON ms.malzeme_id = m.id WHERE m.ad=?",
+        (malzeme_adi,)
+    ).fetchone()
+    return result[0] if result else None
+
+
+# ---------------------------------------------------------------------------
+# Yazma işlemleri
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class GirisTutarlari:
+    """Bir giriş kaydının KDV hesap sonuçları"""
+    kdvsiz_toplam: float
+    kdv_tutari: float
+    kdv_dahil_toplam: float
+
+
+def kdv_hesapla(fiyat: float, adet: int, kdv_orani: float) -> GirisTutarlari:
+    """Birim fiyat, adet ve KDV oranından (0-1 arası) giriş tutarlarını hesaplar"""
+    kdvsiz_toplam = fiyat * adet
+    kdv_tutari = kdvsiz_toplam * kdv_orani
+    return GirisTutarlari(kdvsiz_toplam, kdv_tutari, kdvsiz_toplam + kdv_tutari)
+
+
+def _giris_dogrula(ad: str, fiyat: float, adet: int, kdv_orani: float) -> None:
+    """Giriş değerlerini denetler; geçersizse StokHatasi fırlatır"""
+    if not ad:
+        raise StokHatasi("Malzeme adı boş olamaz!")
+    if adet <= 0:
+        raise StokHatasi("Adet sıfırdan büyük olmalıdır!")
+    if fiyat < 0:
+        raise StokHatasi("Birim fiyat negatif olamaz!")
+    if not 0 <= kdv_orani <= 1:
+        raise StokHatasi("KDV oranı 0 ile 100 arasında olmalıdır!")
+
+
+def _giris_kaydi(malzeme_id: int, fiyat: float, adet: int, kdv_orani: float, tarih: date,
+                 kategori: Optional[str], tedarikci: Optional[str],
+                 tutarlar: GirisTutarlari) -> tuple:
+    """malzeme_girisleri INSERT parametrelerini oluşturur"""
+    return (malzeme_id, fiyat, adet, adet, kdv_orani, tutarlar.kdv_tutari, tutarlar.kdv_dahil_toplam,
+            tarih.strftime("%d.%m.%Y"), tarih.isoformat(), kategori or None, tedarikci or None)
+
+
+GIRIS_EKLE_SQL = (
+    "INSERT INTO malzeme_girisleri (malzeme_id, fiyat, adet, kalan_adet, kdv, kdv_tutari, toplam, tarih, tarih_iso, kategori_id, tedarikci) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, (SELECT id FROM kategoriler WHERE ad = ?), ?)"
+)
+
+# Girişte yazılan yeni kategori adı kategoriler tablosuna eklenir
+KATEGORI_EKLE_SQL = "INSERT OR IGNORE INTO kategoriler (ad) VALUES (?)"
+
+# Girişte yazılan yeni malzeme adı malzemeler tablosuna eklenir (kod otomatik atanır)
+MALZEME_EKLE_SQL = "INSERT OR IGNORE INTO malzemeler (ad) VALUES (?)"
+
+
+def _malzeme_kimligi(conn: sqlite3.Connection, ad: str) -> Optional[int]:
+    """Malzeme adının kimliğini döndürür (tanımlı değilse None)"""
+    row = conn.execute("SELECT id FROM malzemeler WHERE ad = ?", (ad,)).fetchone()
+    return row[0] if row else None
+
+
+def _malzeme_kimlikleri(conn: sqlite3.Connection, adlar: Iterable[str]) -> dict:
+    """Adları malzeme kimliklerine eşler; tanımlı olmayanları önce ekler (açık işlem içinde)"""
+    adlar = list(adlar)
+    conn.executemany(MALZEME_EKLE_SQL, [(ad,) for ad in adlar])
+    return {ad: _malzeme_kimligi(conn, ad) for ad in adlar}
+
+
+def _islemde(conn: sqlite3.Connection, uygula: Callable, yayin: Optional[DegisiklikYayini],
+             *args):
+    """Bir *_uygula fonksiyonunu kendi işleminde çalıştırır ve değişikliği yayınlar"""
+    with conn:
+        sonuc, degisiklik = uygula(conn, *args)
+    if yayin:
+        yayin.yayinla(degisiklik)
+    return sonuc
+
+
+def giris_uygula(conn: sqlite3.Connection, ad: str, fiyat: float, adet: int, kdv_orani: float,
+                 tarih: date, kategori: Optional[str] = None,
+                 tedarikci: Optional[str] = None) -> Tuple[GirisTutarlari, Degisiklik]:
+    """Girişi açık işlem içinde yazar (commit etmez)"""
+    _giris_dogrula(ad, fiyat, adet, kdv_orani)
+    tutarlar = kdv_hesapla(fiyat, adet, kdv_orani)
+
+    if kategori:
+        conn.execute(KATEGORI_EKLE_SQL, (kategori,))
+    malzeme_id = _malzeme_kimlikleri(conn, [ad])[ad]
+    conn.execute(GIRIS_EKLE_SQL, _giris_kaydi(malzeme_id, fiyat, adet, kdv_orani, tarih, kategori, tedarikci, tutarlar))
+
+    # Mevcut stok güncelleme (REPLACE silme tetikleyicisini çalıştırmaz; sayaçlar
+    # doğru kalsın diye önce boş satır eklenir, sonra güncellenir)
+    conn.execute("INSERT OR IGNORE INTO mevcut_stok (malzeme_id, toplam_adet) VALUES (?, 0)", (malzeme_id,))
+    conn.execute("UPDATE mevcut_stok SET toplam_adet = toplam_adet + ? WHERE malzeme_id=?", (adet, malzeme_id))
+
+    return tutarlar, Degisiklik('giris', malzeme=ad, kategori=kategori or None,
+                                tarih=tarih, tedarikci=tedarikci or None)
+
+
+def malzeme_ekle(conn: sqlite3.Connection, ad: str, fiyat: float, adet: int, kdv_orani: float,
+                 tarih: date, kategori: Optional[str] = None,
+                 tedarikci: Optional[str] = None,
+                 yayin: Optional[DegisiklikYayini] = None) -> GirisTutarlari:
+    """Yeni malzeme girişi kaydeder ve mevcut stoğu günceller"""
+    return _islemde(conn, giris_uygula, yayin, ad, fiyat, adet, kdv_orani, tarih, kategori, tedarikci)
+
+
+@dataclass
+class LotDagilimi:
+    """Bir çıkışın tek bir lottan tükettiği miktar ve maliyeti"""
+    giris_id: int
+    adet: int
+    kdvsiz_toplam: float
+    kdv_tutari: float
+    toplam_maliyet: float
+    kategori: Optional[str]
+
+
+def _fifo_dagit(conn: sqlite3.Connection, malzeme_id: int, miktar: int) -> List[LotDagilimi]:
+    """Miktarı malzemenin en eski kalan lotlarından düşer (açık işlem içinde çağrılır)
+    
+    Lotlar kısmi FIFO indeksinden sırayla okunur ve miktar karşılanınca durulur;
+    maliyet yalnızca dokunulan lot sayısı kadar iş yapar.
+    """
+    lotlar = conn.execute(
+        "SELECT id, kalan_adet, fiyat, kdv_tutari / adet, toplam / adet, "
+        "(SELECT ad FROM kategoriler WHERE id = kategori_id) "
+        "FROM malzeme_girisleri "
+        "WHERE malzeme_id = ? AND kalan_adet > 0 ORDER BY tarih_iso, id",
+        (malzeme_id,)
+    )
+
+    dagilimlar = []
+    kalan = miktar
+    for giris_id, lot_kalan, birim_kdvsiz, birim_kdv, birim_toplam, kategori in lotlar:
+        alinan = min(kalan, lot_kalan)
+        dagilimlar.append(LotDagilimi(giris_id, alinan, alinan * birim_kdvsiz,
+                                      alinan * birim_kdv, alinan * birim_toplam, kategori))
+        kalan -= alinan
+        if kalan == 0:
+            break
+
+    if kalan > 0:
+        raise StokHatasi(f"Lot kayıtları yetersiz! Eksik miktar: {kalan}")
+
+    conn.executemany(
+        "UPDATE malzeme_girisleri SET kalan_adet = kalan_adet - ? WHERE id = ?",
+        [(d.adet, d.giris_id) for d in dagilimlar]
+    )
+    return dagilimlar
+
+
+@dataclass(frozen=True)
+class GirisSatiri:
+    """Toplu girişte tek bir malzeme giriş satırı"""
+    ad: str
+    fiyat: float
+    adet: int
+    kdv_orani: float  # 0-1 arası
+    tarih: date
+    kategori: Optional[str] = None
+    tedarikci: Optional[str] = None
+
+
+@dataclass
+class TopluGirisSonucu:
+    """Toplu girişte eklenen satır sayısı ve atlanan satırların hataları"""
+    eklenen: int = 0
+    hatalar: List[Tuple[int, str]] = field(default_factory=list)  # (satır no, hata)
+
+
+# Toplu girişte tek executemany ile yazılan satır sayısı
+TOPLU_PARTI_BOYUTU = 5000
+
+
+def toplu_giris_uygula(conn: sqlite3.Connection, satirlar: Iterable[Tuple[int, GirisSatiri]],
+                       ilerleme: Optional[Callable[[int], None]] = None
+                       ) -> Tuple[TopluGirisSonucu, Optional[Degisiklik]]:
+    """(satır no, GirisSatiri) çiftlerini açık işlem içinde, partiler halinde yazar (commit etmez)
+    
+    Geçersiz satırlar atlanır ve sonuçta satır numarasıyla raporlanır. KDV,
+    malzeme_ekle ile aynı formülle hesaplanır. ilerleme(işlenen satır sayısı)
+    her partiden sonra çağrılır. Hiç satır eklenmediyse değişiklik None'dır.
+    """
+    sonuc = TopluGirisSonucu()
+    islenen = 0
+    parti = []
+
+    for satir_no, satir in satirlar:
+        islenen += 1
+        try:
+            _giris_dogrula(satir.ad, satir.fiyat, satir.adet, satir.kdv_orani)
+        except StokHatasi as e:
+            sonuc.hatalar.append((satir_no, str(e)))
+            continue
+
+        tutarlar = kdv_hesapla(satir.fiyat, satir.adet, satir.kdv_orani)
+        parti.append((satir, tutarlar))
+        if len(parti) >= TOPLU_PARTI_BOYUTU:
+            _giris_partisi_yaz(conn, parti)
+            sonuc.eklenen += len(parti)
+            parti = []
+            if ilerleme:
+                ilerleme(islenen)
+
+    if parti:
+        _giris_partisi_yaz(conn, parti)
+        sonuc.eklenen += len(parti)
+    if ilerleme:
+        ilerleme(islenen)
+
+    return sonuc, (Degisiklik('tumu') if sonuc.eklenen else None)
+
+
+def toplu_malzeme_ekle(conn: sqlite3.Connection, satirlar: Iterable[Tuple[int, GirisSatiri]],
+                       ilerleme: Optional[Callable[[int], None]] = None,
+                       yayin: Optional[DegisiklikYayini] = None) -> TopluGirisSonucu:
+    """(satır no, GirisSatiri) çiftlerini tek işlemde ekler (bkz. toplu_giris_uygula)
+    
+    Veritabanı hatasında işlemin tamamı geri alınır.
+    """
+    with conn:
+        sonuc, degisiklik = toplu_giris_uygula(conn, satirlar, ilerleme)
+    if yayin and degisiklik:
+        yayin.yayinla(degisiklik)
+    return sonuc
+
+
+def _giris_partisi_yaz(conn: sqlite3.Connection, parti: List[Tuple[GirisSatiri, GirisTutarlari]]) -> None:
+    """Bir parti girişi ve malzeme başına toplanmış stok artışlarını yazar"""
+    conn.executemany(KATEGORI_EKLE_SQL, [(k,) for k in {s.kategori for s, _ in parti if s.kategori}])
+    kimlikler = _malzeme_kimlikleri(conn, {s.ad for s, _ in parti})
+    conn.executemany(GIRIS_EKLE_SQL, [
+        _giris_kaydi(kimlikler[s.ad], s.fiyat, s.adet, s.kdv_orani, s.tarih, s.kategori, s.tedarikci, t)
+        for s, t in parti
+    ])
+
+    artislar = defaultdict(int)
+    for satir, _ in parti:
+        artislar[kimlikler[satir.ad]] += satir.adet
+    conn.executemany("INSERT OR IGNORE INTO mevcut_stok (malzeme_id, toplam_adet) VALUES (?, 0)",
+                     [(malzeme_id,) for malzeme_id in artislar])
+    conn.executemany("UPDATE mevcut_stok SET toplam_adet = toplam_adet + ? WHERE malzeme_id=?",
+                     [(adet, malzeme_id) for malzeme_id, adet in artislar.items()])
+
+
+def cikis_uygula(conn: sqlite3.Connection, malzeme_adi: str, miktar: int, personel: str,
+                 tarih: date, aciklama: Optional[str] = None) -> Tuple[int, Degisiklik]:
+    """Çıkışı açık işlem içinde stok kontrolüyle yazar (commit etmez)"""
+    if not malzeme_adi:
+        raise StokHatasi("Malzeme seçiniz!")
+    if not personel:
+        raise StokHatasi("Personel bilgisi giriniz!")
+    if miktar <= 0:
+        raise StokHatasi("Geçerli bir miktar giriniz!")
+
+    # Mevcut stok kontrolü
+    row = conn.execute(
+        "SELECT m.id, ms.toplam_adet FROM malzemeler m JOIN mevcut_stok ms ON ms.malzeme_id = m.id WHERE m.ad=?",
+        (malzeme_adi,)
+    ).fetchone()
+    mevcut = row[1] if row else None
+    if mevcut is None or mevcut < miktar:
+        raise StokHatasi(f"Yetersiz stok! Mevcut stok: {mevcut or 0}")
+
+    cikis_id, dagilimlar = _cikis_yaz(conn, row[0], miktar, personel, tarih, aciklama)
+    return cikis_id, Degisiklik('cikis', malzeme=malzeme_adi, kategori=dagilimlar[0].kategori, tarih=tarih)
+
+
+def malzeme_cikisi_yap(conn: sqlite3.Connection, malzeme_adi: str, miktar: int, personel: str,
+                       tarih: date, aciklama: Optional[str] = None,
+                       yayin: Optional[DegisiklikYayini] = None) -> int:
+    """Malzeme çıkışı kaydeder (FIFO) ve yeni çıkış kaydının id'sini döndürür"""
+    return _islemde(conn, cikis_uygula, yayin, malzeme_adi, miktar, personel, tarih, aciklama)
+
+
+def _cikis_yaz(conn: sqlite3.Connection, malzeme_id: int, miktar: int, personel: str,
+               tarih: date, aciklama: Optional[str]) -> Tuple[int, List[LotDagilimi]]:
+    """Stok kontrolü yapılmış bir çıkışı yazar (açık işlem içinde çağrılır)"""
+    # Miktarı en eski lotlardan düş (FIFO); gerekirse birden çok lot kullanılır
+    dagilimlar = _fifo_dagit(conn, malzeme_id, miktar)
+
+    # Çıkış kaydı, maliyeti tüketilen lotların toplamıdır; giris_id ilk lottur
+    cikis_id = conn.execute(
+        "INSERT INTO malzeme_cikislari (giris_id, malzeme_id, cikis_adedi, personel, aciklama, tarih, tarih_iso, kdvsiz_toplam, kdv_tutari, toplam_maliyet) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (dagilimlar[0].giris_id, malzeme_id, miktar, personel, aciklama or None,
+         tarih.strftime("%d.%m.%Y"), tarih.isoformat(),
+         sum(d.kdvsiz_toplam for d in dagilimlar),
+         sum(d.kdv_tutari for d in dagilimlar),
+         sum(d.toplam_maliyet for d in dagilimlar))
+    ).lastrowid
+
+    # Lot başına bir dağılım kaydı
+    conn.executemany(
+        "INSERT INTO cikis_dagilimlari (cikis_id, giris_id, adet) VALUES (?, ?, ?)",
+        [(cikis_id, d.giris_id, d.adet) for d in dagilimlar]
+    )
+
+    # Mevcut stok güncelleme
+    conn.execute(
+        "UPDATE mevcut_stok SET toplam_adet = toplam_adet - ? WHERE malzeme_id=?",
+        (miktar, malzeme_id)
+    )
+    return cikis_id, dagilimlar
+
+
+@dataclass(frozen=True)
+class CikisSatiri:
+    """Çıkış fişinde tek bir malzeme satırı"""
+    malzeme_adi: str
+    miktar: int
+    aciklama: Optional[str] = None
+
+
+def cikis_fisi_uygula(conn: sqlite3.Connection, personel: str, tarih: date,
+                      satirlar: List[CikisSatiri]) -> Tuple[List[int], Degisiklik]:
+    """Çıkış fişini açık işlem içinde yazar (commit etmez)"""
+    if not personel:
+        raise StokHatasi("Personel bilgisi giriniz!")
+    if not satirlar:
+        raise StokHatasi("Fişte malzeme satırı yok!")
+
+    istenen = defaultdict(int)
+    for satir in satirlar:
+        if not satir.malzeme_adi:
+            raise StokHatasi("Malzeme seçiniz!")
+        if satir.miktar <= 0:
+            raise StokHatasi(f"{satir.malzeme_adi}: Geçerli bir miktar giriniz!")
+        istenen[satir.malzeme_adi] += satir.miktar
+
+    # Fişteki tüm malzemelerin kimliği ve stoğu tek sorguda
+    kimlikler, mevcut = {}, {}
+    for ad, malzeme_id, adet in conn.execute(
+        f"SELECT m.ad, m.id, ms.toplam_adet FROM malzemeler m "
+        f"JOIN mevcut_stok ms ON ms.malzeme_id = m.id "
+        f"WHERE m.ad IN ({', '.join('?' * len(istenen))})",
+        list(istenen)
+    ):
+        kimlikler[ad], mevcut[ad] = malzeme_id, adet
+    eksikler = [f"{ad}: istenen {miktar}, mevcut {mevcut.get(ad, 0)}"
+                for ad, miktar in istenen.items() if mevcut.get(ad, 0) < miktar]
+    if eksikler:
+        raise StokHatasi("Yetersiz stok!\n" + "\n".join(eksikler))
+
+    cikis_idleri = []
+    kategoriler = set()
+    for satir in satirlar:
+        cikis_id, dagilimlar = _cikis_yaz(conn, kimlikler[satir.malzeme_adi], satir.miktar,
+                                          personel, tarih, satir.aciklama)
+        cikis_idleri.append(cikis_id)
+        kategoriler.update(d.kategori for d in dagilimlar)
+
+    # Tek malzeme/kategori ise filtreler daraltılabilir, yoksa None (bilinmiyor)
+    return cikis_idleri, Degisiklik(
+        'cikis',
+        malzeme=next(iter(istenen)) if len(istenen) == 1 else None,
+        kategori=next(iter(kategoriler)) if len(kategoriler) == 1 else None,
+        tarih=tarih,
+    )
+
+
+def cikis_fisi_yap(conn: sqlite3.Connection, personel: str, tarih: date,
+                   satirlar: List[CikisSatiri],
+                   yayin: Optional[DegisiklikYayini] = None) -> List[int]:
+    """Aynı personele ait çok satırlı çıkış fişini tek işlemde kaydeder
+    
+    Stok tek sorguyla, aynı malzemenin satırları toplanarak kontrol edilir; bir
+    satır bile karşılanamazsa hiçbir çıkış yazılmaz. Satırların çıkış id'lerini
+    döndürür ve tek bir değişiklik bildirimi yayınlar.
+    """
+    return _islemde(conn, cikis_fisi_uygula, yayin, personel, tarih, satirlar)
+
+
+def kategori_ekle_uygula(conn: sqlite3.Connection, kategori: str) -> Tuple[None, Degisiklik]:
+    """Kategoriyi açık işlem içinde ekler (commit etmez)"""
+    if not kategori:
+        raise StokHatasi("Kategori adı boş olamaz!")
+
+    if conn.execute(KATEGORI_EKLE_SQL, (kategori,)).rowcount == 0:
+        raise StokHatasi(f"'{kategori}' kategorisi zaten var!")
+    return None, Degisiklik('kategori_ekle', kategori=kategori)
+
+
+def kategori_ekle(conn: sqlite3.Connection, kategori: str,
+                  yayin: Optional[DegisiklikYayini] = None) -> None:
+    """Yeni kategori ekler"""
+    _islemde(conn, kategori_ekle_uygula, yayin, kategori)
+
+
+def kategori_sil_uygula(conn: sqlite3.Connection, kategori: str) -> Tuple[None, Degisiklik]:
+    """Kategoriyi açık işlem içinde siler (commit etmez)"""
+    row = conn.execute("SELECT id FROM kategoriler WHERE ad=?", (kategori,)).fetchone()
+    if row is None:
+        return None, Degisiklik('kategori_sil', kategori=kategori)
+    kategori_id = row[0]
+
+    # Kategorideki malzemeler kategorisiz kalır, özetler güncellenir
+    conn.execute("UPDATE malzeme_girisleri SET kategori_id=NULL WHERE kategori_id=?", (kategori_id,))
+    conn.execute("UPDATE malzemeler SET kategori_id=NULL WHERE kategori_id=?", (kategori_id,))
+    conn.execute("DELETE FROM kategoriler WHERE id=?", (kategori_id,))
+    rebuild_aylik_ozet(conn)
+    return None, Degisiklik('kategori_sil', kategori=kategori)
+
+
+def kategori_sil(conn: sqlite3.Connection, kategori: str,
+                 yayin: Optional[DegisiklikYayini] = None) -> None:
+    """Kategoriyi siler; bu kategorideki malzemeler kategorisiz kalır"""
+    _islemde(conn, kategori_sil_uygula, yayin, kategori)
+
+
+def verileri_temizle_uygula(conn: sqlite3.Connection) -> Tuple[None, Degisiklik]:
+    """Tüm hareket ve stok verilerini açık işlem içinde siler (commit etmez)"""
+    conn.execute("DELETE FROM malzeme_girisleri")
+    conn.execute("DELETE FROM cikis_dagilimlari")
+    conn.execute("DELETE FROM malzeme_cikislari")
+    conn.execute("DELETE FROM mevcut_stok")
+    conn.execute("DELETE FROM aylik_ozet")
+    conn.execute("DELETE FROM malzeme_ozet")
+    # Tetikleyicilerin artımlı toplamı kayan nokta artığı bırakabilir; sayaçlar sıfırlanır
+    rebuild_sayaclar(conn)
+    return None, Degisiklik('tumu')
+
+
+def verileri_temizle(conn: sqlite3.Connection,
+                     yayin: Optional[DegisiklikYayini] = None) -> None:
+    """Tüm hareket ve stok verilerini siler (tanımlı kategoriler ve malzemeler kalır)"""
+    _islemde(conn, verileri_temizle_uygula, yayin)
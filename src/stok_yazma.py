@@ -0,0 +1,247 @@
+"""Sıralı, toplu commit'li yazma kuyruğu
+
+Yazma komutları (giriş, çıkış, çıkış fişi, kategori; yerel kipte ayrıca
+toplu içe aktarma, verileri temizleme ve yedek günlüğünü kırpma) tek bir iş
+parçacığına kuyrukla iletilir ve kendi yazma bağlantısıyla uygulanır.
+Komutlar partiler halinde tek işlemde toplanır (group commit): parti en fazla
+parti_siniri komut içerir ve ilk komutundan en geç bekleme_ms sonra commit
+edilir. Her commit'in fsync maliyeti partideki tüm komutlara bölündüğü için
+saniyede kaydedilen hareket sayısı, tek tek commit'e göre kat kat artar.
+
+Sıralama garantileri:
+  * Komutlar gönderildikleri sırayla (kuyruk sırası) uygulanır; aynı
+    iş parçacığından gönderilen komutlar birbirinin sonucunu görür.
+  * Bir komutun Future'ı, komutu içeren işlem commit edilmeden tamamlanmaz;
+    aynı partideki sonuçlar ve değişiklik bildirimleri gönderim sırasıyla
+    verilir.
+  * Her komut kendi SAVEPOINT'inde çalışır: iş kuralı hatası (StokHatasi)
+    veren komut yalnızca kendini geri alır, partideki diğerleri yazılır.
+  * Commit başarısız olursa partideki hiçbir komut yazılmamıştır ve hepsinin
+    Future'ı aynı hatayla tamamlanır.
+
+Kalıcılık garantisi bağlantının synchronous ayarına (depolama profili) bağlıdır
+ve her sonuçta YazmaSonucu.kalicilik ile bildirilir:
+  * 'disk'            (FULL)   commit döndüğünde kayıt diske yazılmıştır.
+  * 'wal'             (NORMAL) uygulama çökmesinde kaybolmaz; elektrik
+                      kesintisinde son checkpoint'ten sonraki commit'ler
+                      kaybolabilir, veritabanı bozulmaz.
+  * 'isletim_sistemi' (OFF)    diske yazma işletim sistemine bırakılmıştır.
+esitle() önceki tüm komutları checkpoint ile diske indirir ve 'disk' döndürür;
+gün sonu gibi kesin kalıcılık gereken noktalarda çağrılır.
+"""
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Optional
+
+import stok_veri
+import stok_yedek
+from stok_baglanti import BaglantiYoneticisi, pragmalari_uygula
+from stok_izleme import IzlenenBaglanti
+
+# Komut adı -> açık işlem içinde çalışan, (sonuç, Degisiklik) döndüren fonksiyon
+KOMUTLAR = {
+    'giris': stok_veri.giris_uygula,
+    'cikis': stok_veri.cikis_uygula,
+    'cikis_fisi': stok_veri.cikis_fisi_uygula,
+    'kategori_ekle': stok_veri.kategori_ekle_uygula,
+    'kategori_sil': stok_veri.kategori_sil_uygula,
+}
+
+# Yalnızca uygulamanın kendi kuyruğuna gönderilebilen komutlar; parametreleri
+# (satır üreteci, geri çağırma) JSON'a çevrilemez ve sunucuya açılmazlar
+YEREL_KOMUTLAR = {
+    'toplu_giris': stok_veri.toplu_giris_uygula,
+    'verileri_temizle': stok_veri.verileri_temizle_uygula,
+    'gunlugu_kirp': stok_yedek.gunlugu_kirp_uygula,
+}
+
+# synchronous ayarı -> commit edilen kaydın kalıcılık düzeyi
+KALICILIK = {'FULL': 'disk', 'EXTRA': 'disk', 'NORMAL': 'wal', 'OFF': 'isletim_sistemi'}
+
+# Varsayılan parti sınırları: en fazla komut ve ilk komuttan sonra en fazla bekleme
+PARTI_SINIRI = 100
+PARTI_SURESI_MS = 2
+
+# Kuyrukta esitle() için kullanılan iç komut
+_ESITLE = '__esitle__'
+
+
+@dataclass(frozen=True)
+class YazmaSonucu:
+    """Commit edilmiş bir komutun sonucu ve kalıcılık bilgisi"""
+    deger: object                   # Komut fonksiyonunun döndürdüğü değer
+    degisiklik: Optional[stok_veri.Degisiklik]
+    kalicilik: str                  # 'disk', 'wal' veya 'isletim_sistemi'
+    parti: int                      # Komutu içeren commit'in sıra numarası
+    parti_boyutu: int               # Aynı commit'teki komut sayısı
+
+
+@dataclass
+class _Komut:
+    ad: str
+    parametreler: dict
+    sonuc: Future = field(default_factory=Future)
+
+
+class YazmaKuyrugu:
+    """Yazma komutlarını tek iş parçacığında sırayla ve toplu commit ile uygular
+
+    gonder() herhangi bir iş parçacığından çağrılabilir. yayin verilirse
+    başarılı komutların değişiklikleri commit'ten sonra yazma iş parçacığında
+    iletilir; Tk gibi tek iş parçacıklı arayüzler yayin vermeyip değişikliği
+    YazmaSonucu.degisiklik ile kendi iş parçacıklarında yayınlar.
+    """
+
+    def __init__(self, baglantilar: BaglantiYoneticisi,
+                 yayin: Optional[stok_veri.DegisiklikYayini] = None,
+                 parti_siniri: int = PARTI_SINIRI, bekleme_ms: float = PARTI_SURESI_MS):
+        self.baglantilar = baglantilar
+        self.yayin = yayin
+        self.parti_siniri = max(1, parti_siniri)
+        self.bekleme_ms = max(0.0, bekleme_ms)
+        self._kuyruk = queue.Queue()
+        self._kilit = threading.Lock()
+        self._istatistik = {'komut': 0, 'parti': 0, 'commit_ms': 0.0}
+        self._profil = None
+        self._is_parcacigi = threading.Thread(target=self._dongu, name="yazma-kuyrugu", daemon=True)
+        self._is_parcacigi.start()
+
+    def gonder(self, komut: str, **parametreler) -> Future:
+        """Komutu kuyruğa ekler; commit'ten sonra YazmaSonucu (veya hatayı) verecek Future döndürür"""
+        if komut not in KOMUTLAR and komut not in YEREL_KOMUTLAR:
+            raise ValueError(f"Bilinmeyen yazma komutu: {komut}")
+        is_ = _Komut(komut, parametreler)
+        self._kuyruk.put(is_)
+        return is_.sonuc
+
+    def calistir(self, komut: str, **parametreler) -> YazmaSonucu:
+        """Komutu gönderir ve commit edilene kadar bekler"""
+        return self.gonder(komut, **parametreler).result()
+
+    def esitle(self) -> Future:
+        """Önceki tüm komutlar diske indiğinde 'disk' ile tamamlanan Future döndürür"""
+        is_ = _Komut(_ESITLE, {})
+        self._kuyruk.put(is_)
+        return is_.sonuc
+
+    def istatistik(self) -> dict:
+        """Yazılan komut ve parti sayıları, ortalama parti boyu ve commit süresi"""
+        with self._kilit:
+            ist = dict(self._istatistik)
+        ist['ortalama_parti'] = ist['komut'] / ist['parti'] if ist['parti'] else 0.0
+        ist['ortalama_commit_ms'] = ist['commit_ms'] / ist['parti'] if ist['parti'] else 0.0
+        return ist
+
+    def kapat(self) -> None:
+        """Kuyruktaki komutları yazar ve iş parçacığını durdurur"""
+        self._kuyruk.put(None)
+        self._is_parcacigi.join()
+
+    def _dongu(self) -> None:
+        # Yazma yolundaki ifadeler de yavaş sorgu günlüğüne ve istatistiklere girer
+        conn = sqlite3.connect(self.baglantilar.db_path, timeout=30, factory=IzlenenBaglanti)
+        conn.izleyici = self.baglantilar.izleyici
+        conn.execute("PRAGMA journal_mode = WAL")
+        try:
+            dur = False
+            while not dur:
+                is_ = self._kuyruk.get()
+                if is_ is None:
+                    return
+
+                # Parti, sınır dolana veya ilk komuttan bekleme_ms geçene kadar büyür
+                parti = [is_]
+                son_an = time.perf_counter() + self.bekleme_ms / 1000
+                while len(parti) < self.parti_siniri and is_.ad != _ESITLE:
+                    kalan = son_an - time.perf_counter()
+                    try:
+                        is_ = self._kuyruk.get(timeout=kalan) if kalan > 0 else self._kuyruk.get_nowait()
+                    except queue.Empty:
+                        break
+                    if is_ is None:
+                        dur = True
+                        break
+                    parti.append(is_)
+
+                self._profil_uygula(conn)
+                if parti[-1].ad == _ESITLE:
+                    esitleme = parti.pop()
+                    if parti:
+                        self._parti_yaz(conn, parti)
+                    self._esitle(conn, esitleme)
+                else:
+                    self._parti_yaz(conn, parti)
+        finally:
+            conn.close()
+
+    def _profil_uygula(self, conn: sqlite3.Connection) -> None:
+        """Depolama profili değiştiyse yazma bağlantısına uygular"""
+        profil = self.baglantilar.profil
+        if profil is not self._profil:
+            pragmalari_uygula(conn, profil)
+            self._profil = profil
+
+    def _parti_yaz(self, conn: sqlite3.Connection, parti) -> None:
+        """Partiyi tek işlemde yazar; sonuçları commit'ten sonra sırayla bildirir"""
+        sonuclar = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for is_ in parti:
+                conn.execute("SAVEPOINT komut")
+                try:
+                    uygula = KOMUTLAR.get(is_.ad) or YEREL_KOMUTLAR[is_.ad]
+                    sonuc = uygula(conn, **is_.parametreler)
+                except Exception as e:
+                    conn.execute("ROLLBACK TO komut")
+                    conn.execute("RELEASE komut")
+                    sonuclar.append((is_, None, e))
+                else:
+                    conn.execute("RELEASE komut")
+                    sonuclar.append((is_, sonuc, None))
+            baslangic = time.perf_counter()
+            conn.commit()
+            commit_ms = (time.perf_counter() - baslangic) * 1000
+        except Exception as e:
+            # Commit (veya işlem başlatma) başarısız: partinin hiçbir komutu yazılmadı
+            if conn.in_transaction:
+                conn.rollback()
+            for is_ in parti:
+                is_.sonuc.set_exception(e)
+            return
+
+        with self._kilit:
+            self._istatistik['komut'] += len(parti)
+            self._istatistik['parti'] += 1
+            self._istatistik['commit_ms'] += commit_ms
+            parti_no = self._istatistik['parti']
+        kalicilik = KALICILIK.get(self._profil.synchronous, 'wal')
+
+        for is_, sonuc, hata in sonuclar:
+            if hata is not None:
+                is_.sonuc.set_exception(hata)
+                continue
+            deger, degisiklik = sonuc
+            is_.sonuc.set_result(YazmaSonucu(deger, degisiklik, kalicilik, parti_no, len(parti)))
+            if self.yayin and degisiklik:
+                self.yayin.yayinla(degisiklik)
+
+    def _esitle(self, conn: sqlite3.Connection, is_: _Komut) -> None:
+        """WAL'ı checkpoint ile veritabanına aktarır; OFF profilinde bile diske zorlar"""
+        try:
+            conn.execute("PRAGMA synchronous = FULL")
+            try:
+                mesgul = conn.execute("PRAGMA wal_checkpoint(FULL)").fetchone()[0]
+            finally:
+                conn.execute(f"PRAGMA synchronous = {self._profil.synchronous}")
+            if mesgul:
+                raise sqlite3.OperationalError("Checkpoint okuyucular nedeniyle tamamlanamadı")
+        except Exception as e:
+            is_.sonuc.set_exception(e)
+            return
+        with self._kilit:
+            parti_no = self._istatistik['parti']
+        is_.sonuc.set_result(YazmaSonucu(None, None, 'disk', parti_no, 0))
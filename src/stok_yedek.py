@@ -0,0 +1,386 @@
+"""Veritabanı yedekleme
+
+Yedekler sqlite3 çevrimiçi yedekleme (backup) API'si ile alınır: sayfalar
+küçük adımlarla kopyalanır ve adımlar arasında kilit bırakılır, böylece
+yedekleme sürerken yazma işlemleri devam edebilir. Kopya yarım işlem
+içeremez; bitince bütünlük denetiminden geçmeden yedek sayılmaz.
+
+Her yedek tam kopya değildir: bir zincir gzip'li tam yedekle başlar, sonraki
+yedekler yalnızca değişiklik günlüğüne (degisiklik_gunlugu) göre son
+yedekten beri değişen satırları lzma ile sıkıştırıp yazar (fark yedeği).
+Zincir belli uzunluğa ulaşınca yeni tam yedek alınır ve eski zincirler
+silinir. Herhangi bir yedek anına, zincirin tam yedeği açılıp farklar sırayla
+uygulanarak dönülür. Yedeklerin listesi yedek klasöründeki katalog.json'dadır.
+"""
+import gzip
+import json
+import lzma
+import os
+import shutil
+import sqlite3
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+import stok_veri
+from stok_veri import StokHatasi
+
+# Her adımda kopyalanan sayfa sayısı (varsayılan 4 KB sayfayla ~1 MB)
+YEDEK_ADIM_SAYFASI = 256
+
+# Adımlar arasında yazıcılara bırakılan süre (saniye)
+YEDEK_ADIM_BEKLEMESI = 0.002
+
+# Başka bağlantıdan yazma geldikçe adımlı kopya baştan başlar; bu kadar
+# yeniden başlamadan sonra kalan kopya tek adımda (okuma kilidiyle) bitirilir
+YEDEK_YENIDEN_BASLAMA_SINIRI = 3
+
+
+class _YenidenBasladi(Exception):
+    """Adımlı kopya çok kez baştan başladı"""
+
+
+def yedek_al(conn: sqlite3.Connection, hedef_yol: str,
+             ilerleme: Optional[Callable[[int, int], None]] = None) -> None:
+    """conn veritabanının tutarlı bir kopyasını hedef_yol'a yazar
+
+    Kopya önce geçici adla oluşturulur ve PRAGMA quick_check ile denetlenir;
+    yalnızca sağlam yedek hedef adına taşınır. ilerleme(kopyalanan, toplam)
+    sayfa sayılarıyla her adımdan sonra çağrılır. Arka plan iş parçacığında
+    çalıştırılmak üzere tasarlanmıştır.
+
+    Kopya sırasında başka bir bağlantı yazarsa SQLite kopyayı baştan başlatır.
+    Sık yazmada bitmeyen bir döngüye girmemek için YEDEK_YENIDEN_BASLAMA_SINIRI
+    aşılınca kopya tek adımda tamamlanır; yazıcılar bu kısa süre boyunca
+    meşgul zaman aşımı (busy timeout) içinde bekler.
+    """
+    gecici = hedef_yol + ".yaziliyor"
+    if os.path.exists(gecici):
+        os.remove(gecici)
+
+    son_kalan = None
+    yeniden = 0
+
+    def adim(durum, kalan, toplam):
+        nonlocal son_kalan, yeniden
+        if son_kalan is not None and kalan > son_kalan:
+            yeniden += 1
+            if yeniden > YEDEK_YENIDEN_BASLAMA_SINIRI:
+                raise _YenidenBasladi()
+        son_kalan = kalan
+        if ilerleme:
+            ilerleme(toplam - kalan, toplam)
+        # Adımlar arasında okuma kilidi bırakılmıştır; yazıcılara fırsat ver
+        time.sleep(YEDEK_ADIM_BEKLEMESI)
+
+    hedef = sqlite3.connect(gecici)
+    try:
+        try:
+            conn.backup(hedef, pages=YEDEK_ADIM_SAYFASI, progress=adim)
+        except _YenidenBasladi:
+            conn.backup(hedef)
+            if ilerleme:
+                ilerleme(1, 1)
+        sonuc = hedef.execute("PRAGMA quick_check").fetchone()[0]
+        if sonuc != 'ok':
+            raise StokHatasi(f"Yedek bütünlük denetiminden geçemedi: {sonuc}")
+    except BaseException:
+        hedef.close()
+        os.remove(gecici)
+        raise
+    hedef.close()
+    os.replace(gecici, hedef_yol)
+
+
+# Yedek klasöründeki yedek listesi
+KATALOG_DOSYASI = "katalog.json"
+
+# Bir tam yedeğe bağlı en fazla fark yedeği; aşılınca yeni tam yedek alınır
+FARK_SINIRI = 13
+
+# Saklanan tam yedek zinciri sayısı (tam yedek + farkları)
+SAKLANAN_ZINCIR = 4
+
+# Bundan çok satır değiştiyse fark yerine tam yedek alınır
+FARK_DEGISIKLIK_SINIRI = 200000
+
+# Başlığında anahtar sütunları olmayan (sürüm 6) fark dosyalarının tablo anahtarları
+SURUM6_ANAHTARLARI = {
+    "malzeme_girisleri": "id",
+    "malzeme_cikislari": "id",
+    "cikis_dagilimlari": "cikis_id",
+    "mevcut_stok": "malzeme_adi",
+    "malzeme_ozet": "malzeme_adi",
+}
+
+
+@dataclass
+class YedekKaydi:
+    """Katalogdaki bir yedek (tam veya fark)"""
+    dosya: str
+    tur: str            # 'tam' veya 'fark'
+    zaman: str          # ISO zaman damgası
+    son: int            # Yedeğin kapsadığı son günlük sırası
+    surum: int          # Yedeğin şema sürümü
+    boyut: int = 0
+    degisiklik: int = 0  # Fark yedeğindeki satır anahtarı sayısı
+
+
+def _katalog_oku(dizin: str) -> dict:
+    yol = os.path.join(dizin, KATALOG_DOSYASI)
+    if not os.path.exists(yol):
+        return {'zincir_kapali': False, 'yedekler': []}
+    with open(yol, encoding='utf-8') as f:
+        katalog = json.load(f)
+    katalog['yedekler'] = [YedekKaydi(**kayit) for kayit in katalog['yedekler']]
+    return katalog
+
+
+def _katalog_yaz(dizin: str, katalog: dict) -> None:
+    yol = os.path.join(dizin, KATALOG_DOSYASI)
+    with open(yol + ".yaziliyor", 'w', encoding='utf-8') as f:
+        json.dump({'zincir_kapali': katalog['zincir_kapali'],
+                   'yedekler': [asdict(kayit) for kayit in katalog['yedekler']]},
+                  f, ensure_ascii=False, indent=1)
+    os.replace(yol + ".yaziliyor", yol)
+
+
+def _gunluk_sirasi(conn: sqlite3.Connection) -> int:
+    """Değişiklik günlüğüne verilen son sıra numarası (silinen kayıtlar dahil)"""
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'degisiklik_gunlugu'").fetchone()
+    return row[0] if row else 0
+
+
+def yedekle(conn: sqlite3.Connection, dizin: str,
+            ilerleme: Optional[Callable[[int, int], None]] = None,
+            tam: bool = False) -> YedekKaydi:
+    """Gerekirse tam, değilse fark yedeği alır ve kataloğa ekler
+
+    Yeni zincir, sürüm değişikliği, uzun zincir, geri yükleme sonrası veya çok
+    sayıda değişiklik tam yedek gerektirir. Başarılı yedekten sonra çağıran,
+    yazma bağlantısında gunlugu_kirp(conn, kayit.son) ile günlüğü kısaltmalıdır.
+    """
+    os.makedirs(dizin, exist_ok=True)
+    katalog = _katalog_oku(dizin)
+    yedekler = katalog['yedekler']
+    son = yedekler[-1] if yedekler else None
+    zincir_uzunlugu = 0
+    for kayit in reversed(yedekler):
+        if kayit.tur == 'tam':
+            break
+        zincir_uzunlugu += 1
+
+    if not (tam or son is None or katalog['zincir_kapali']
+            or son.surum != stok_veri.SEMA_SURUMU
+            or zincir_uzunlugu >= FARK_SINIRI
+            or _gunluk_sirasi(conn) < son.son):
+        kayit = _fark_yedegi(conn, dizin, son.son)
+    else:
+        kayit = None
+    if kayit is None:
+        kayit = _tam_yedek(conn, dizin, ilerleme)
+
+    yedekler.append(kayit)
+    katalog['zincir_kapali'] = False
+    _eski_zincirleri_sil(dizin, katalog)
+    _katalog_yaz(dizin, katalog)
+    return kayit
+
+
+def _zaman_damgasi() -> str:
+    return datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+
+
+def _tam_yedek(conn: sqlite3.Connection, dizin: str,
+               ilerleme: Optional[Callable[[int, int], None]]) -> YedekKaydi:
+    """Tutarlı kopyayı alır ve gzip ile sıkıştırır"""
+    dosya = f"stok_tam_{_zaman_damgasi()}.db.gz"
+    gecici = os.path.join(dizin, dosya[:-3])
+    yedek_al(conn, gecici, ilerleme)
+    try:
+        # Kapsanan günlük sırası kopyanın kendisinden okunur, böylece tam tutarlıdır
+        kopya = sqlite3.connect(gecici)
+        try:
+            son = _gunluk_sirasi(kopya)
+            surum = kopya.execute("PRAGMA user_version").fetchone()[0]
+        finally:
+            kopya.close()
+
+        hedef = os.path.join(dizin, dosya)
+        with open(gecici, 'rb') as kaynak, gzip.open(hedef + ".yaziliyor", 'wb', compresslevel=6) as f:
+            shutil.copyfileobj(kaynak, f, 1 << 20)
+        os.replace(hedef + ".yaziliyor", hedef)
+    finally:
+        os.remove(gecici)
+
+    return YedekKaydi(dosya, 'tam', datetime.now().isoformat(timespec='seconds'),
+                      son, surum, os.path.getsize(hedef))
+
+
+def _fark_yedegi(conn: sqlite3.Connection, dizin: str, onceki: int) -> Optional[YedekKaydi]:
+    """Önceki yedekten beri değişen satırları yazar; değişiklik çoksa None döner"""
+    dosya = f"stok_fark_{_zaman_damgasi()}.jsonl.xz"
+    hedef = os.path.join(dizin, dosya)
+
+    # Günlük ve satırlar tek okuma işleminde okunur; yazmalar arada karışmaz
+    conn.execute("BEGIN")
+    try:
+        son = _gunluk_sirasi(conn)
+        anahtarlar = []
+        for tablo in stok_veri.GUNLUKLU_TABLOLAR:
+            anahtarlar += conn.execute(
+                "SELECT DISTINCT tablo, anahtar FROM degisiklik_gunlugu "
+                "WHERE tablo = ? AND seq > ? AND seq <= ?",
+                (tablo, onceki, son)
+            ).fetchall()
+            if len(anahtarlar) > FARK_DEGISIKLIK_SINIRI:
+                return None
+
+        sutunlar = {
+            tablo: [row[1] for row in conn.execute(f"PRAGMA table_info({tablo})")]
+            for tablo in stok_veri.GUNLUKLU_TABLOLAR
+        }
+        baslik = {'tur': 'fark', 'onceki': onceki, 'son': son,
+                  'surum': stok_veri.SEMA_SURUMU, 'sutunlar': sutunlar,
+                  'anahtarlar': stok_veri.GUNLUKLU_TABLOLAR}
+        with lzma.open(hedef + ".yaziliyor", 'wt', encoding='utf-8') as f:
+            f.write(json.dumps(baslik, ensure_ascii=False) + "\n")
+            for tablo, anahtar in anahtarlar:
+                anahtar_sutunu = stok_veri.GUNLUKLU_TABLOLAR[tablo]
+                satirlar = conn.execute(
+                    f"SELECT {', '.join(sutunlar[tablo])} FROM {tablo} WHERE {anahtar_sutunu} = ?",
+                    (anahtar,)
+                ).fetchall()
+                # Boş satır listesi: kayıt silinmiş
+                f.write(json.dumps([tablo, anahtar, satirlar], ensure_ascii=False) + "\n")
+        os.replace(hedef + ".yaziliyor", hedef)
+    finally:
+        conn.rollback()
+
+    return YedekKaydi(dosya, 'fark', datetime.now().isoformat(timespec='seconds'),
+                      son, stok_veri.SEMA_SURUMU, os.path.getsize(hedef), len(anahtarlar))
+
+
+def _eski_zincirleri_sil(dizin: str, katalog: dict) -> None:
+    """SAKLANAN_ZINCIR sayısından eski zincirlerin dosyalarını siler"""
+    yedekler = katalog['yedekler']
+    tamlar = [i for i, kayit in enumerate(yedekler) if kayit.tur == 'tam']
+    if len(tamlar) <= SAKLANAN_ZINCIR:
+        return
+    sinir = tamlar[-SAKLANAN_ZINCIR]
+    for kayit in yedekler[:sinir]:
+        yol = os.path.join(dizin, kayit.dosya)
+        if os.path.exists(yol):
+            os.remove(yol)
+    del yedekler[:sinir]
+
+
+def gunlugu_kirp_uygula(conn: sqlite3.Connection, son: int) -> Tuple[None, None]:
+    """Yedeğe alınmış günlük kayıtlarını açık işlem içinde siler (commit etmez)
+
+    Görünen veriyi değiştirmediği için değişiklik bildirimi yoktur.
+    """
+    conn.execute("DELETE FROM degisiklik_gunlugu WHERE seq <= ?", (son,))
+    return None, None
+
+
+def gunlugu_kirp(conn: sqlite3.Connection, son: int) -> None:
+    """Yedeğe alınmış günlük kayıtlarını siler (yazma bağlantısında çağrılır)"""
+    with conn:
+        gunlugu_kirp_uygula(conn, son)
+
+
+def geri_yukleme_noktalari(dizin: str) -> List[YedekKaydi]:
+    """Dönülebilecek yedek anlarını yeniden eskiye döndürür"""
+    return list(reversed(_katalog_oku(dizin)['yedekler']))
+
+
+def geri_yukleme_dosyasi_hazirla(dizin: str, kayit: YedekKaydi, hedef_yol: str) -> None:
+    """Seçilen yedek anındaki veritabanını hedef_yol'a kurar
+
+    Zincirin tam yedeği açılır, kayda kadar olan farklar sırayla uygulanır ve
+    türetilmiş özet tablolar yeniden hesaplanır. Canlı veritabanına dokunmaz;
+    arka plan iş parçacığında çalıştırılabilir.
+    """
+    yedekler = _katalog_oku(dizin)['yedekler']
+    sira = next((i for i, k in enumerate(yedekler) if k.dosya == kayit.dosya), None)
+    if sira is None:
+        raise StokHatasi("Yedek katalogda bulunamadı!")
+    bas = sira
+    while yedekler[bas].tur != 'tam':
+        bas -= 1
+        if bas < 0:
+            raise StokHatasi("Yedeğin bağlı olduğu tam yedek bulunamadı!")
+
+    for k in yedekler[bas:sira + 1]:
+        if not os.path.exists(os.path.join(dizin, k.dosya)):
+            raise StokHatasi(f"Yedek dosyası eksik: {k.dosya}")
+
+    with gzip.open(os.path.join(dizin, yedekler[bas].dosya), 'rb') as kaynak, open(hedef_yol, 'wb') as f:
+        shutil.copyfileobj(kaynak, f, 1 << 20)
+
+    conn = sqlite3.connect(hedef_yol)
+    try:
+        # Farklar satırların son halini taşır; tetikleyiciler özetleri ikinci kez
+        # değiştirmesin diye uygulama süresince kaldırılır
+        tetikleyiciler = conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger'").fetchall()
+        with conn:
+            for ad, _ in tetikleyiciler:
+                conn.execute(f"DROP TRIGGER {ad}")
+        for fark in yedekler[bas + 1:sira + 1]:
+            _fark_uygula(conn, os.path.join(dizin, fark.dosya))
+        with conn:
+            for _, sql in tetikleyiciler:
+                conn.execute(sql)
+
+        # Eski sürüm zincirler güncel şemaya yükseltilir, toplam tutan özetler
+        # baştan hesaplanır (malzeme_ozet farklarla birlikte gelir)
+        stok_veri.migrate_database(conn)
+        with conn:
+            stok_veri.rebuild_aylik_ozet(conn)
+            stok_veri.rebuild_sayaclar(conn)
+        sonuc = conn.execute("PRAGMA quick_check").fetchone()[0]
+        if sonuc != 'ok':
+            raise StokHatasi(f"Geri yüklenen veritabanı bütünlük denetiminden geçemedi: {sonuc}")
+    finally:
+        conn.close()
+
+
+def _fark_uygula(conn: sqlite3.Connection, yol: str) -> None:
+    """Bir fark dosyasındaki satır durumlarını tek işlemde uygular"""
+    with lzma.open(yol, 'rt', encoding='utf-8') as f, conn:
+        baslik = json.loads(f.readline())
+        sutunlar = baslik['sutunlar']
+        anahtarlar = baslik.get('anahtarlar', SURUM6_ANAHTARLARI)
+        for satir in f:
+            tablo, anahtar, satirlar = json.loads(satir)
+            conn.execute(f"DELETE FROM {tablo} WHERE {anahtarlar[tablo]} = ?", (anahtar,))
+            if satirlar:
+                conn.executemany(
+                    f"INSERT INTO {tablo} ({', '.join(sutunlar[tablo])}) "
+                    f"VALUES ({', '.join('?' * len(sutunlar[tablo]))})",
+                    satirlar
+                )
+
+
+def veritabanina_yukle(conn: sqlite3.Connection, kaynak_yol: str, dizin: str) -> None:
+    """kaynak_yol'daki veritabanını açık bağlantının veritabanına kopyalar
+
+    Dosya değiştirilmediği için açık bağlantılar geçerli kalır. Eski sürüm
+    yedekler güncel şemaya yükseltilir. Geri yüklemeden sonraki ilk yedek tam
+    yedek olur.
+    """
+    kaynak = sqlite3.connect(kaynak_yol)
+    try:
+        kaynak.backup(conn)
+    finally:
+        kaynak.close()
+    stok_veri.migrate_database(conn)
+
+    # Geri yüklenen günlük sıraları zincirle uyuşmaz; yeni zincir başlatılır
+    with conn:
+        conn.execute("DELETE FROM degisiklik_gunlugu")
+    katalog = _katalog_oku(dizin)
+    katalog['zincir_kapali'] = True
+    _katalog_yaz(dizin, katalog)
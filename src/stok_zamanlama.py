@@ -0,0 +1,218 @@
+"""Arayüz zamanlaması: kullanıcı işlemlerinin izleri ve olay döngüsü gecikmesi
+
+Her kullanıcı işlemi (Kaydet, Çıkış Yap, Filtrele, Güncelle, sekme geçişi)
+bir kök aralıkla (span) izlenir. İşlemin başlattığı arka plan sorgusu
+('sorgu'), sonucunun arayüze işlenmesi ('cizim'), yazma kuyruğunda commit'e
+kadar geçen süre ('commit') ve açılan mesaj kutuları ('mesaj') aynı işlemin
+alt aralıkları olarak kaydedilir. Arka plan işine geçerken bağlam baglam()
+ile alınır, sonuç Tk iş parçacığına dönünce devam() ile sürdürülür.
+
+DonguNabzi, Tk olay döngüsüne düzenli aralıkla after() atımı koyar; atım
+beklenenden geç gelirse aradaki süre 'donma' aralığı olarak kaydedilir.
+Donmalar işlemlerle zaman üzerinden eşleştirilir.
+
+İzler Chrome izleme (trace event) biçiminde JSON dosyasına yazılır; dosya
+uygulamanın zaman çizelgesinde veya chrome://tracing / Perfetto'da açılabilir.
+"""
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+# Bellekte tutulan en fazla aralık; dolunca en eskiler atılır
+IZ_KAPASITESI = 10000
+
+# Olay döngüsü atım aralığı ve donma sayılan en kısa gecikme (ms)
+NABIZ_ARALIGI = 100
+DONMA_ESIGI = 100.0
+
+# İzlenen mesaj kutusu fonksiyonları (tkinter.messagebox)
+MESAJ_KUTULARI = ("showinfo", "showwarning", "showerror", "askyesno", "askokcancel",
+                  "askquestion", "askyesnocancel", "askretrycancel")
+
+# Arka plan işine taşınan bağlam: (kök işlem kimliği, üst aralık kimliği)
+Baglam = Tuple[int, int]
+
+
+@dataclass(frozen=True)
+class Aralik:
+    """Tamamlanmış bir zaman aralığı"""
+    kimlik: int
+    ad: str
+    tur: str            # 'islem', 'sorgu', 'cizim', 'commit', 'mesaj' veya 'donma'
+    baslangic: float    # İzci başlangıcından beri saniye
+    sure_ms: float
+    islem: int          # Kök işlemin kimliği (0: hiçbir işleme bağlı değil)
+    ust: int            # Üst aralığın kimliği (0: kök)
+    is_parcacigi: str
+
+    @property
+    def bitis(self) -> float:
+        return self.baslangic + self.sure_ms / 1000
+
+
+class Izci:
+    """İşlem aralıklarını toplar
+
+    islem(), alt() ve devam() yalnızca Tk iş parçacığında çağrılır; açık
+    aralıklar bir yığında tutulur. kaydet_araligi() her iş parçacığından
+    çağrılabilir.
+    """
+
+    def __init__(self, dosya_yolu: Optional[str] = None, kapasite: int = IZ_KAPASITESI):
+        self.dosya_yolu = dosya_yolu
+        self.baslangic_zamani = time.time()
+        self._t0 = time.perf_counter()
+        self._kimlikler = itertools.count(1)
+        self._araliklar = deque(maxlen=kapasite)
+        self._yigin = []  # Açık aralıklar: [kimlik, ad, tür, başlangıç, işlem, üst]
+
+    def _kaydet(self, kimlik, ad, tur, baslangic, bitis, islem, ust):
+        self._araliklar.append(Aralik(
+            kimlik, ad, tur, baslangic - self._t0, (bitis - baslangic) * 1000, islem, ust,
+            threading.current_thread().name))
+
+    @contextmanager
+    def _ac(self, ad, tur, islem, ust):
+        kimlik = next(self._kimlikler)
+        acik = [kimlik, ad, tur, time.perf_counter(), islem or kimlik, ust]
+        self._yigin.append(acik)
+        try:
+            yield
+        finally:
+            self._yigin.remove(acik)
+            self._kaydet(kimlik, ad, tur, acik[3], time.perf_counter(), acik[4], ust)
+
+    def islem(self, ad: str):
+        """Kullanıcı işlemini kök aralık olarak izler (başka işlemin içindeyse onun altına girer)"""
+        if self._yigin:
+            ust = self._yigin[-1]
+            return self._ac(ad, 'islem', ust[4], ust[0])
+        return self._ac(ad, 'islem', 0, 0)
+
+    def alt(self, ad: str, tur: str):
+        """Açık işlemin içinde alt aralık açar; açık işlem yoksa bir şey kaydetmez"""
+        if not self._yigin:
+            return _bos()
+        ust = self._yigin[-1]
+        return self._ac(ad, tur, ust[4], ust[0])
+
+    def baglam(self) -> Optional[Baglam]:
+        """Arka plan işine taşınacak bağlam; açık işlem yoksa None"""
+        if not self._yigin:
+            return None
+        ust = self._yigin[-1]
+        return ust[4], ust[0]
+
+    def devam(self, baglam: Optional[Baglam], ad: str, tur: str):
+        """baglam() ile alınan işlemin altında Tk iş parçacığında yeni aralık açar"""
+        if baglam is None:
+            return _bos()
+        return self._ac(ad, tur, baglam[0], baglam[1])
+
+    def kaydet_araligi(self, baglam: Optional[Baglam], ad: str, tur: str,
+                       baslangic: float, bitis: float) -> None:
+        """Başka yerde ölçülmüş aralığı (time.perf_counter değerleriyle) kaydeder"""
+        if baglam is None:
+            return
+        self._kaydet(next(self._kimlikler), ad, tur, baslangic, bitis, baglam[0], baglam[1])
+
+    def sar(self, ad: str, fonksiyon):
+        """fonksiyon'u her çağrıda ad adlı işlem olarak izleyen sarmalayıcı döndürür"""
+        def sarili(*args, **kwargs):
+            with self.islem(ad):
+                return fonksiyon(*args, **kwargs)
+        return sarili
+
+    def araliklar(self) -> List[Aralik]:
+        return list(self._araliklar)
+
+    def dosyaya_yaz(self, yol: Optional[str] = None) -> str:
+        """Aralıkları Chrome izleme biçiminde JSON dosyasına yazar; yolu döndürür"""
+        yol = yol or self.dosya_yolu
+        olaylar = [{
+            "name": a.ad, "cat": a.tur, "ph": "X", "pid": 1, "tid": a.is_parcacigi,
+            "ts": round(a.baslangic * 1e6), "dur": round(a.sure_ms * 1000),
+            "args": {"kimlik": a.kimlik, "islem": a.islem, "ust": a.ust},
+        } for a in self.araliklar()]
+        gecici = yol + ".tmp"
+        with open(gecici, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": olaylar, "displayTimeUnit": "ms",
+                       "otherData": {"baslangic_zamani": self.baslangic_zamani}}, f, ensure_ascii=False)
+        os.replace(gecici, yol)
+        return yol
+
+
+def iz_dosyasini_oku(yol: str) -> Tuple[List[Aralik], float]:
+    """dosyaya_yaz() ile yazılmış dosyadaki aralıkları ve izin başlangıç zamanını döndürür"""
+    with open(yol, encoding="utf-8") as f:
+        veri = json.load(f)
+    araliklar = [Aralik(
+        o["args"]["kimlik"], o["name"], o["cat"], o["ts"] / 1e6, o["dur"] / 1000,
+        o["args"]["islem"], o["args"]["ust"], o["tid"],
+    ) for o in veri["traceEvents"] if o.get("ph") == "X"]
+    return araliklar, veri.get("otherData", {}).get("baslangic_zamani", 0.0)
+
+
+@contextmanager
+def _bos():
+    yield
+
+
+def mesaj_kutularini_izle(izci: Izci, modul) -> None:
+    """messagebox fonksiyonlarını açık işlemin 'mesaj' alt aralığı olarak izler
+
+    Kullanıcının mesajı okuma süresi böylece işlemin kendi süresinden ayrılır.
+    """
+    for ad in MESAJ_KUTULARI:
+        asil = getattr(modul, ad, None)
+        if asil is None or getattr(asil, "_izlenen", False):
+            continue
+
+        def sarili(*args, _asil=asil, _ad=ad, **kwargs):
+            with izci.alt(_ad, 'mesaj'):
+                return _asil(*args, **kwargs)
+        sarili._izlenen = True
+        setattr(modul, ad, sarili)
+
+
+class DonguNabzi:
+    """Tk olay döngüsünün gecikmesini after() atımlarıyla ölçer
+
+    Atım aralik_ms sonra gelmesi gerekirken esik_ms'den fazla gecikirse
+    gecikme 'donma' aralığı olarak izciye kaydedilir.
+    """
+
+    def __init__(self, root, izci: Izci, aralik_ms: int = NABIZ_ARALIGI,
+                 esik_ms: float = DONMA_ESIGI):
+        self.root = root
+        self.izci = izci
+        self.aralik_ms = aralik_ms
+        self.esik_ms = esik_ms
+        self.en_uzun_ms = 0.0
+        self.donma_sayisi = 0
+        self.toplam_donma_ms = 0.0
+        self._beklenen = time.perf_counter() + aralik_ms / 1000
+        self.root.after(aralik_ms, self._atim)
+
+    def _atim(self):
+        simdi = time.perf_counter()
+        gecikme_ms = (simdi - self._beklenen) * 1000
+        if gecikme_ms > self.en_uzun_ms:
+            self.en_uzun_ms = gecikme_ms
+        if gecikme_ms >= self.esik_ms:
+            self.donma_sayisi += 1
+            self.toplam_donma_ms += gecikme_ms
+            self.izci.kaydet_araligi((0, 0), "Olay döngüsü", 'donma', self._beklenen, simdi)
+        self._beklenen = simdi + self.aralik_ms / 1000
+        self.root.after(self.aralik_ms, self._atim)
+
+    def sifirla(self) -> None:
+        self.en_uzun_ms = 0.0
+        self.donma_sayisi = 0
+        self.toplam_donma_ms = 0.0
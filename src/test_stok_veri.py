@@ -0,0 +1,174 @@
+"""stok_veri için arayüzsüz testler (bellek içi veritabanı)
+
+FIFO lot dağılımı, şema göçü ve anahtar tabanlı sayfalama denetlenir.
+Çalıştırmak için src dizininde: python -m pytest -q
+"""
+import sqlite3
+from datetime import date, timedelta
+
+import pytest
+
+import stok_veri
+from stok_veri import HareketFiltresi, StokHatasi
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    stok_veri.create_database(conn)
+    stok_veri.migrate_database(conn)
+    yield conn
+    conn.close()
+
+
+def _giris(conn, ad, fiyat, adet, tarih, kdv_orani=0.0, kategori=None):
+    stok_veri.malzeme_ekle(conn, ad, fiyat, adet, kdv_orani, tarih, kategori)
+
+
+def _cikis(conn, ad, miktar, tarih):
+    return stok_veri.malzeme_cikisi_yap(conn, ad, miktar, "Personel", tarih)
+
+
+def _kalanlar(conn, ad):
+    """Malzemenin lotlarının kalan adetleri (FIFO sırasıyla)"""
+    return [row[0] for row in conn.execute(
+        "SELECT kalan_adet FROM malzeme_girisleri mg JOIN malzemeler m ON m.id = mg.malzeme_id "
+        "WHERE m.ad = ? ORDER BY mg.tarih_iso, mg.id", (ad,))]
+
+
+def _fifo_durumu(conn):
+    """Lot kalanları, çıkış dağılımları ve çıkış maliyetleri"""
+    return (
+        conn.execute("SELECT id, kalan_adet FROM malzeme_girisleri ORDER BY id").fetchall(),
+        conn.execute("SELECT cikis_id, giris_id, adet FROM cikis_dagilimlari ORDER BY 1, 2").fetchall(),
+        conn.execute("SELECT id, giris_id, kdvsiz_toplam, kdv_tutari, toplam_maliyet "
+                     "FROM malzeme_cikislari ORDER BY id").fetchall(),
+    )
+
+
+def test_cikis_en_eski_lotlardan_dusulur(conn):
+    _giris(conn, "Vida", 10.0, 5, date(2024, 1, 10))
+    _giris(conn, "Vida", 30.0, 4, date(2024, 1, 20))
+    # Sonra kaydedilen ama tarihi daha eski lot önce tüketilir
+    _giris(conn, "Vida", 20.0, 3, date(2024, 1, 5), kdv_orani=0.2)
+
+    cikis_id = _cikis(conn, "Vida", 7, date(2024, 2, 1))
+
+    assert _kalanlar(conn, "Vida") == [0, 1, 4]
+    assert conn.execute(
+        "SELECT giris_id, adet FROM cikis_dagilimlari WHERE cikis_id = ? ORDER BY giris_id",
+        (cikis_id,)).fetchall() == [(1, 4), (3, 3)]
+    giris_id, kdvsiz, kdv, toplam = conn.execute(
+        "SELECT giris_id, kdvsiz_toplam, kdv_tutari, toplam_maliyet FROM malzeme_cikislari WHERE id = ?",
+        (cikis_id,)).fetchone()
+    assert giris_id == 3
+    assert kdvsiz == pytest.approx(3 * 20.0 + 4 * 10.0)
+    assert kdv == pytest.approx(3 * 20.0 * 0.2)
+    assert toplam == pytest.approx(kdvsiz + kdv)
+    assert stok_veri.stok_miktari(conn, "Vida") == 5
+
+
+def test_tukenen_lot_atlanir_ve_yetersiz_stok_reddedilir(conn):
+    _giris(conn, "Boya", 5.0, 2, date(2024, 3, 1))
+    _giris(conn, "Boya", 6.0, 3, date(2024, 3, 2))
+
+    _cikis(conn, "Boya", 2, date(2024, 3, 3))
+    assert _kalanlar(conn, "Boya") == [0, 3]
+
+    cikis_id = _cikis(conn, "Boya", 1, date(2024, 3, 4))
+    assert conn.execute("SELECT giris_id, adet FROM cikis_dagilimlari WHERE cikis_id = ?",
+                        (cikis_id,)).fetchall() == [(2, 1)]
+
+    oncesi = _fifo_durumu(conn)
+    with pytest.raises(StokHatasi, match="Yetersiz stok"):
+        _cikis(conn, "Boya", 3, date(2024, 3, 5))
+    with pytest.raises(StokHatasi):
+        _cikis(conn, "Tanımsız", 1, date(2024, 3, 5))
+
+    # Reddedilen çıkış hiçbir şey yazmaz
+    assert _fifo_durumu(conn) == oncesi
+    assert stok_veri.stok_miktari(conn, "Boya") == 2
+
+
+def test_rebuild_fifo_artimli_dagilimla_ayni(conn):
+    gun = date(2024, 1, 1)
+    for tur in range(6):
+        for ad, fiyat, adet in (("Vida", 1.5, 11), ("Somun", 0.75, 4), ("Pul", 0.1, 12)):
+            gun += timedelta(days=1)
+            _giris(conn, ad, fiyat + tur, adet, gun, kdv_orani=0.18)
+        for ad, miktar in (("Vida", 9), ("Somun", 3), ("Pul", 5)):
+            gun += timedelta(days=1)
+            _cikis(conn, ad, miktar, gun)
+    stok_veri.cikis_fisi_yap(conn, "Personel", gun + timedelta(days=1), [
+        stok_veri.CikisSatiri("Vida", 4), stok_veri.CikisSatiri("Pul", 20),
+    ])
+
+    artimli = _fifo_durumu(conn)
+    with conn:
+        stok_veri.rebuild_fifo(conn)
+    yeniden = _fifo_durumu(conn)
+
+    assert yeniden[0] == artimli[0]
+    assert yeniden[1] == artimli[1]
+    for satir, beklenen in zip(yeniden[2], artimli[2]):
+        assert satir[:2] == beklenen[:2]
+        assert satir[2:] == pytest.approx(beklenen[2:])
+
+
+def test_temel_semadan_gecis():
+    conn = sqlite3.connect(":memory:")
+    stok_veri.create_database(conn)
+    # Temel şemadaki uygulamanın yazdığı kayıtlar: kategori yer tutucusu,
+    # iki lot ve tamamı ilk lota yazılmış bir çıkış
+    conn.executemany(
+        "INSERT INTO malzeme_girisleri (ad, fiyat, adet, kdv, kdv_tutari, toplam, tarih, kategori, tedarikci) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", [
+            ("KATEGORI_OLUSTURMA", 0, 0, 0, 0, 0, "01.01.2024", "Boya", None),
+            ("Vida", 1.0, 10, 0.18, 1.8, 11.8, "05.01.2024", "Hırdavat", "Acme"),
+            ("Vida", 2.0, 10, 0.18, 3.6, 23.6, "10.01.2024", "Hırdavat", "Acme"),
+        ])
+    conn.execute("INSERT INTO malzeme_cikislari (giris_id, malzeme_adi, cikis_adedi, personel, tarih) "
+                 "VALUES (2, 'Vida', 15, 'Personel', '20.01.2024')")
+    conn.execute("INSERT INTO mevcut_stok (malzeme_adi, toplam_adet) VALUES ('Vida', 5)")
+    conn.commit()
+
+    stok_veri.migrate_database(conn)
+
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == stok_veri.SEMA_SURUMU
+    assert stok_veri.kategoriler(conn) == ["Boya", "Hırdavat"]
+    assert stok_veri.stok_miktari(conn, "Vida") == 5
+    # FIFO geçişte yeniden hesaplanır: çıkış iki lota dağılır
+    assert _kalanlar(conn, "Vida") == [0, 5]
+    assert conn.execute("SELECT giris_id, adet FROM cikis_dagilimlari ORDER BY giris_id").fetchall() \
+        == [(2, 10), (3, 5)]
+    assert conn.execute("SELECT toplam_maliyet FROM malzeme_cikislari").fetchone()[0] \
+        == pytest.approx(10 * 1.18 + 5 * 2.36)
+    ozet = stok_veri.dashboard_ozeti(conn)
+    assert (ozet.toplam_malzeme, ozet.toplam_maliyet) == (5, pytest.approx(5 * 2.36))
+
+    # Göçten sonra yazma yolu ve tetikleyiciler çalışır
+    _giris(conn, "Vida", 3.0, 2, date(2024, 2, 1))
+    _cikis(conn, "Vida", 6, date(2024, 2, 2))
+    assert _kalanlar(conn, "Vida") == [0, 0, 1]
+    assert stok_veri.stok_miktari(conn, "Vida") == 1
+    conn.close()
+
+
+@pytest.mark.parametrize("sayfa_boyutu", [1, 3, 4, 50])
+def test_anahtar_sayfalari_tam_raporla_ayni(conn, sayfa_boyutu):
+    # Aynı günde hem giriş hem çıkış olan tarihler sayfa sınırlarına düşer
+    for gun in range(1, 6):
+        _giris(conn, "Vida", 1.0, 3, date(2024, 5, gun))
+        _giris(conn, "Somun", 2.0, 2, date(2024, 5, gun), kategori="Hırdavat")
+        _cikis(conn, "Vida", 1, date(2024, 5, gun))
+
+    for filtre in (HareketFiltresi(date(2024, 5, 1), date(2024, 5, 31)),
+                   HareketFiltresi(date(2024, 5, 2), date(2024, 5, 4), malzeme="vida"),
+                   HareketFiltresi(date(2024, 5, 1), date(2024, 5, 31), hareket_turu="Giriş")):
+        beklenen = stok_veri.hareket_raporu(conn, filtre).satirlar
+        sinirlar = stok_veri.hareket_sayfa_sinirlari(conn, filtre, sayfa_boyutu)
+        satirlar = []
+        for sonra in sinirlar:
+            satirlar.extend(stok_veri.hareket_sayfasi(conn, filtre, sonra, sayfa_boyutu))
+        assert satirlar == beklenen
+        assert len(sinirlar) == max(1, -(-len(beklenen) // sayfa_boyutu))